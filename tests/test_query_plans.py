@@ -0,0 +1,45 @@
+# tests/test_query_plans.py
+# 描述: 热点查询执行计划检查: 新建数据库和从旧版本迁移的数据库上，所有热点查询都必须命中索引。
+
+import os
+import shutil
+import pytest
+from wl31 import config
+from wl31.database import migrations
+from wl31.database.database_manager import DatabaseManager
+
+
+@pytest.fixture(autouse=True)
+def fast_config(monkeypatch):
+    monkeypatch.setattr(config, 'BCRYPT_ROUNDS', 4)
+    monkeypatch.setattr(config, 'ACTION_LOG_AUTO_ARCHIVE', False)
+
+
+def _plan_regressions(db_path):
+    db = DatabaseManager(str(db_path))
+    try:
+        assert migrations.get_schema_version(db.pool.reader()) == migrations.LATEST_VERSION
+        return migrations.find_plan_regressions(db.pool.reader())
+    finally:
+        db.close()
+
+
+def test_fresh_database_uses_indexes(tmp_path):
+    assert _plan_regressions(tmp_path / "fresh.db") == []
+
+
+def test_migrated_database_uses_indexes(tmp_path):
+    # 仓库自带的 wl31.db 是迁移机制引入之前的旧数据库（user_version 为 0）
+    db_path = tmp_path / "legacy.db"
+    shutil.copy(os.path.join(config.BASE_DIR, "wl31.db"), db_path)
+    assert _plan_regressions(db_path) == []
+
+
+def test_detects_full_scan(tmp_path):
+    db = DatabaseManager(str(tmp_path / "fresh.db"))
+    try:
+        db.conn.execute("DROP INDEX idx_courses_teacher")
+        problems = migrations.find_plan_regressions(db.pool.reader())
+    finally:
+        db.close()
+    assert any(problem.startswith("get_courses_by_teacher:") for problem in problems)
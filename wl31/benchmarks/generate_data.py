@@ -0,0 +1,177 @@
+# wl31/benchmarks/generate_data.py
+# 描述: 通过 DatabaseManager 生成指定规模的模拟数据库（学院、班级、教师、课程、学生、成绩）。
+
+import argparse
+import random
+import time
+from wl31 import config
+from wl31.data.department_data import DEPARTMENTS
+from wl31.database.database_manager import DatabaseManager
+
+# 常见姓氏（含复姓）和名字用字，包含多音字，以覆盖拼音转换的各种情况
+SURNAMES = list("王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤单解查") \
+    + ["欧阳", "司马", "诸葛", "上官", "皇甫", "令狐"]
+GIVEN_NAME_CHARS = list("伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰萍鹏辉斌宇浩凯健俊帆帅旭宁龙林欣瑶怡婷雪琳晨阳思佳梓涵子轩雨博文一诺泽睿乐行长重朝乾")
+TITLES = ["助教", "讲师", "讲师", "副教授", "副教授", "教授"]
+SEMESTERS = ["2023-2024 秋季", "2023-2024 春季", "2024-2025 秋季", "2024-2025 春季"]
+COURSE_SUFFIXES = ["导论", "基础", "原理", "实验", "专题研讨", "前沿"]
+
+# 身份证校验码的加权因子和校验字符（GB 11643）
+_ID_WEIGHTS = [7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2]
+_ID_CHECK_CHARS = "10X98765432"
+
+
+def random_name(rng):
+    """生成一个随机的中文姓名（单字或双字名）。"""
+    given = "".join(rng.choice(GIVEN_NAME_CHARS) for _ in range(rng.choice((1, 2, 2))))
+    return rng.choice(SURNAMES) + given
+
+
+def random_id_card(rng, birth_year):
+    """生成一个格式和校验码都合法的 18 位身份证号。"""
+    body = (f"{rng.choice(('110101', '310104', '440106', '510107', '330106'))}"
+            f"{birth_year:04d}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}{rng.randint(0, 999):03d}")
+    check = _ID_CHECK_CHARS[sum(int(d) * w for d, w in zip(body, _ID_WEIGHTS)) % 11]
+    return body + check
+
+
+def random_score(rng):
+    """近似正态分布的成绩，取 0.5 分的整数倍。"""
+    return round(min(max(rng.gauss(75, 12), 0), 100) * 2) / 2
+
+
+def generate_dataset(db_path, students=1000, teachers=50, courses=40, departments=None,
+                     classes_per_major=2, courses_per_student=8, seed=42,
+                     bcrypt_rounds=4, import_batch_size=5000, verbose=True):
+    """
+    生成模拟数据库。所有数据都通过 DatabaseManager 的公共方法写入，与真实使用路径一致。
+    :param db_path: 数据库文件路径（应为新文件）。
+    :param students: 学生人数。
+    :param teachers: 教师人数。
+    :param courses: 课程数。
+    :param departments: 使用的学院数，默认为 department_data.DEPARTMENTS 中的全部学院。
+    :param classes_per_major: 每个专业的班级数。
+    :param courses_per_student: 每个学生选修的课程数（每门课一条成绩）。
+    :param seed: 随机数种子，相同参数生成相同的数据。
+    :param bcrypt_rounds: 模拟账户使用的 bcrypt 强度，默认调到最低以缩短生成时间。
+    :param import_batch_size: 每次调用 batch_import_students 导入的人数。
+    :return: 各类数据的数量统计字典。
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    def progress(message):
+        if verbose:
+            print(f"[{time.perf_counter() - started:8.1f}s] {message}")
+
+    # 模拟账户的密码没有保护价值，降低哈希强度只影响本进程
+    original_rounds = config.BCRYPT_ROUNDS
+    config.BCRYPT_ROUNDS = bcrypt_rounds
+    db = DatabaseManager(db_path)
+    try:
+        admin_id = db.get_user("admin")['id']
+        department_items = list(DEPARTMENTS.items())[:departments]
+        # 班级: 专业 + 入学年份后两位 + 班号，如 "软件工程2301班"
+        classes = [(department, major, year, f"{major}{year % 100:02d}{index:02d}班")
+                   for department, majors in department_items
+                   for major in majors
+                   for year in (2021, 2022, 2023, 2024)
+                   for index in range(1, classes_per_major + 1)]
+
+        # 教师
+        teacher_rows = []
+        for _ in range(teachers):
+            department = rng.choice(department_items)[0]
+            teacher_rows.append({
+                'department': department,
+                'name': random_name(rng),
+                'gender': rng.choice(('男', '女')),
+                'title': rng.choice(TITLES),
+                'id_card': random_id_card(rng, rng.randint(1965, 1995)),
+                'contact': f"139{rng.randint(0, 99999999):08d}",
+            })
+        db.batch_import_teachers(admin_id, teacher_rows)
+        teacher_ids = [teacher['id'] for teacher in db.get_all_teachers()]
+        progress(f"{len(teacher_ids)} teachers")
+
+        # 课程
+        course_ids = []
+        for _ in range(courses):
+            major = rng.choice(rng.choice(department_items)[1])
+            course_ids.append(db.add_course(admin_id, {
+                'name': f"{major}{rng.choice(COURSE_SUFFIXES)}",
+                'credits': rng.choice((1, 1.5, 2, 2.5, 3, 4)),
+                'teacher_id': rng.choice(teacher_ids) if teacher_ids else None,
+                'semester': rng.choice(SEMESTERS),
+                'description': '',
+            }))
+        progress(f"{len(course_ids)} courses")
+
+        # 学生
+        imported = 0
+        while imported < students:
+            batch = []
+            for _ in range(min(import_batch_size, students - imported)):
+                department, major, year, class_name = rng.choice(classes)
+                batch.append({
+                    'department': department,
+                    'major': major,
+                    'class': class_name,
+                    'name': random_name(rng),
+                    'gender': rng.choice(('男', '女')),
+                    'enrollment_year': year,
+                    'id_card': random_id_card(rng, year - 18),
+                    'contact': f"138{rng.randint(0, 99999999):08d}",
+                })
+            success_count, _, errors = db.batch_import_students(admin_id, batch)
+            if errors:
+                print(f"Import errors: {errors[:3]}")
+            imported += len(batch)
+            progress(f"{imported}/{students} students")
+
+        # 成绩: 每门课一次批量写入
+        student_ids = [student['id'] for student in db.get_all_students()]
+        grades_by_course = {course_id: [] for course_id in course_ids}
+        for student_id in student_ids:
+            for course_id in rng.sample(course_ids, min(courses_per_student, len(course_ids))):
+                grades_by_course[course_id].append((student_id, random_score(rng)))
+        grade_count = 0
+        for course_id, grades in grades_by_course.items():
+            db.assign_grades_bulk(admin_id, course_id, grades)
+            grade_count += len(grades)
+        progress(f"{grade_count} grades")
+
+        db.flush_action_logs()
+        return {
+            'departments': len(department_items),
+            'classes': len(classes),
+            'teachers': len(teacher_ids),
+            'courses': len(course_ids),
+            'students': len(student_ids),
+            'grades': grade_count,
+        }
+    finally:
+        db.close()
+        config.BCRYPT_ROUNDS = original_rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成学生信息管理系统的模拟数据库")
+    parser.add_argument("db_path", help="输出的数据库文件路径")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--teachers", type=int, default=50)
+    parser.add_argument("--courses", type=int, default=40)
+    parser.add_argument("--departments", type=int, default=None)
+    parser.add_argument("--classes-per-major", type=int, default=2)
+    parser.add_argument("--courses-per-student", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    counts = generate_dataset(args.db_path, students=args.students, teachers=args.teachers,
+                              courses=args.courses, departments=args.departments,
+                              classes_per_major=args.classes_per_major,
+                              courses_per_student=args.courses_per_student, seed=args.seed)
+    print(f"Generated: {counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+# wl31/benchmarks/run_benchmarks.py
+# 描述: 在不同规模的模拟数据库上为数据层的热点方法计时，结果写入 JSON 文件以便跟踪性能回归。
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from wl31 import config
+from wl31.benchmarks.generate_data import generate_dataset, random_name, random_id_card
+from wl31.database.database_manager import DatabaseManager
+from wl31.database.profiler import LatencyStats
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def _measure(func, repeat):
+    """调用 func 共 repeat 次，返回延迟统计。"""
+    stats = LatencyStats(max_samples=repeat)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        stats.add(time.perf_counter() - start)
+    return stats.summary()
+
+
+def run_suite(db, repeat, rng):
+    """
+    在一个已生成数据的数据库上运行所有基准测试。
+    :return: {基准名称: 延迟统计}
+    """
+    admin_id = db.get_user("admin")['id']
+    courses = [course['id'] for course in db.get_all_courses()]
+    classes = db.get_class_names()
+    student_ids = [row['id'] for row in db.read_cursor.execute("SELECT id FROM Students")]
+
+    def random_class_course():
+        return rng.choice(classes), rng.choice(courses)
+
+    def import_students():
+        db.batch_import_students(admin_id, [{
+            'department': '计算机学院', 'major': '软件工程', 'class': '基准测试班',
+            'name': random_name(rng), 'gender': rng.choice(('男', '女')),
+            'enrollment_year': 2024, 'id_card': random_id_card(rng, 2006),
+        } for _ in range(100)])
+
+    benchmarks = {
+        'get_all_students.first_page': lambda: db.get_all_students(limit=config.STUDENT_PAGE_SIZE),
+        'get_all_students.filtered_page': lambda: db.get_all_students(
+            filters={'class_name': rng.choice(classes)}, sort_by='name', limit=config.STUDENT_PAGE_SIZE),
+        'get_all_students.full': lambda: db.get_all_students(),
+        'get_student_grades_by_course': lambda: db.get_student_grades_by_course(rng.choice(courses)),
+        'assign_grade': lambda: db.assign_grade(admin_id, rng.choice(student_ids), rng.choice(courses),
+                                                rng.randint(0, 100)),
+        'get_action_logs.first_page': lambda: (db.log_action(admin_id, 'BENCHMARK', 'benchmark'),
+                                               db.get_action_logs('admin', limit=config.ACTION_LOG_PAGE_SIZE)),
+        'get_action_logs.by_type': lambda: db.get_action_logs('admin', action_type='BENCHMARK',
+                                                              limit=config.ACTION_LOG_PAGE_SIZE),
+        'calculate_class_grade_stats': lambda: db.calculate_class_grade_stats(*random_class_course()),
+        'get_grade_stats_dashboard': lambda: db.get_grade_stats_dashboard(),
+        # 前缀索引在第一次搜索时加载: 分别记录加载一次的开销和加载后的即时搜索
+        'search_students_by_pinyin.load': lambda: (db.student_search_index.invalidate(),
+                                                   db.search_students_by_pinyin("z", limit=1)),
+        'search_students_by_pinyin': lambda: db.search_students_by_pinyin(
+            rng.choice("zwlcyhsm"), limit=config.STUDENT_SEARCH_LIMIT),
+        'search_students': lambda: db.search_students(
+            rng.choice(("zhang", "wang", "li", "zs", "软件", "2301")), limit=config.STUDENT_SEARCH_LIMIT),
+        'query_grades.by_class': lambda: db.query_grades(class_name=rng.choice(classes)),
+        'get_transcript.cold': lambda: (db.transcript_cache.clear(), db.get_transcript(rng.choice(student_ids))),
+        'get_gpa_report.by_class': lambda: (db.transcript_cache.clear(), db.get_gpa_report(rng.choice(classes))),
+        'get_rankings.after_assign_grade': lambda: (
+            db.assign_grade(admin_id, rng.choice(student_ids), rng.choice(courses), rng.randint(0, 100)),
+            db.get_rankings('class', rng.choice(classes))),
+    }
+    results = {name: _measure(func, repeat) for name, func in benchmarks.items()}
+    # 批量导入较慢且会改变数据规模，放在最后并减少次数
+    results['batch_import_students.100'] = _measure(import_students, max(1, repeat // 10))
+    return results
+
+
+def run_benchmarks(sizes, repeat=20, seed=42, work_dir=None, keep=False):
+    """
+    对每个规模生成数据库并运行基准测试。
+    :param sizes: 学生人数列表。
+    :param repeat: 每个基准的重复次数。
+    :param work_dir: 存放生成数据库的目录，默认为临时目录。
+    :param keep: 是否保留生成的数据库（已存在的同规模数据库会被直接复用）。
+    :return: 可直接序列化为 JSON 的结果字典。
+    """
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+        'runs': [],
+    }
+    temp_dir = None
+    if work_dir is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        work_dir = temp_dir.name
+    try:
+        for size in sizes:
+            db_path = os.path.join(work_dir, f"bench_{size}.db")
+            if not (keep and os.path.exists(db_path)):
+                if os.path.exists(db_path):
+                    os.remove(db_path)
+                start = time.perf_counter()
+                counts = generate_dataset(db_path, students=size, teachers=max(10, size // 100),
+                                          courses=max(20, min(size // 250, 200)), seed=seed)
+                generate_seconds = round(time.perf_counter() - start, 3)
+            else:
+                counts, generate_seconds = None, None
+
+            print(f"Running benchmarks on {size} students...")
+            original_rounds = config.BCRYPT_ROUNDS
+            config.BCRYPT_ROUNDS = 4 # 与生成数据时一致，导入基准只衡量数据库部分
+            db = DatabaseManager(db_path)
+            try:
+                results = run_suite(db, repeat, random.Random(seed))
+            finally:
+                db.close()
+                config.BCRYPT_ROUNDS = original_rounds
+            report['runs'].append({
+                'students': size,
+                'dataset': counts,
+                'generate_seconds': generate_seconds,
+                'results': results,
+            })
+            if not keep:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(db_path + suffix):
+                        os.remove(db_path + suffix)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据层基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="学生人数规模")
+    parser.add_argument("--repeat", type=int, default=20, help="每个基准的重复次数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json", help="结果 JSON 文件路径")
+    parser.add_argument("--work-dir", default=None, help="生成数据库的目录（默认使用临时目录）")
+    parser.add_argument("--keep", action="store_true", help="保留并复用生成的数据库")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, repeat=args.repeat, seed=args.seed,
+                            work_dir=args.work_dir, keep=args.keep)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for run in report['runs']:
+        print(f"\n== {run['students']} students ==")
+        for name, stats in run['results'].items():
+            print(f"{name:<36} p50 {stats['p50_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# wl31/benchmarks/startup_benchmark.py
+# 描述: 启动性能基准: 用 -X importtime 分析导入耗时，测量从进程启动到登录窗口出现的时间，超出预算时返回非零退出码。
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from wl31 import config
+
+# 登录窗口出现前不应导入的重量级模块
+DEFERRED_MODULES = ['numpy', 'openpyxl', 'pypinyin', 'PIL', 'bcrypt', 'wl31.database.database_manager']
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 子进程中执行: 显示登录窗口，并在窗口出现、数据库打开后分别输出一行标记
+_LOGIN_WINDOW_SCRIPT = """
+import sys
+from wl31 import config
+config.DATABASE_PATH = sys.argv[1]
+from PyQt5.QtWidgets import QApplication
+import wl31.main as main
+
+finish_startup = main.LoginController.finish_startup
+
+def timed_finish_startup(self):
+    print("WINDOW_SHOWN", flush=True)
+    finish_startup(self)
+    print("STARTUP_DONE", flush=True)
+    QApplication.quit()
+
+main.LoginController.finish_startup = timed_finish_startup
+app = QApplication(sys.argv[:1])
+window = main.LoginController()
+window.show()
+app.exec_()
+"""
+
+
+def _child_env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PROJECT_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    if sys.platform.startswith('linux') and not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen') # 无图形界面的环境（如 CI）
+    return env
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的输出。
+    :return: {模块名: (自身耗时微秒, 累计耗时微秒)}
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_imports(module="wl31.main"):
+    """在新进程中导入 module，返回各模块的导入耗时。"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=_child_env(), cwd=PROJECT_ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure_login_window(db_path):
+    """
+    启动一个显示登录窗口的新进程。
+    :return: (登录窗口出现的耗时, 启动完成即数据库打开后的耗时)，单位毫秒。
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", _LOGIN_WINDOW_SCRIPT, db_path],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                               env=_child_env(), cwd=PROJECT_ROOT)
+    timings = {}
+    for line in process.stdout:
+        marker = line.strip()
+        if marker in ('WINDOW_SHOWN', 'STARTUP_DONE'):
+            timings[marker] = (time.perf_counter() - start) * 1000
+    process.wait()
+    if 'WINDOW_SHOWN' not in timings:
+        raise RuntimeError("The login window was never shown.")
+    return timings['WINDOW_SHOWN'], timings.get('STARTUP_DONE')
+
+
+def run(budget_ms, repeat):
+    """
+    运行启动基准。
+    :return: 结果字典，其中 problems 为空表示满足预算。
+    """
+    modules = measure_imports()
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:15]
+    deferred = [name for name in DEFERRED_MODULES if name in modules]
+
+    window_times, done_times = [], []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for index in range(repeat):
+            # 第一次使用新数据库（含建表和迁移），之后的运行复用它，模拟日常启动
+            window_ms, done_ms = measure_login_window(os.path.join(temp_dir, "startup.db"))
+            window_times.append(window_ms)
+            done_times.append(done_ms)
+
+    window_times_warm = sorted(window_times[1:] or window_times)
+    median_window_ms = window_times_warm[len(window_times_warm) // 2]
+    problems = [f"{name} is imported before the login window is shown" for name in deferred]
+    if median_window_ms > budget_ms:
+        problems.append(f"time to login window {median_window_ms:.0f} ms exceeds budget {budget_ms} ms")
+    return {
+        'import_ms': round(modules.get('wl31.main', (0, 0))[1] / 1000, 1),
+        'slowest_imports': [{'module': name, 'self_ms': round(self_us / 1000, 1),
+                             'cumulative_ms': round(cumulative_us / 1000, 1)}
+                            for name, (self_us, cumulative_us) in slowest],
+        'time_to_login_window_ms': [round(t, 1) for t in window_times],
+        'time_to_startup_done_ms': [round(t, 1) if t is not None else None for t in done_times],
+        'median_time_to_login_window_ms': round(median_window_ms, 1),
+        'budget_ms': budget_ms,
+        'problems': problems,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--budget-ms", type=int, default=config.STARTUP_BUDGET_MS,
+                        help="从进程启动到登录窗口出现的时间预算（毫秒）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="结果 JSON 文件路径")
+    args = parser.parse_args()
+
+    report = run(args.budget_ms, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"import wl31.main: {report['import_ms']} ms")
+    for item in report['slowest_imports'][:10]:
+        print(f"  {item['self_ms']:>8.1f} ms  {item['module']}")
+    print(f"Time to login window: {report['time_to_login_window_ms']} ms "
+          f"(median {report['median_time_to_login_window_ms']} ms, budget {report['budget_ms']} ms)")
+    for problem in report['problems']:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if report['problems'] else 0)
+
+
+if __name__ == '__main__':
+    main()
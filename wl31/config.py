@@ -12,4 +12,59 @@ DATABASE_PATH = os.path.join(BASE_DIR, "wl31.db")
 CAPTCHA_FONT_DIR = os.path.join(BASE_DIR, "assets", "captcha_fonts")
 
 # 默认字体（如果需要）
-# DEFAULT_FONT_PATH = os.path.join(CAPTCHA_FONT_DIR, "your_font.ttf")
\ No newline at end of file
+# DEFAULT_FONT_PATH = os.path.join(CAPTCHA_FONT_DIR, "your_font.ttf")
+
+# 数据库连接设置
+DB_JOURNAL_MODE = "WAL"      # WAL 模式下读写互不阻塞
+DB_BUSY_TIMEOUT_MS = 5000    # 等待数据库锁的最长时间（毫秒）
+
+# 学生列表每页加载的条数
+STUDENT_PAGE_SIZE = 200
+
+# 批量导入时每个 executemany 块的行数
+IMPORT_CHUNK_SIZE = 500
+
+# 操作日志批量写入设置
+ACTION_LOG_BATCH_SIZE = 100       # 每批最多写入的日志条数
+ACTION_LOG_FLUSH_INTERVAL = 1.0   # 两次写入之间的最长间隔（秒）
+ACTION_LOG_RETRY_DELAY = 0.1      # 数据库被锁定时首次重试的等待时间（秒），之后每次加倍
+ACTION_LOG_MAX_RETRY_DELAY = 5.0  # 重试等待时间的上限（秒）
+ACTION_LOG_CLOSE_TIMEOUT = 30.0   # 关闭时最多重试多久（秒）
+
+# 成绩表格编辑后延迟保存的时间（毫秒），期间的修改合并为一次批量保存
+GRADE_SAVE_DELAY_MS = 500
+
+# 学生搜索最多返回的条数
+STUDENT_SEARCH_LIMIT = 200
+
+# 及格分数线
+PASS_SCORE = 60
+
+# 分数到绩点的换算表（4.0 制）: [(最低分, 绩点), ...]，按最低分从高到低排列，低于最后一档记 0 分
+GPA_SCALE = [
+    (90, 4.0), (85, 3.7), (82, 3.3), (78, 3.0), (75, 2.7),
+    (72, 2.3), (68, 2.0), (64, 1.5), (60, 1.0),
+]
+
+# 用户身份信息缓存最多保存的用户数
+USER_CACHE_SIZE = 256
+
+# 数据库性能分析（默认关闭，设置环境变量 WL31_DB_PROFILING=1 开启）
+DB_PROFILING = os.environ.get("WL31_DB_PROFILING") == "1"
+SLOW_QUERY_THRESHOLD_MS = 50  # 超过该耗时的语句写入慢查询日志
+SLOW_QUERY_LOG_PATH = os.path.join(BASE_DIR, "slow_queries.log")
+
+# bcrypt 哈希强度（log2 轮数）。生产环境保持默认值，只有生成测试数据时才会调低
+BCRYPT_ROUNDS = 12
+
+# 从进程启动到登录窗口出现的时间预算（毫秒），由 benchmarks/startup_benchmark.py 检查
+STARTUP_BUDGET_MS = 800
+
+# 操作日志保留策略: 超过保留天数的日志按日期归档为 gzip 压缩的 JSONL 文件
+ACTION_LOG_RETENTION_DAYS = 180
+# 归档目录位于数据库文件旁的 log_archive/<数据库文件名>/ 下，不同数据库的归档互不混合
+ACTION_LOG_ARCHIVE_DIRNAME = "log_archive"
+ACTION_LOG_AUTO_ARCHIVE = True    # 启动时在后台自动归档
+
+# 操作日志表格每次加载的条数
+ACTION_LOG_PAGE_SIZE = 200
@@ -0,0 +1,148 @@
+# wl31/database/action_log_query.py
+# 描述: 操作日志查询构造器，生成按 (timestamp, id) 倒序、支持键集分页的参数化 SQL；
+#       以及操作日志全文索引（FTS5）的建表、同步触发器和检索式构造。
+
+import re
+
+# 检索框中的一项: 双引号括起的短语，或不含空白的单个词
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def create_action_log_fts(cursor):
+    """
+    创建 ActionLogs 的全文索引及同步触发器，并用现有日志初始化。
+    索引是外部内容表（content='ActionLogs'），不重复存储日志文本。unicode61 分词器
+    把学生ID、课程ID等数字切成独立的词，可精确匹配 "student 12" 而不会命中 "student 123"。
+    """
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS ActionLogsFts USING fts5(
+        action_type, description,
+        content='ActionLogs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """)
+    # 排序使用 bm25，描述中的命中比操作类型中的命中更重要
+    cursor.execute("INSERT INTO ActionLogsFts(ActionLogsFts, rank) VALUES('rank', 'bm25(0.5, 1.0)')")
+    create_action_log_fts_triggers(cursor)
+    rebuild_action_log_fts(cursor)
+
+
+def create_action_log_fts_triggers(cursor):
+    """创建使全文索引与 ActionLogs 保持同步的触发器（重建 ActionLogs 表后需重新创建）。"""
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_actionlogs_fts_insert AFTER INSERT ON ActionLogs BEGIN
+        INSERT INTO ActionLogsFts(rowid, action_type, description)
+        VALUES (new.id, new.action_type, new.description);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_actionlogs_fts_delete AFTER DELETE ON ActionLogs BEGIN
+        INSERT INTO ActionLogsFts(ActionLogsFts, rowid, action_type, description)
+        VALUES ('delete', old.id, old.action_type, old.description);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_actionlogs_fts_update AFTER UPDATE ON ActionLogs BEGIN
+        INSERT INTO ActionLogsFts(ActionLogsFts, rowid, action_type, description)
+        VALUES ('delete', old.id, old.action_type, old.description);
+        INSERT INTO ActionLogsFts(rowid, action_type, description)
+        VALUES (new.id, new.action_type, new.description);
+    END
+    """)
+
+
+def rebuild_action_log_fts(cursor):
+    """按 ActionLogs 的当前内容重建全文索引。"""
+    cursor.execute("INSERT INTO ActionLogsFts(ActionLogsFts) VALUES('rebuild')")
+
+
+def build_match_query(text):
+    """
+    把检索框中的输入转换为 FTS5 检索式，所有项都需命中（AND）。
+    纯数字（ID、分数）精确匹配，其他词按前缀匹配，双引号括起的内容按短语匹配，
+    如 '"student 12" 张' 匹配描述中紧邻的 "student 12" 且含以"张"开头的词的日志。
+    用户输入中的 FTS5 语法字符都会被转义，不会引发语法错误。
+    :return: 检索式；输入为空时返回 None。
+    """
+    terms = []
+    for phrase, word in _SEARCH_TERM.findall(text or ''):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        elif word:
+            word = word.replace('"', '""')
+            terms.append(f'"{word}"' if word.isdigit() else f'"{word}"*')
+    return " ".join(terms) or None
+
+
+class ActionLogQuery:
+    """
+    操作日志查询构造器。
+
+    结果按 (timestamp, id) 倒序排列，分页条件为 (timestamp, id) < 上一页最后一行，
+    配合 ActionLogs 上以 timestamp 结尾的索引（索引隐含 rowid 即 id），
+    无论翻到第几页都只需一次索引范围查找，不需要额外排序。
+    """
+    COLUMNS = "al.id, al.user_id, u.username, al.action_type, al.description, al.timestamp"
+
+    def __init__(self, user_id=None, action_type=None, start_time=None, end_time=None, match=None):
+        """
+        :param user_id: 操作用户ID。
+        :param action_type: 操作类型。
+        :param start_time: 开始时间 'YYYY-MM-DD HH:MM:SS'（含，UTC）。
+        :param end_time: 结束时间 'YYYY-MM-DD HH:MM:SS'（含，UTC）。
+        :param match: FTS5 检索式（见 build_match_query）。指定时按 bm25 相关度排序，
+                      此时只能用 offset 分页。
+        """
+        self.user_id = user_id
+        self.action_type = action_type
+        self.start_time = start_time
+        self.end_time = end_time
+        self.match = match
+
+    def build(self, limit=None, after=None, offset=None):
+        """
+        生成 SQL 和参数。
+        :param limit: 每页条数，为 None 时不分页。
+        :param after: 上一页的最后一行（需包含 timestamp 和 id），返回排在它之后（更早）的日志。
+        :param offset: 跳过的条数，仅用于全文检索（相关度排序无法键集分页）。
+        :return: (sql, params)
+        """
+        if self.match is not None and after is not None:
+            raise ValueError("Full-text search results are paged by offset, not by 'after'")
+        clauses, params = [], []
+        if self.match is not None:
+            clauses.append("ActionLogsFts MATCH ?")
+            params.append(self.match)
+        # 条件顺序固定，保证同一种查询形态生成完全相同的 SQL 文本
+        for clause, value in (
+            ("al.user_id = ?", self.user_id),
+            ("al.action_type = ?", self.action_type),
+            ("al.timestamp >= ?", self.start_time),
+            ("al.timestamp <= ?", self.end_time),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if after is not None:
+            clauses.append("(al.timestamp, al.id) < (?, ?)")
+            params.extend((after['timestamp'], after['id']))
+
+        # LEFT JOIN: 用户被删除后，其操作日志仍然可见
+        if self.match is not None:
+            # 由 FTS5 按 rank 顺序输出命中的日志，再按 rowid 取出日志行，不需要额外排序
+            sql = (f"SELECT {self.COLUMNS}, ActionLogsFts.rank AS rank\nFROM ActionLogsFts"
+                   f"\nJOIN ActionLogs al ON al.id = ActionLogsFts.rowid\nLEFT JOIN Users u ON u.id = al.user_id")
+            order_by = "ActionLogsFts.rank"
+        else:
+            sql = f"SELECT {self.COLUMNS}\nFROM ActionLogs al\nLEFT JOIN Users u ON u.id = al.user_id"
+            order_by = "al.timestamp DESC, al.id DESC"
+        if clauses:
+            sql += "\nWHERE " + " AND ".join(clauses)
+        sql += f"\nORDER BY {order_by}"
+        if limit is not None or offset:
+            sql += "\nLIMIT ?"
+            params.append(-1 if limit is None else int(limit))
+        if offset:
+            sql += " OFFSET ?"
+            params.append(int(offset))
+        return sql, params
@@ -0,0 +1,173 @@
+# wl31/database/action_log_writer.py
+# 描述: 操作日志的异步批量写入器。
+
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from wl31 import config
+
+# 队列中的停止标记
+_STOP = object()
+
+
+class _FlushRequest:
+    """flush() 的等待标记，ok 表示调用前入队的日志是否都已写入。"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.ok = False
+
+    def finish(self, ok):
+        self.ok = ok
+        self.event.set()
+
+
+def _is_transient(error):
+    """是否为重试即可成功的错误（其他连接持有写锁，等待超时）。"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+class ActionLogWriter:
+    """
+    将操作日志放入队列，由后台线程按批写入 ActionLogs 表。
+
+    队列中积累到 batch_size 条或距离上次写入超过 flush_interval 秒时写入一批，
+    每批只需一次提交。数据库被其他连接锁定（如大批量导入、迁移）导致写入失败时，
+    这批日志保留在内存中，按指数退避重试，之后入队的日志排在它后面一起写入，不会丢失；
+    只有非暂时性的错误（如表结构损坏）才会丢弃该批日志。
+    close() 会持续重试直到剩余日志以 synchronous=FULL 提交，超过 close_timeout 仍未写入时报告失败。
+    """
+    def __init__(self, pool, batch_size=config.ACTION_LOG_BATCH_SIZE,
+                 flush_interval=config.ACTION_LOG_FLUSH_INTERVAL,
+                 retry_delay=config.ACTION_LOG_RETRY_DELAY, max_retry_delay=config.ACTION_LOG_MAX_RETRY_DELAY,
+                 close_timeout=config.ACTION_LOG_CLOSE_TIMEOUT):
+        """
+        :param pool: 连接池，后台线程从中获取自己的写连接。
+        :param batch_size: 每批最多写入的日志条数。
+        :param flush_interval: 两次写入之间的最长间隔（秒）。
+        :param retry_delay: 写入失败后首次重试的等待时间（秒），之后每次加倍。
+        :param max_retry_delay: 重试等待时间的上限（秒）。
+        :param close_timeout: close() 最多重试多久（秒）。
+        """
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.close_timeout = close_timeout
+        self.unwritten = 0 # close() 放弃时仍未写入的日志条数
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ActionLogWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, user_id, action_type, description):
+        """将一条日志加入写入队列（时间戳在调用时记录，与 CURRENT_TIMESTAMP 格式一致）。"""
+        if self._closed:
+            raise RuntimeError("ActionLogWriter is closed")
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        self._queue.put((user_id, action_type, description, timestamp))
+
+    def flush(self, timeout=None):
+        """
+        立即写入调用前已入队的日志，并阻塞到写入完成。
+        数据库被锁定时不会无限等待: 本次写入失败即返回 False，日志仍保留并在后台重试。
+        :return: 是否已全部写入。
+        """
+        if not self._thread.is_alive():
+            return not self.unwritten
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.event.wait(timeout) and request.ok
+
+    def close(self):
+        """
+        写完剩余日志并停止后台线程。
+        :return: 是否所有日志都已写入；重试超过 close_timeout 仍失败时返回 False。
+        """
+        if self._closed:
+            return not self.unwritten
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        return not self.unwritten
+
+    def _run(self):
+        """后台线程主循环。"""
+        batch = []          # 待写入的日志，写入失败时保留，新日志追加在后面
+        requests = []       # 等待 batch 写入的 flush 请求
+        deadline = None     # 下一次写入（或重试）的时间
+        failures = 0        # 连续写入失败的次数
+        stopping_at = None  # 收到停止标记的时间
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None # 到了写入或重试的时间
+
+            if isinstance(item, tuple):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                # 重试等待期间不因批次已满而提前写入
+                if len(batch) < self.batch_size or failures:
+                    continue
+            elif isinstance(item, _FlushRequest):
+                requests.append(item)
+            elif item is _STOP:
+                stopping_at = time.monotonic()
+
+            if self._write_batch(batch, durable=stopping_at is not None, retrying=failures > 0):
+                batch = []
+                deadline = None
+                failures = 0
+                for request in requests:
+                    request.finish(True)
+                requests = []
+                if stopping_at is not None:
+                    break
+                continue
+
+            failures += 1
+            for request in requests:
+                request.finish(False)
+            requests = []
+            if stopping_at is not None and time.monotonic() - stopping_at >= self.close_timeout:
+                self.unwritten = len(batch)
+                print(f"Gave up writing {len(batch)} action log(s) after retrying for {self.close_timeout}s.")
+                break
+            delay = min(self.retry_delay * 2 ** (failures - 1), self.max_retry_delay)
+            deadline = time.monotonic() + delay
+        self.pool.release_thread()
+
+    def _write_batch(self, batch, durable=False, retrying=False):
+        """
+        在一个事务中写入一批日志。
+        :param retrying: 是否为重试（重试失败时不再重复输出错误）。
+        :return: 这批日志是否已处理完毕（写入成功，或因非暂时性错误被丢弃）；
+                 返回 False 表示数据库暂时被锁定，需要稍后重试。
+        """
+        if not batch:
+            return True
+        conn = self.pool.writer()
+        try:
+            if durable:
+                # 关闭前的最后一批: 提交时同步刷盘，保证日志不会因断电丢失
+                conn.execute("PRAGMA synchronous = FULL")
+            conn.executemany(
+                "INSERT INTO ActionLogs (user_id, action_type, description, timestamp) VALUES (?, ?, ?, ?)",
+                batch
+            )
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            if _is_transient(e):
+                if not retrying:
+                    print(f"Error writing {len(batch)} action log(s), will retry: {e}")
+                return False
+            print(f"Error writing {len(batch)} action log(s), discarded: {e}")
+            return True
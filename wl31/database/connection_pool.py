@@ -0,0 +1,107 @@
+# wl31/database/connection_pool.py
+# 描述: 线程安全的 SQLite 连接池，为每个线程提供独立的读写连接。
+
+import sqlite3
+import threading
+from wl31 import config
+
+
+class ConnectionPool:
+    """
+    按线程分配 SQLite 连接的连接池。
+
+    每个线程拥有一条写连接和一条只读连接，数据库以 WAL 模式打开，
+    读操作不会阻塞写操作；多个写线程之间通过 busy_timeout 排队等待，
+    而不是直接抛出 "database is locked"。
+    """
+    def __init__(self, db_path, busy_timeout=config.DB_BUSY_TIMEOUT_MS,
+                 journal_mode=config.DB_JOURNAL_MODE, connection_factory=sqlite3.Connection):
+        """
+        :param db_path: 数据库文件的路径。
+        :param busy_timeout: 等待数据库锁的最长时间（毫秒）。
+        :param journal_mode: 日志模式，默认为 WAL。
+        :param connection_factory: 创建连接的工厂（如性能分析用的连接类）。
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.journal_mode = journal_mode
+        self.connection_factory = connection_factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = [] # 记录所有已打开的连接，便于统一关闭
+
+        # 日志模式是持久化到数据库文件中的，已是目标模式时无需再次设置
+        conn = self.writer()
+        if conn.execute("PRAGMA journal_mode").fetchone()[0].upper() != self.journal_mode.upper():
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+
+    def _open(self, read_only=False):
+        """打开一条新连接并应用统一的 PRAGMA 设置。"""
+        # 连接只会被创建它的线程使用，关闭时才会跨线程访问
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000,
+                               check_same_thread=False, factory=self.connection_factory)
+        conn.row_factory = sqlite3.Row # 将元组结果转换为类似字典的对象
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        conn.execute("PRAGMA synchronous = NORMAL") # WAL 模式下 NORMAL 已足够安全
+        conn.execute("PRAGMA foreign_keys = ON") # 删除学生/课程时依赖外键级联删除成绩和账户
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def writer(self):
+        """返回当前线程的写连接（不存在时创建）。"""
+        conn = getattr(self._local, 'writer', None)
+        if conn is None:
+            conn = self._open()
+            self._local.writer = conn
+        return conn
+
+    def reader(self):
+        """返回当前线程的只读连接（不存在时创建）。"""
+        conn = getattr(self._local, 'reader', None)
+        if conn is None:
+            conn = self._open(read_only=True)
+            self._local.reader = conn
+        return conn
+
+    def write_cursor(self):
+        """返回当前线程写连接上的共享游标。"""
+        cursor = getattr(self._local, 'write_cursor', None)
+        if cursor is None:
+            cursor = self.writer().cursor()
+            self._local.write_cursor = cursor
+        return cursor
+
+    def read_cursor(self):
+        """返回当前线程只读连接上的共享游标。"""
+        cursor = getattr(self._local, 'read_cursor', None)
+        if cursor is None:
+            cursor = self.reader().cursor()
+            self._local.read_cursor = cursor
+        return cursor
+
+    def release_thread(self):
+        """关闭当前线程持有的连接（后台线程结束前调用）。"""
+        for name in ('writer', 'reader'):
+            conn = getattr(self._local, name, None)
+            if conn is not None:
+                with self._lock:
+                    if conn in self._connections:
+                        self._connections.remove(conn)
+                conn.close()
+        for name in ('writer', 'reader', 'write_cursor', 'read_cursor'):
+            if hasattr(self._local, name):
+                delattr(self._local, name)
+
+    def close_all(self):
+        """关闭连接池中的所有连接。"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing database connection: {e}")
+        self._local = threading.local()
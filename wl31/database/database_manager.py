@@ -1,192 +1,97 @@
 # wl31/database/database_manager.py
 # 描述: 负责所有与 SQLite 数据库的交互。
 
+import json
 import sqlite3
 import os
-import numpy as np
+import re
 from wl31 import config # 使用绝对导入
-from wl31.utils.hash_utils import hash_password, verify_password
+from wl31.utils.hash_utils import hash_password, hash_passwords, verify_password
 from wl31.utils.pinyin_utils import convert_to_pinyin_initials
+from wl31.utils.prefix_index import PrefixIndex
+from wl31.database.connection_pool import ConnectionPool
+from wl31.database import migrations
+from wl31.database.action_log_writer import ActionLogWriter
+from wl31.database.grade_query import GradeQuery, GET_COURSES_BY_TEACHER_SQL, GET_STUDENT_GRADES_BY_COURSE_SQL
+from wl31.database.student_query import (STUDENT_FILTER_COLUMNS, STUDENT_SORT_COLUMNS, count_students_query,
+                                         student_list_query)
+from wl31.database.student_search import (SEARCH_STUDENTS_SQL, build_student_match_query,
+                                          index_students, rebuild_student_fts)
+from wl31.database.action_log_query import ActionLogQuery, build_match_query, rebuild_action_log_fts
+from wl31.database.grade_stats import (GET_CLASS_GRADE_STATS_SQL, grade_stats_dashboard_query, summarize,
+                                      rebuild_grade_stats)
+from wl31.database.transcript import (TranscriptCache, build_transcript, compute_gpa_report, semester_sort_key,
+                                     transcript_sql)
+from wl31.database.rankings import (GET_RANKINGS_SQL, GET_STUDENT_RANKINGS_SQL, OVERALL, SCOPES,
+                                    rebuild_rankings, refresh_rankings)
+from wl31.database.user_cache import UserCache
+from wl31.database.profiler import QueryProfiler
+from wl31.database.log_archiver import LogArchiver, archive_dir_for
+
+# 批量账户操作可用的过滤条件 -> 对应的列（学生信息来自 Students，教师信息来自 Teachers）
+USER_FILTER_COLUMNS = {
+    'user_id': 'u.id',
+    'role': 'u.role',
+    'student_id': 's.id',
+    'teacher_id': 't.id',
+    'class_name': 's.class_name',
+    'enrollment_year': 's.enrollment_year',
+    'major': 's.major',
+    'department': 'COALESCE(s.department, t.department)',
+}
 
 
 class DatabaseManager:
     """
     数据库管理类，负责所有数据库操作。
     """
-    def __init__(self, db_path=config.DATABASE_PATH):
+    def __init__(self, db_path=config.DATABASE_PATH, profile=config.DB_PROFILING):
         """
-        初始化数据库连接，并确保所有表都已创建。
+        初始化数据库连接池，并确保所有表都已创建。
         :param db_path: 数据库文件的路径。
+        :param profile: 是否启用性能分析（记录方法/SQL 延迟和慢查询日志）。
         """
         self.db_path = db_path
         # 确保数据库所在的目录存在
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row # 将元组结果转换为类似字典的对象
-        self.cursor = self.conn.cursor()
-        self._run_migrations() # 运行数据库迁移
-        self._create_tables()
-        self._create_default_admin_if_not_exists()
-
-    def _create_tables(self):
-        """
-        创建所有必要的数据库表（如果它们不存在）。
-        """
-        # 用户表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL CHECK(role IN ('admin', 'teacher', 'student')),
-            student_id INTEGER UNIQUE,
-            is_frozen INTEGER NOT NULL DEFAULT 0,
-            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            last_login_at TEXT,
-            FOREIGN KEY(student_id) REFERENCES Students(id)
-        );
-        ''')
-
-        # 学生信息表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Students (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            name_pinyin TEXT,
-            gender TEXT CHECK(gender IN ('男', '女')),
-            enrollment_year INTEGER,
-            department TEXT,
-            major TEXT,
-            class_name TEXT,
-            contact_info TEXT,
-            id_card TEXT,
-            archive_path TEXT
-        );
-        ''')
-
-        # 教师信息表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Teachers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL UNIQUE,
-            name TEXT NOT NULL,
-            title TEXT,
-            department TEXT,
-            contact_info TEXT,
-            id_card TEXT,
-            FOREIGN KEY(user_id) REFERENCES Users(id) ON DELETE CASCADE
-        );
-        ''')
-
-        # 课程表
-        # 设计决策：根据功能要求，将授课教师和学期直接作为课程属性。
-        # 这简化了UI和逻辑，因此移除了多对多的TeacherCourses表。
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Courses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            credits REAL NOT NULL,
-            teacher_id INTEGER,
-            semester TEXT,
-            description TEXT,
-            FOREIGN KEY(teacher_id) REFERENCES Teachers(id) ON DELETE SET NULL
-        );
-        ''')
-
-        # 成绩表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Grades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            course_id INTEGER NOT NULL,
-            score REAL NOT NULL,
-            recorded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            recorder_id INTEGER NOT NULL,
-            UNIQUE (student_id, course_id),
-            FOREIGN KEY(student_id) REFERENCES Students(id),
-            FOREIGN KEY(course_id) REFERENCES Courses(id),
-            FOREIGN KEY(recorder_id) REFERENCES Users(id)
-        );
-        ''')
-
-        # 操作日志表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ActionLogs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            action_type TEXT NOT NULL,
-            description TEXT NOT NULL,
-            timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(user_id) REFERENCES Users(id)
-        );
-        ''')
-
-        self.conn.commit()
-
-    def _create_default_admin_if_not_exists(self):
-        """如果不存在任何管理员，则创建一个默认管理员账户。"""
-        self.cursor.execute("SELECT id FROM Users WHERE role = 'admin'")
-        if self.cursor.fetchone() is None:
-            print("No admin user found. Creating default admin...")
-            default_username = "admin"
-            default_password = "admin123"
-            hashed_pass = hash_password(default_password)
-            try:
-                self.cursor.execute(
-                    "INSERT INTO Users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (default_username, hashed_pass, 'admin')
-                )
-                self.conn.commit()
-                print(f"Default admin created. Username: {default_username}, Password: {default_password}")
-            except sqlite3.IntegrityError:
-                # In case of a race condition where another process creates it
-                self.conn.rollback()
-
-    def _run_migrations(self):
-        """
-        执行数据库迁移，确保表结构是最新的。
-        这对于向后兼容旧的数据库文件至关重要。
-        """
-        try:
-            # 1. 检查 Students 表的列
-            self.cursor.execute("PRAGMA table_info(Students);")
-            columns_info = self.cursor.fetchall()
-            column_names = {info['name'] for info in columns_info}
-
-            # 2. 如果缺少 enrollment_year 列，则添加它
-            if 'enrollment_year' not in column_names:
-                print("Migrating database: Adding 'enrollment_year' to Students table...")
-                self.cursor.execute("ALTER TABLE Students ADD COLUMN enrollment_year INTEGER;")
-
-            # 3. 如果缺少 department 列，则添加它
-            if 'department' not in column_names:
-                print("Migrating database: Adding 'department' to Students table...")
-                self.cursor.execute("ALTER TABLE Students ADD COLUMN department TEXT;")
-
-            # 4. 如果缺少 major 列，则添加它
-            if 'major' not in column_names:
-                print("Migrating database: Adding 'major' to Students table...")
-                self.cursor.execute("ALTER TABLE Students ADD COLUMN major TEXT;")
-
-            # 5. 为 Students 表添加 id_card
-            if 'id_card' not in column_names:
-                print("Migrating database: Adding 'id_card' to Students table...")
-                self.cursor.execute("ALTER TABLE Students ADD COLUMN id_card TEXT;")
-
-            # 6. 为 Teachers 表添加 id_card
-            self.cursor.execute("PRAGMA table_info(Teachers);")
-            teacher_columns_info = self.cursor.fetchall()
-            teacher_column_names = {info['name'] for info in teacher_columns_info}
-            if 'id_card' not in teacher_column_names:
-                print("Migrating database: Adding 'id_card' to Teachers table...")
-                self.cursor.execute("ALTER TABLE Teachers ADD COLUMN id_card TEXT;")
-
-            self.conn.commit()
-            print("Database migration check completed.")
-        except sqlite3.Error as e:
-            print(f"An error occurred during database migration: {e}")
-            self.conn.rollback()
-
+        self.profiler = QueryProfiler() if profile else None
+        # 每个线程使用独立的连接，后台任务可以与界面操作并行访问数据库
+        if self.profiler:
+            self.pool = ConnectionPool(self.db_path, connection_factory=self.profiler.connection_factory)
+        else:
+            self.pool = ConnectionPool(self.db_path)
+        # 版本化迁移: 已是最新版本的数据库只需读取一次 user_version
+        migrations.apply_migrations(self.conn)
+        # 学生拼音首字母/学号的内存前缀索引，第一次搜索时才加载，之后搜索无需访问数据库
+        self.student_search_index = PrefixIndex(self._load_student_search_index)
+        # 学生成绩单和 GPA 报表，成绩变化时失效
+        self.transcript_cache = TranscriptCache()
+        self._transcript_sql = transcript_sql()
+        # 用户/学生/教师身份信息的 LRU 缓存，修改用户的方法负责使其失效
+        self.user_cache = UserCache()
+        # 操作日志由后台线程批量写入，不再为每条日志单独提交
+        self.action_log_writer = ActionLogWriter(self.pool)
+        # 超过保留期的操作日志在后台归档为压缩文件，表中只保留近期日志
+        self.log_archiver = LogArchiver(self.pool, archive_dir_for(self.db_path))
+        if config.ACTION_LOG_AUTO_ARCHIVE:
+            self.log_archiver.start()
+        if self.profiler:
+            self.profiler.instrument(self)
+
+    @property
+    def conn(self):
+        """当前线程的写连接。"""
+        return self.pool.writer()
+
+    @property
+    def cursor(self):
+        """当前线程写连接上的游标，所有写操作及其事务内的查询都应使用它。"""
+        return self.pool.write_cursor()
+
+    @property
+    def read_cursor(self):
+        """当前线程只读连接上的游标，用于不参与事务的纯查询。"""
+        return self.pool.read_cursor()
 
     def get_user(self, username: str):
         """
@@ -194,20 +99,39 @@ class DatabaseManager:
         :param username: 登录用户名。
         :return: 包含用户信息的字典，或在未找到时返回 None。
         """
-        self.cursor.execute("SELECT id, username, password_hash, role, student_id, is_frozen, last_login_at FROM Users WHERE username = ?", (username,))
-        user_data = self.cursor.fetchone()
+        user_data = self.user_cache.get_by_username(username)
+        if user_data:
+            return user_data
+        self.read_cursor.execute("SELECT id, username, password_hash, role, student_id, is_frozen, last_login_at FROM Users WHERE username = ?", (username,))
+        user_data = self.read_cursor.fetchone()
         if user_data:
+            self.user_cache.put(user_data['id'], 'user', user_data)
             return dict(user_data)
         return None
 
     def get_user_by_id(self, user_id: int):
         """根据用户ID查询用户信息"""
-        self.cursor.execute("SELECT id, username, password_hash, role, student_id, is_frozen, last_login_at FROM Users WHERE id = ?", (user_id,))
-        user_data = self.cursor.fetchone()
+        user_data = self.user_cache.get(user_id)
         if user_data:
+            return user_data
+        self.read_cursor.execute("SELECT id, username, password_hash, role, student_id, is_frozen, last_login_at FROM Users WHERE id = ?", (user_id,))
+        user_data = self.read_cursor.fetchone()
+        if user_data:
+            self.user_cache.put(user_id, 'user', user_data)
             return dict(user_data)
         return None
 
+    def get_user_cache_stats(self):
+        """返回用户缓存的命中/未命中统计。"""
+        return self.user_cache.stats()
+
+    def _invalidate_student_user(self, student_id):
+        """使学生关联用户的缓存失效。"""
+        self.cursor.execute("SELECT id FROM Users WHERE student_id = ?", (student_id,))
+        row = self.cursor.fetchone()
+        if row:
+            self.user_cache.invalidate(row['id'])
+
     def check_username_exists(self, username: str) -> bool:
         """
         检查用户名是否已存在。
@@ -259,26 +183,284 @@ class DatabaseManager:
                 (user_id,)
             )
             self.conn.commit()
+            self.user_cache.invalidate(user_id)
         except sqlite3.Error as e:
             print(f"Error updating last login time: {e}")
 
+    def set_user_account_status(self, admin_id, user_id, is_frozen):
+        """
+        冻结或解冻用户账户。
+        :param is_frozen: 1 表示冻结，0 表示解冻。
+        :return: 成功返回 True，否则返回 False。
+        """
+        try:
+            self.cursor.execute("UPDATE Users SET is_frozen = ? WHERE id = ?", (int(is_frozen), user_id))
+            if self.cursor.rowcount == 0:
+                self.conn.rollback()
+                return False
+            self.conn.commit()
+            self.user_cache.invalidate(user_id)
+            action = 'FREEZE_ACCOUNT' if is_frozen else 'UNFREEZE_ACCOUNT'
+            self.log_action(admin_id, action, f'Set account status of user ID {user_id} to {int(is_frozen)}')
+            return True
+        except sqlite3.Error as e:
+            print(f"Error setting account status: {e}")
+            self.conn.rollback()
+            return False
+
+    def reset_user_password(self, admin_id, user_id, new_password):
+        """
+        管理员重置用户密码。
+        :return: 成功返回 True，否则返回 False。
+        """
+        hashed_password = hash_password(new_password)
+        try:
+            self.cursor.execute("UPDATE Users SET password_hash = ? WHERE id = ?", (hashed_password, user_id))
+            if self.cursor.rowcount == 0:
+                self.conn.rollback()
+                return False
+            self.conn.commit()
+            self.user_cache.invalidate(user_id)
+            self.log_action(admin_id, 'RESET_PASSWORD', f'Reset password for user ID {user_id}')
+            return True
+        except sqlite3.Error as e:
+            print(f"Error resetting password: {e}")
+            self.conn.rollback()
+            return False
+
+    @staticmethod
+    def _build_account_query(filters, columns="u.id"):
+        """
+        生成按过滤条件选出用户账户的查询。
+        :param filters: 键为 USER_FILTER_COLUMNS 中的条件，值为列表/元组时匹配其中任一值。
+                        至少需要一个条件，避免误操作全部账户。
+        :return: (sql, params)
+        """
+        clauses, params = [], []
+        for name, value in (filters or {}).items():
+            if name not in USER_FILTER_COLUMNS:
+                raise ValueError(f"Unsupported account filter: {name}")
+            if value is None or value == '':
+                continue
+            if isinstance(value, (list, tuple, set)):
+                # 以一个 JSON 参数传入任意多个值，不受 SQL 参数个数的限制
+                clauses.append(f"{USER_FILTER_COLUMNS[name]} IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(value)))
+            else:
+                clauses.append(f"{USER_FILTER_COLUMNS[name]} = ?")
+                params.append(value)
+        if not clauses:
+            raise ValueError("At least one account filter is required")
+        sql = f"""SELECT {columns}
+                  FROM Users u
+                  LEFT JOIN Students s ON s.id = u.student_id
+                  LEFT JOIN Teachers t ON t.user_id = u.id
+                  WHERE {" AND ".join(clauses)}"""
+        return sql, params
+
+    @staticmethod
+    def _describe_filters(filters):
+        """把过滤条件写成操作日志中的文字。"""
+        return ", ".join(f"{name}={value}" for name, value in filters.items() if value not in (None, ''))
+
+    def set_accounts_status(self, admin_id, is_frozen, filters):
+        """
+        在一个事务中批量冻结或解冻账户，如冻结某一届全部学生: {'role': 'student', 'enrollment_year': 2021}。
+        管理员不会冻结自己的账户。
+        :param is_frozen: 1 表示冻结，0 表示解冻。
+        :param filters: 账户过滤条件（见 USER_FILTER_COLUMNS），如 {'user_id': [3, 5, 8]}。
+        :return: 状态实际发生变化的账户数；出错时返回 None（已全部回滚）。
+        """
+        is_frozen = int(is_frozen)
+        query, params = self._build_account_query(filters)
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute(query, params)
+            user_ids = [row['id'] for row in self.cursor.fetchall() if row['id'] != admin_id]
+            self.cursor.execute(
+                "SELECT id FROM Users WHERE id IN (SELECT value FROM json_each(?)) AND is_frozen != ?",
+                (json.dumps(user_ids), is_frozen)
+            )
+            changed_ids = [row['id'] for row in self.cursor.fetchall()]
+            self.cursor.execute(
+                "UPDATE Users SET is_frozen = ? WHERE id IN (SELECT value FROM json_each(?))",
+                (is_frozen, json.dumps(changed_ids))
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error setting account status: {e}")
+            self.conn.rollback()
+            return None
+
+        for user_id in changed_ids:
+            self.user_cache.invalidate(user_id)
+        if changed_ids:
+            action = 'FREEZE_ACCOUNT' if is_frozen else 'UNFREEZE_ACCOUNT'
+            self.log_action(admin_id, action, f'Set account status of {len(changed_ids)} users to {is_frozen} '
+                                              f'({self._describe_filters(filters)})')
+        return len(changed_ids)
+
+    def reset_passwords(self, admin_id, filters, new_password=None):
+        """
+        批量重置密码。密码在所有 CPU 核心上并行哈希（此时不持有写锁），再在一个事务中写入。
+        与批量冻结一样，管理员不会重置自己的密码。
+        :param filters: 账户过滤条件（见 USER_FILTER_COLUMNS），如 {'class_name': '软件工程2301班'}。
+        :param new_password: 新密码；为 None 时使用身份证号后六位（与批量导入的默认密码一致），
+                             没有身份证号的账户会被跳过。
+        :return: (重置的账户数, 跳过的账户数)；出错时返回 None（已全部回滚）。
+        """
+        query, params = self._build_account_query(filters, columns="u.id, COALESCE(s.id_card, t.id_card) AS id_card")
+        try:
+            self.read_cursor.execute(query, params)
+            accounts = [row for row in self.read_cursor.fetchall() if row['id'] != admin_id]
+        except sqlite3.Error as e:
+            print(f"Error selecting accounts: {e}")
+            return None
+        if new_password is None:
+            targets = [(row['id'], str(row['id_card'])[-6:]) for row in accounts if row['id_card']]
+        else:
+            targets = [(row['id'], new_password) for row in accounts]
+        skipped = len(accounts) - len(targets)
+        if not targets:
+            return 0, skipped
+
+        password_hashes = hash_passwords(password for _, password in targets)
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.executemany(
+                "UPDATE Users SET password_hash = ? WHERE id = ?",
+                [(password_hash, user_id) for (user_id, _), password_hash in zip(targets, password_hashes)]
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error resetting passwords: {e}")
+            self.conn.rollback()
+            return None
+
+        for user_id, _ in targets:
+            self.user_cache.invalidate(user_id)
+        self.log_action(admin_id, 'RESET_PASSWORD', f'Reset password for {len(targets)} users '
+                                                    f'({self._describe_filters(filters)})')
+        return len(targets), skipped
+
+    def update_user_profile(self, user_id, old_password, new_password):
+        """
+        用户修改自己的密码，需验证当前密码。
+        :return: 成功返回 True，当前密码错误或出错时返回 False。
+        """
+        user = self.get_user_by_id(user_id)
+        if not user or not verify_password(old_password, user['password_hash']):
+            return False
+        hashed_password = hash_password(new_password)
+        try:
+            self.cursor.execute("UPDATE Users SET password_hash = ? WHERE id = ?", (hashed_password, user_id))
+            self.conn.commit()
+            self.user_cache.invalidate(user_id)
+            self.log_action(user_id, 'CHANGE_PASSWORD', 'Changed own password')
+            return True
+        except sqlite3.Error as e:
+            print(f"Error updating profile: {e}")
+            self.conn.rollback()
+            return False
+
     # --- 学生信息管理 ---
 
+    def _set_student_pinyin(self, student_id, name):
+        """在当前事务中更新学生的拼音首字母（不提交），返回计算出的拼音首字母。"""
+        pinyin_initials = convert_to_pinyin_initials(name)
+        self.cursor.execute("UPDATE Students SET name_pinyin = ? WHERE id = ?", (pinyin_initials, student_id))
+        return pinyin_initials
+
     def update_student_pinyin(self, student_id, name):
         """根据姓名更新学生的拼音首字母"""
-        pinyin_initials = convert_to_pinyin_initials(name)
         try:
-            self.cursor.execute("UPDATE Students SET name_pinyin = ? WHERE id = ?", (pinyin_initials, student_id))
+            self._set_student_pinyin(student_id, name)
             self.conn.commit()
         except sqlite3.Error as e:
             print(f"Error updating pinyin for student {student_id}: {e}")
 
-    def get_all_students(self, filters=None, sort_by=None):
-        """获取学生列表，支持过滤和排序"""
-        query = "SELECT id, name, gender, enrollment_year, department, major, class_name, contact_info FROM Students ORDER BY id"
-        # TODO: Add filtering and sorting logic
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+    # --- 学生拼音前缀索引 ---
+
+    def _load_student_search_index(self):
+        """从数据库读取所有学生，作为前缀索引的 (学号, 搜索键, 记录)。"""
+        self.read_cursor.execute("SELECT id, name, name_pinyin, class_name FROM Students")
+        return [
+            (row['id'],
+             (row['name_pinyin'] if row['name_pinyin'] is not None else convert_to_pinyin_initials(row['name']), row['id']),
+             {'id': row['id'], 'name': row['name'], 'class_name': row['class_name']})
+            for row in self.read_cursor.fetchall()
+        ]
+
+    def _index_student(self, student_id, name, class_name, pinyin_initials):
+        """将新增或修改后的学生写入前缀索引（需在事务提交后调用）。"""
+        self.student_search_index.add(
+            student_id, (pinyin_initials, student_id),
+            {'id': student_id, 'name': name, 'class_name': class_name}
+        )
+
+    def search_students_by_pinyin(self, prefix, limit=None):
+        """
+        按拼音首字母或学号前缀搜索学生（即时搜索），直接查询内存索引，不访问数据库。
+        第一次调用时加载索引（10 万学生约需数百毫秒），之后每次查询在 1 毫秒以内。
+        :param prefix: 拼音首字母或学号的前缀，不区分大小写。
+        :param limit: 最多返回的条数。
+        :return: 包含 id, name, class_name 的字典列表。
+        """
+        return self.student_search_index.search(prefix, limit)
+
+    def search_students(self, query, limit=config.STUDENT_SEARCH_LIMIT):
+        """
+        多字段搜索学生: 学号、姓名（任意连续片段）、全拼、拼音首字母（多音字的每种读音都可命中）、
+        班级、学院、专业，结果按相关度排序。
+        :param query: 搜索内容，空白分隔的多个词需同时命中，如 "zhangs 软件"。
+        :param limit: 最多返回的条数。
+        :return: 与 get_all_students 字段相同的字典列表。
+        """
+        match = build_student_match_query(query)
+        if match is None:
+            return []
+        try:
+            self.read_cursor.execute(SEARCH_STUDENTS_SQL, (match, -1 if limit is None else limit))
+            return [dict(row) for row in self.read_cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error searching students: {e}")
+            return []
+
+    def rebuild_student_search_index(self):
+        """按 Students 表完整重建学生全文索引，内存前缀索引在下次搜索时重新加载。"""
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            rebuild_student_fts(self.cursor)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Error rebuilding student search index: {e}")
+            return False
+        self.student_search_index.invalidate()
+        return True
+
+    def get_all_students(self, filters=None, sort_by=None, limit=None, after=None, descending=False):
+        """
+        获取学生列表，支持过滤、排序和键集分页（SQL 由 student_list_query 生成）。
+        :param filters: 过滤条件字典，键为 department/major/class_name/enrollment_year/gender。
+        :param sort_by: 排序列，必须在 STUDENT_SORT_COLUMNS 中，默认按学号排序。
+        :param limit: 每页条数，为 None 时返回全部结果。
+        :param after: 上一页的最后一行，返回排在它之后的数据。
+        :param descending: 是否降序排列。
+        """
+        query, params = student_list_query(filters, sort_by, limit, after, descending)
+        self.read_cursor.execute(query, params)
+        return self.read_cursor.fetchall()
+
+    def count_students(self, filters=None):
+        """统计满足过滤条件的学生人数"""
+        self.read_cursor.execute(*count_students_query(filters))
+        return self.read_cursor.fetchone()[0]
+
+    def get_class_names(self):
+        """获取所有不重复的班级名称（按名称排序）"""
+        self.read_cursor.execute("SELECT DISTINCT class_name FROM Students WHERE class_name IS NOT NULL AND class_name != '' ORDER BY class_name")
+        return [row['class_name'] for row in self.read_cursor.fetchall()]
 
     def add_student_record(self, user_id, student_info):
         """添加单个学生记录，并创建关联的用户账号"""
@@ -294,7 +476,8 @@ class DatabaseManager:
                 )
             )
             student_id = self.cursor.lastrowid
-            self.update_student_pinyin(student_id, student_info['name'])
+            pinyin_initials = self._set_student_pinyin(student_id, student_info['name'])
+            index_students(self.cursor, [dict(student_info, id=student_id)], replace=False)
 
             # 2. 创建关联的用户账号 (使用学号作为默认用户名)
             username = str(student_id) # 使用自增ID作为学号和用户名
@@ -305,6 +488,7 @@ class DatabaseManager:
             )
             
             self.conn.commit()
+            self._index_student(student_id, student_info['name'], student_info['class_name'], pinyin_initials)
             self.log_action(user_id, 'ADD_STUDENT', f'Added student {student_info["name"]} with ID {student_id} and user account {username}')
             return student_id
         except sqlite3.IntegrityError as e:
@@ -318,8 +502,8 @@ class DatabaseManager:
 
     def get_student_by_id(self, student_id):
         """根据ID获取单个学生信息"""
-        self.cursor.execute("SELECT * FROM Students WHERE id = ?", (student_id,))
-        student_data = self.cursor.fetchone()
+        self.read_cursor.execute("SELECT * FROM Students WHERE id = ?", (student_id,))
+        student_data = self.read_cursor.fetchone()
         if student_data:
             return dict(student_data)
         return None
@@ -327,6 +511,8 @@ class DatabaseManager:
     def update_student_record(self, user_id, student_id, new_info):
         """更新学生信息，并可选择重置密码"""
         try:
+            self.cursor.execute("SELECT class_name FROM Students WHERE id = ?", (student_id,))
+            old_student = self.cursor.fetchone()
             self.cursor.execute(
                 """UPDATE Students SET name=?, gender=?, enrollment_year=?, department=?, major=?, class_name=?, contact_info=?, archive_path=?
                    WHERE id=?""",
@@ -336,7 +522,8 @@ class DatabaseManager:
                     new_info['contact_info'], new_info.get('archive_path'), student_id
                 )
             )
-            self.update_student_pinyin(student_id, new_info['name'])
+            pinyin_initials = self._set_student_pinyin(student_id, new_info['name'])
+            index_students(self.cursor, [dict(new_info, id=student_id)])
 
             # 如果提供了新密码，则更新用户密码
             if new_info.get('password'):
@@ -347,7 +534,12 @@ class DatabaseManager:
                 )
                 self.log_action(user_id, 'RESET_PASSWORD', f'Reset password for student ID {student_id}')
 
+            self._invalidate_student_user(student_id)
             self.conn.commit()
+            self._index_student(student_id, new_info['name'], new_info['class_name'], pinyin_initials)
+            if old_student and old_student['class_name'] != new_info['class_name']:
+                # 转班后按班级统计的 GPA 报表已变化（成绩统计由 GradeStats 触发器维护）
+                self.transcript_cache.invalidate_reports()
             self.log_action(user_id, 'UPDATE_STUDENT', f'Updated student with ID {student_id}')
             return True
         except sqlite3.Error as e:
@@ -357,82 +549,196 @@ class DatabaseManager:
 
     def delete_student_record(self, admin_id, student_id):
         """删除学生记录，并级联删除关联的用户账户和成绩"""
+        return self.delete_students(admin_id, [student_id]) is not None
+
+    def delete_students(self, admin_id, student_ids):
+        """
+        在一个事务中删除一批学生。关联的用户账户和成绩由外键级联删除，
+        GradeStats 和学生全文索引由触发器同步，整批只记录一条操作日志。
+        :param student_ids: 学生ID列表。
+        :return: 实际删除的学生数；出错时返回 None（已全部回滚）。
+        """
+        ids = json.dumps(sorted({int(student_id) for student_id in student_ids}))
         try:
-            # First, delete the associated user account
-            self.cursor.execute("DELETE FROM Users WHERE student_id = ?", (student_id,))
-            # Then, delete grades associated with the student
-            self.cursor.execute("DELETE FROM Grades WHERE student_id = ?", (student_id,))
-            # Finally, delete the student record
-            self.cursor.execute("DELETE FROM Students WHERE id = ?", (student_id,))
+            self.cursor.execute("BEGIN IMMEDIATE")
+            # 先记下受影响的账户和班级，提交后使内存缓存失效
+            self.cursor.execute(
+                """SELECT s.id, s.class_name, u.id AS user_id
+                   FROM Students s LEFT JOIN Users u ON u.student_id = s.id
+                   WHERE s.id IN (SELECT value FROM json_each(?))""",
+                (ids,)
+            )
+            students = self.cursor.fetchall()
+            self.cursor.execute("DELETE FROM Students WHERE id IN (SELECT value FROM json_each(?))", (ids,))
             self.conn.commit()
-            self.log_action(admin_id, 'DELETE_STUDENT', f'Deleted student with ID {student_id} and associated user account and grades.')
-            return True
         except sqlite3.Error as e:
-            print(f"Error deleting student: {e}")
+            print(f"Error deleting students: {e}")
             self.conn.rollback()
-            return False
+            return None
 
-    def batch_import_students(self, admin_id, students_data):
+        for student in students:
+            self.student_search_index.remove(student['id'])
+            if student['user_id'] is not None:
+                self.user_cache.invalidate(student['user_id'])
+        self.transcript_cache.invalidate_students([student['id'] for student in students])
+        if len(students) == 1:
+            self.log_action(admin_id, 'DELETE_STUDENT', f'Deleted student with ID {students[0]["id"]} and associated user account and grades.')
+        elif students:
+            self.log_action(admin_id, 'DELETE_STUDENT',
+                            f'Deleted {len(students)} students with IDs {", ".join(str(student["id"]) for student in students)} '
+                            f'and associated user accounts and grades.')
+        return len(students)
+
+    def _reserve_ids(self, table, count):
         """
-        从Excel批量导入学生数据，并自动创建用户账户。
-        列顺序: 学院, 班级, 姓名, 性别, 入学年份, 身份证号, 联系方式
+        在当前写事务中为 AUTOINCREMENT 表预留一段连续的主键。
+        调用方必须已通过 BEGIN IMMEDIATE 持有写锁，否则预留的主键可能被其他连接占用。
+        """
+        self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+        row = self.cursor.fetchone()
+        last_seq = row[0] if row else 0
+        self.cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        start = max(last_seq, self.cursor.fetchone()[0]) + 1
+        return list(range(start, start + count))
+
+    def _insert_in_chunks(self, rows, insert_rows):
+        """
+        在当前事务中按块写入数据。
+        每块在一个保存点内通过 insert_rows（内部使用 executemany）一次写入；
+        某块失败时回滚到该块的保存点并逐行重试，只跳过出错的行。
+        :param rows: 待写入的行列表。
+        :param insert_rows: 接收行列表并执行写入的函数。
+        :return: (成功写入的行数, [(失败的行, 异常), ...])
         """
         success_count = 0
-        failure_count = 0
-        errors = []
+        failed_rows = []
+        chunk_size = config.IMPORT_CHUNK_SIZE
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            self.cursor.execute("SAVEPOINT import_chunk")
+            try:
+                insert_rows(chunk)
+                self.cursor.execute("RELEASE SAVEPOINT import_chunk")
+                success_count += len(chunk)
+                continue
+            except sqlite3.Error:
+                self.cursor.execute("ROLLBACK TO SAVEPOINT import_chunk")
+                self.cursor.execute("RELEASE SAVEPOINT import_chunk")
+
+            # 整块写入失败，逐行重试以找出并跳过出错的行
+            for row in chunk:
+                self.cursor.execute("SAVEPOINT import_row")
+                try:
+                    insert_rows([row])
+                    self.cursor.execute("RELEASE SAVEPOINT import_row")
+                    success_count += 1
+                except sqlite3.IntegrityError as e:
+                    self.cursor.execute("ROLLBACK TO SAVEPOINT import_row")
+                    self.cursor.execute("RELEASE SAVEPOINT import_row")
+                    failed_rows.append((row, e))
+        return success_count, failed_rows
+
+    def _prepare_student_import_rows(self, students_data):
+        """
+        导入前统一校验学生数据，并在 Python 中算好拼音和默认密码。
+        :return: (可导入的行列表, 校验失败的错误信息列表)
+        """
+        required_fields = ['department', 'class', 'name', 'gender', 'enrollment_year', 'id_card']
+        rows, errors = [], []
         for student_info in students_data:
+            if not all(student_info.get(field) for field in required_fields):
+                errors.append(f"记录 {student_info} 缺少必要字段。")
+                continue
+            if student_info['gender'] not in ('男', '女'):
+                errors.append(f"学生 {student_info['name']} 的性别 '{student_info['gender']}' 无效。")
+                continue
             try:
-                # 验证数据完整性
-                required_fields = ['department', 'class', 'name', 'gender', 'enrollment_year', 'id_card']
-                if not all(student_info.get(field) for field in required_fields):
-                    failure_count += 1
-                    errors.append(f"记录 {student_info} 缺少必要字段。")
-                    continue
-
-                # 1. 插入学生记录
-                self.cursor.execute(
-                    """INSERT INTO Students (department, class_name, name, gender, enrollment_year, id_card, contact_info)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        student_info['department'], student_info['class'], student_info['name'],
-                        student_info['gender'], student_info['enrollment_year'], student_info['id_card'],
-                        student_info.get('contact')
-                    )
-                )
-                student_id = self.cursor.lastrowid
-                self.update_student_pinyin(student_id, student_info['name'])
-
-                # 2. 创建关联的用户账号
-                # 使用学号作为用户名，身份证后六位作为默认密码
-                username = str(student_id)
-                default_password = str(student_info['id_card'])[-6:]
-                hashed_password = hash_password(default_password)
-                
-                self.cursor.execute(
-                    "INSERT INTO Users (username, password_hash, role, student_id) VALUES (?, ?, ?, ?)",
-                    (username, hashed_password, 'student', student_id)
-                )
-                
-                success_count += 1
-            except sqlite3.IntegrityError as e:
-                failure_count += 1
-                errors.append(f"导入学生 {student_info.get('name', 'N/A')} 失败 (可能学号或用户名已存在): {e}")
-                self.conn.rollback()
-            except Exception as e:
-                failure_count += 1
-                errors.append(f"处理学生 {student_info.get('name', 'N/A')} 时发生未知错误: {e}")
-                self.conn.rollback()
+                enrollment_year = int(student_info['enrollment_year'])
+            except (TypeError, ValueError):
+                errors.append(f"学生 {student_info['name']} 的入学年份 '{student_info['enrollment_year']}' 无效。")
+                continue
+            rows.append({
+                'department': student_info['department'],
+                'major': student_info.get('major'),
+                'class_name': student_info['class'],
+                'name': student_info['name'],
+                'name_pinyin': convert_to_pinyin_initials(student_info['name']),
+                'gender': student_info['gender'],
+                'enrollment_year': enrollment_year,
+                'id_card': str(student_info['id_card']),
+                'contact_info': student_info.get('contact'),
+                # 身份证后六位作为默认密码
+                'password': str(student_info['id_card'])[-6:],
+            })
+        return rows, errors
+
+    def _insert_imported_students(self, rows):
+        """在当前事务中批量写入学生及其用户账户（rows 中需已包含 id 和 password_hash）。"""
+        self.cursor.executemany(
+            """INSERT INTO Students (id, department, major, class_name, name, name_pinyin, gender, enrollment_year, id_card, contact_info)
+               VALUES (:id, :department, :major, :class_name, :name, :name_pinyin, :gender, :enrollment_year, :id_card, :contact_info)""",
+            rows
+        )
+        # 使用学号作为用户名
+        self.cursor.executemany(
+            "INSERT INTO Users (username, password_hash, role, student_id) VALUES (:username, :password_hash, 'student', :id)",
+            rows
+        )
+        index_students(self.cursor, rows, replace=False)
+
+    def batch_import_students(self, admin_id, students_data):
+        """
+        从Excel批量导入学生数据，并自动创建用户账户。
+        列顺序: 学院, 班级, 姓名, 性别, 入学年份, 身份证号, 联系方式（可选字段 major 为专业）
+
+        所有数据先统一校验，再在一个事务内按块使用 executemany 写入。
+        某一块写入失败时回滚到该块的保存点，逐行重试，
+        只有出错的行被拒绝，已成功的行不受影响。
+        """
+        rows, errors = self._prepare_student_import_rows(students_data)
+        invalid_count = failure_count = len(errors)
+        if not rows:
+            return 0, failure_count, errors
+
+        # bcrypt 是导入的主要耗时，在所有核心上并行计算
+        password_hashes = hash_passwords(row.pop('password') for row in rows)
+        for row, password_hash in zip(rows, password_hashes):
+            row['password_hash'] = password_hash
+
+        try:
+            # 立即获取写锁，保证预留的学号不会被其他连接占用
+            self.cursor.execute("BEGIN IMMEDIATE")
+            for row, student_id in zip(rows, self._reserve_ids('Students', len(rows))):
+                row['id'] = student_id
+                row['username'] = str(student_id)
+
+            success_count, failed_rows = self._insert_in_chunks(rows, self._insert_imported_students)
+            for row, e in failed_rows:
+                errors.append(f"导入学生 {row['name']} 失败 (可能学号或用户名已存在): {e}")
+            failure_count += len(failed_rows)
+            self.conn.commit()
+            failed_ids = {row['id'] for row, _ in failed_rows}
+            for row in rows:
+                if row['id'] not in failed_ids:
+                    self._index_student(row['id'], row['name'], row['class_name'], row['name_pinyin'])
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            errors.append(f"批量导入学生时发生数据库错误，本次导入已全部回滚: {e}")
+            return 0, invalid_count + len(rows), errors
 
-        self.conn.commit()
         if success_count > 0:
             self.log_action(admin_id, 'BATCH_IMPORT_STUDENTS', f'Batch imported {success_count} students.')
         return success_count, failure_count, errors
 
     def get_student_by_user_id(self, user_id):
         """根据用户ID获取学生信息"""
-        self.cursor.execute("SELECT s.* FROM Students s JOIN Users u ON s.id = u.student_id WHERE u.id = ?", (user_id,))
-        student_data = self.cursor.fetchone()
+        student_data = self.user_cache.get(user_id, 'student')
         if student_data:
+            return student_data
+        self.read_cursor.execute("SELECT s.* FROM Students s JOIN Users u ON s.id = u.student_id WHERE u.id = ?", (user_id,))
+        student_data = self.read_cursor.fetchone()
+        if student_data:
+            self.user_cache.put(user_id, 'student', student_data)
             return dict(student_data)
         return None
 
@@ -446,8 +752,8 @@ class DatabaseManager:
             JOIN Users u ON t.user_id = u.id
             ORDER BY t.id
         """
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        self.read_cursor.execute(query)
+        return self.read_cursor.fetchall()
 
     def add_teacher(self, admin_id, teacher_info):
         """添加新教师及其用户账户"""
@@ -499,6 +805,7 @@ class DatabaseManager:
                 self.log_action(admin_id, 'RESET_PASSWORD', f'Reset password for teacher {new_info["name"]}')
 
             self.conn.commit()
+            self.user_cache.invalidate(user_id)
             self.log_action(admin_id, 'UPDATE_TEACHER', f"Updated teacher {new_info['name']}")
             return True
         except sqlite3.Error as e:
@@ -507,10 +814,16 @@ class DatabaseManager:
             return False
 
     def delete_teacher(self, admin_id, teacher_id):
-        """删除教师记录（关联的User记录会通过外键级联删除）"""
+        """删除教师的用户账户，教师记录通过外键级联删除，其授课课程的教师置空"""
         try:
+            self.cursor.execute("SELECT user_id FROM Teachers WHERE id = ?", (teacher_id,))
+            teacher = self.cursor.fetchone()
+            if teacher:
+                self.cursor.execute("DELETE FROM Users WHERE id = ?", (teacher['user_id'],))
             self.cursor.execute("DELETE FROM Teachers WHERE id = ?", (teacher_id,))
             self.conn.commit()
+            if teacher:
+                self.user_cache.invalidate(teacher['user_id'])
             self.log_action(admin_id, 'DELETE_TEACHER', f'Deleted teacher with ID {teacher_id}')
             return True
         except sqlite3.Error as e:
@@ -518,72 +831,120 @@ class DatabaseManager:
             self.conn.rollback()
             return False
 
+    def _allocate_usernames(self, base_names):
+        """
+        为一批建议用户名分配不重复的最终用户名（需在写事务中调用）。
+        每个不同的前缀只查询一次已有用户名，后缀在内存中分配，
+        同一批数据内部的重名也会依次加上后缀。
+        规则与逐个检查时一致: 先尝试原名，再依次尝试 name1, name2, ...
+        :param base_names: 建议用户名列表。
+        :return: 与输入顺序一致的最终用户名列表。
+        """
+        used = {}
+        for base in set(base_names):
+            # 原名及 "原名+数字" 都落在 username 唯一索引的 [base, base + ':') 区间内（':' 紧跟在 '9' 之后）
+            self.cursor.execute(
+                "SELECT username FROM Users WHERE username >= ? AND username < ?",
+                (base, base + ':')
+            )
+            pattern = re.compile(re.escape(base) + r'\d*')
+            used[base] = {row['username'] for row in self.cursor.fetchall() if pattern.fullmatch(row['username'])}
+
+        next_suffix = {}
+        usernames = []
+        for base in base_names:
+            taken = used[base]
+            username = base
+            if username in taken:
+                counter = next_suffix.get(base, 1)
+                while f"{base}{counter}" in taken:
+                    counter += 1
+                username = f"{base}{counter}"
+                next_suffix[base] = counter + 1
+            taken.add(username)
+            usernames.append(username)
+        return usernames
+
+    def _insert_imported_teachers(self, rows):
+        """在当前事务中批量写入教师及其用户账户（rows 中需已包含 user_id、username 和 password_hash）。"""
+        self.cursor.executemany(
+            "INSERT INTO Users (id, username, password_hash, role) VALUES (:user_id, :username, :password_hash, 'teacher')",
+            rows
+        )
+        self.cursor.executemany(
+            """INSERT INTO Teachers (user_id, name, gender, title, department, id_card, contact_info)
+               VALUES (:user_id, :name, :gender, :title, :department, :id_card, :contact_info)""",
+            rows
+        )
+
     def batch_import_teachers(self, admin_id, teachers_data):
         """
         从Excel批量导入教师数据，并自动创建用户账户。
         列顺序: 学院, 姓名, 性别, 职称, 身份证号, 联系方式
+
+        用户名使用姓名拼音首字母，重名时加数字后缀；
+        用户名在内存中一次性分配，再在一个事务内批量写入。
         """
-        success_count = 0
-        failure_count = 0
         errors = []
-        for teacher_info in teachers_data:
-            try:
-                # 验证数据
-                required_fields = ['department', 'name', 'gender', 'title', 'id_card']
-                if not all(teacher_info.get(field) for field in required_fields):
-                    failure_count += 1
-                    errors.append(f"记录 {teacher_info} 缺少必要字段。")
-                    continue
-
-                # 1. 创建用户账户
-                # 使用姓名拼音作为建议用户名，身份证后六位作为默认密码
-                username = convert_to_pinyin_initials(teacher_info['name'])
-                # 检查用户名是否重复，如果重复则添加后缀
-                temp_username = username
-                counter = 1
-                while self.check_username_exists(temp_username):
-                    temp_username = f"{username}{counter}"
-                    counter += 1
-                username = temp_username
-                
-                default_password = str(teacher_info['id_card'])[-6:]
-                hashed_password = hash_password(default_password)
 
-                self.cursor.execute(
-                    "INSERT INTO Users (username, password_hash, role) VALUES (?, ?, ?)",
-                    (username, hashed_password, 'teacher')
-                )
-                user_id = self.cursor.lastrowid
+        # 验证数据
+        required_fields = ['department', 'name', 'gender', 'title', 'id_card']
+        rows = []
+        for teacher_info in teachers_data:
+            if not all(teacher_info.get(field) for field in required_fields):
+                errors.append(f"记录 {teacher_info} 缺少必要字段。")
+                continue
+            rows.append({
+                'name': teacher_info['name'],
+                'gender': teacher_info['gender'],
+                'title': teacher_info['title'],
+                'department': teacher_info['department'],
+                'id_card': str(teacher_info['id_card']),
+                'contact_info': teacher_info.get('contact'),
+                # 使用姓名拼音作为建议用户名
+                'base_username': convert_to_pinyin_initials(teacher_info['name']) or 'teacher',
+            })
+        invalid_count = failure_count = len(errors)
+        if not rows:
+            return 0, failure_count, errors
+
+        # 身份证后六位作为默认密码，先在所有核心上并行哈希
+        password_hashes = hash_passwords(row['id_card'][-6:] for row in rows)
+        for row, password_hash in zip(rows, password_hashes):
+            row['password_hash'] = password_hash
 
-                # 2. 创建教师记录
-                self.cursor.execute(
-                    """INSERT INTO Teachers (user_id, name, gender, title, department, id_card, contact_info)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        user_id, teacher_info['name'], teacher_info['gender'], teacher_info['title'],
-                        teacher_info['department'], teacher_info['id_card'], teacher_info.get('contact')
-                    )
-                )
-                success_count += 1
-            except sqlite3.IntegrityError as e:
-                failure_count += 1
-                errors.append(f"导入教师 {teacher_info.get('name', 'N/A')} 失败: {e}")
-                self.conn.rollback()
-            except Exception as e:
-                failure_count += 1
-                errors.append(f"处理教师 {teacher_info.get('name', 'N/A')} 时发生未知错误: {e}")
-                self.conn.rollback()
+        try:
+            # 立即获取写锁，保证分配的用户名和预留的用户ID不会被其他连接占用
+            self.cursor.execute("BEGIN IMMEDIATE")
+            usernames = self._allocate_usernames([row['base_username'] for row in rows])
+            user_ids = self._reserve_ids('Users', len(rows))
+            for row, username, user_id in zip(rows, usernames, user_ids):
+                row['username'] = username
+                row['user_id'] = user_id
+
+            success_count, failed_rows = self._insert_in_chunks(rows, self._insert_imported_teachers)
+            for row, e in failed_rows:
+                errors.append(f"导入教师 {row['name']} 失败: {e}")
+            failure_count += len(failed_rows)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            errors.append(f"批量导入教师时发生数据库错误，本次导入已全部回滚: {e}")
+            return 0, invalid_count + len(rows), errors
 
-        self.conn.commit()
         if success_count > 0:
             self.log_action(admin_id, 'BATCH_IMPORT_TEACHERS', f'Batch imported {success_count} teachers.')
         return success_count, failure_count, errors
-             
+
     def get_teacher_by_user_id(self, user_id):
         """根据用户ID获取教师信息"""
-        self.cursor.execute("SELECT * FROM Teachers WHERE user_id = ?", (user_id,))
-        teacher_data = self.cursor.fetchone()
+        teacher_data = self.user_cache.get(user_id, 'teacher')
         if teacher_data:
+            return teacher_data
+        self.read_cursor.execute("SELECT * FROM Teachers WHERE user_id = ?", (user_id,))
+        teacher_data = self.read_cursor.fetchone()
+        if teacher_data:
+            self.user_cache.put(user_id, 'teacher', teacher_data)
             return dict(teacher_data)
         return None
 
@@ -597,8 +958,8 @@ class DatabaseManager:
             LEFT JOIN Users u ON c.teacher_id = u.id
             ORDER BY c.id
         """
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        self.read_cursor.execute(query)
+        return self.read_cursor.fetchall()
 
     def get_all_teachers(self):
         """获取所有教师角色的用户（用于课程分配下拉框）"""
@@ -609,8 +970,8 @@ class DatabaseManager:
             WHERE u.role = 'teacher'
             ORDER BY t.name
         """
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        self.read_cursor.execute(query)
+        return self.read_cursor.fetchall()
 
     def add_course(self, admin_id, course_info):
         """添加新课程"""
@@ -636,6 +997,8 @@ class DatabaseManager:
                 (new_info['name'], new_info['credits'], new_info['teacher_id'], new_info['semester'], new_info.get('description', ''), course_id)
             )
             self.conn.commit()
+            # 学分或学期可能已变化，所有选课学生的成绩单都受影响
+            self.transcript_cache.clear()
             self.log_action(admin_id, 'UPDATE_COURSE', f'Updated course with ID {course_id}')
             return True
         except sqlite3.Error as e:
@@ -644,44 +1007,55 @@ class DatabaseManager:
             return False
 
     def delete_course(self, admin_id, course_id):
-        """删除课程"""
+        """删除课程及其成绩"""
+        return self.delete_courses(admin_id, [course_id]) is not None
+
+    def delete_courses(self, admin_id, course_ids):
+        """
+        在一个事务中删除一批课程，成绩由外键级联删除，整批只记录一条操作日志。
+        :param course_ids: 课程ID列表。
+        :return: 实际删除的课程数；出错时返回 None（已全部回滚）。
+        """
+        ids = json.dumps(sorted({int(course_id) for course_id in course_ids}))
         try:
-            # Also delete associated grades
-            self.cursor.execute("DELETE FROM Grades WHERE course_id = ?", (course_id,))
-            self.cursor.execute("DELETE FROM Courses WHERE id = ?", (course_id,))
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("SELECT id FROM Courses WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+            deleted_ids = [row['id'] for row in self.cursor.fetchall()]
+            self.cursor.execute("DELETE FROM Courses WHERE id IN (SELECT value FROM json_each(?))", (ids,))
             self.conn.commit()
-            self.log_action(admin_id, 'DELETE_COURSE', f'Deleted course with ID {course_id} and its grades.')
-            return True
         except sqlite3.Error as e:
-            print(f"Error deleting course: {e}")
+            print(f"Error deleting courses: {e}")
             self.conn.rollback()
-            return False
+            return None
+
+        if deleted_ids:
+            self.transcript_cache.clear()
+        if len(deleted_ids) == 1:
+            self.log_action(admin_id, 'DELETE_COURSE', f'Deleted course with ID {deleted_ids[0]} and its grades.')
+        elif deleted_ids:
+            self.log_action(admin_id, 'DELETE_COURSE',
+                            f'Deleted {len(deleted_ids)} courses with IDs {", ".join(map(str, deleted_ids))} and their grades.')
+        return len(deleted_ids)
 
     def get_courses_by_teacher(self, teacher_id):
         """获取某位教师教授的所有课程"""
-        self.cursor.execute("SELECT id, name, semester FROM Courses WHERE teacher_id = ?", (teacher_id,))
-        return self.cursor.fetchall()
+        self.read_cursor.execute(GET_COURSES_BY_TEACHER_SQL, (teacher_id,))
+        return self.read_cursor.fetchall()
 
     def get_student_grades_by_course(self, course_id):
         """
         获取指定课程的所有学生及其成绩。
         这将返回所有学生，以及他们在这门课上的成绩（如果有的话）。
         """
-        query = """
-            SELECT s.id, s.name, s.class_name, g.score
-            FROM Students s
-            LEFT JOIN Grades g ON s.id = g.student_id AND g.course_id = ?
-            ORDER BY s.id
-        """
-        self.cursor.execute(query, (course_id,))
-        return self.cursor.fetchall()
+        self.read_cursor.execute(GET_STUDENT_GRADES_BY_COURSE_SQL, (course_id,))
+        return self.read_cursor.fetchall()
 
     def assign_grade(self, recorder_id, student_id, course_id, score):
         """为学生录入/修改成绩. 如果成绩已存在则更新，否则插入."""
         try:
             # 检查成绩是否已存在
             self.cursor.execute(
-                "SELECT id FROM Grades WHERE student_id = ? AND course_id = ?",
+                "SELECT id, score FROM Grades WHERE student_id = ? AND course_id = ?",
                 (student_id, course_id)
             )
             grade_exists = self.cursor.fetchone()
@@ -710,12 +1084,103 @@ class DatabaseManager:
                 self.log_action(recorder_id, action, f'Added score {score} for student {student_id} for course {course_id}')
 
             self.conn.commit()
+            self.transcript_cache.invalidate_students([student_id])
             return True
         except sqlite3.Error as e:
             print(f"Error assigning grade: {e}")
             self.conn.rollback()
             return False
 
+    def assign_grades_bulk(self, recorder_id, course_id, grades):
+        """
+        批量录入/修改/删除同一门课程的成绩，在一个事务内完成。
+        分数为 None 或空字符串表示删除该成绩。
+        :param recorder_id: 录入人的用户ID。
+        :param course_id: 课程ID。
+        :param grades: [(student_id, score), ...]
+        :return: 成功返回 True，失败返回 False。
+        """
+        upserts = []
+        deletions = []
+        for student_id, score in grades:
+            if score is None or score == '':
+                deletions.append(student_id)
+            else:
+                upserts.append((student_id, course_id, score, recorder_id))
+        if not upserts and not deletions:
+            return True
+
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.executemany(
+                """INSERT INTO Grades (student_id, course_id, score, recorder_id) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(student_id, course_id) DO UPDATE SET
+                       score = excluded.score,
+                       recorded_at = CURRENT_TIMESTAMP,
+                       recorder_id = excluded.recorder_id""",
+                upserts
+            )
+            # 学号列表作为一个 JSON 参数传入，一条 DELETE 删除全部，不受 SQLite 参数个数上限的限制
+            if deletions:
+                self.cursor.execute(
+                    "DELETE FROM Grades WHERE course_id = ? AND student_id IN (SELECT value FROM json_each(?))",
+                    (course_id, json.dumps(deletions))
+                )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error assigning grades in bulk: {e}")
+            self.conn.rollback()
+            return False
+
+        self.transcript_cache.invalidate_students([row[0] for row in upserts] + deletions)
+        # 逐个记录学生及其新成绩，审计记录和日志检索（如 "student 12"）都能找到每一处修改
+        changes = [f'student {student_id}: {score}' for student_id, _, score, _ in upserts]
+        changes += [f'student {student_id}: deleted' for student_id in deletions]
+        self.log_action(recorder_id, 'BULK_ASSIGN_GRADES',
+                        f'Saved {len(upserts)} and deleted {len(deletions)} grades for course {course_id}: '
+                        + ', '.join(changes))
+        return True
+
+    def calculate_class_grade_stats(self, class_name, course_id):
+        """
+        统计某班级某门课程的成绩。
+        直接按主键读取由触发器维护的 GradeStats 汇总行（计数、总和、平方和、及格人数），
+        不扫描成绩表，也无需在修改成绩时维护额外的缓存；任何途径的成绩修改都会同步到汇总行。
+        :return: 包含 count, average, std_dev, pass_rate(百分比) 的字典。
+        """
+        self.read_cursor.execute(GET_CLASS_GRADE_STATS_SQL, (class_name or '', course_id))
+        row = self.read_cursor.fetchone()
+        if row is None:
+            return summarize(0, 0, 0, 0)
+        return summarize(row['count'], row['total'], row['total_sq'], row['pass_count'])
+
+    def get_grade_stats_dashboard(self, course_id=None):
+        """
+        读取由触发器维护的 GradeStats 汇总表，得到所有 (班级, 课程) 的成绩统计。
+        不扫描成绩表，开销只与班级和课程的组合数相关。
+        :param course_id: 只返回该课程的统计，为 None 时返回全部。
+        :return: 字典列表，包含 class_name, course_id, course_name 以及 count, average, std_dev, pass_rate。
+        """
+        self.read_cursor.execute(*grade_stats_dashboard_query(course_id))
+        dashboard = []
+        for row in self.read_cursor.fetchall():
+            stats = summarize(row['count'], row['total'], row['total_sq'], row['pass_count'])
+            stats.update(class_name=row['class_name'], course_id=row['course_id'], course_name=row['course_name'])
+            dashboard.append(stats)
+        return dashboard
+
+    def rebuild_grade_stats(self):
+        """根据成绩表完整重建 GradeStats 汇总表（修改及格线或修复统计偏差后使用）。"""
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            rebuild_grade_stats(self.cursor)
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Error rebuilding grade stats: {e}")
+            return False
+
     def get_grades_by_student(self, student_id):
         """获取某个学生的所有成绩"""
         query = """
@@ -725,25 +1190,264 @@ class DatabaseManager:
             LEFT JOIN Users u ON c.teacher_id = u.id
             WHERE g.student_id = ?
         """
-        self.cursor.execute(query, (student_id,))
-        return self.cursor.fetchall()
+        self.read_cursor.execute(query, (student_id,))
+        return self.read_cursor.fetchall()
 
-    def get_action_logs(self, role):
-        query = """
-        SELECT al.id, u.username, al.action_type, al.description, al.timestamp
-        FROM ActionLogs al
-        JOIN Users u ON al.user_id = u.id
-        ORDER BY al.timestamp DESC
+    def get_transcript(self, student_id):
+        """
+        获取学生的成绩单汇总: 每学期及累计的学分、已获学分和学分加权 GPA（换算表见 config.GPA_SCALE）。
+        一次按学期分组的聚合查询得到全部数据，结果缓存到该生的成绩变化为止。
+        :return: 字典，格式见 transcript.build_transcript。
+        """
+        transcript = self.transcript_cache.get(student_id)
+        if transcript is None:
+            self.read_cursor.execute(self._transcript_sql, (student_id,))
+            transcript = build_transcript(self.read_cursor.fetchall())
+            self.transcript_cache.put(student_id, transcript)
+        return transcript
+
+    def get_gpa_report(self, class_name=None, semester=None):
+        """
+        生成一批学生的 GPA 报表。一次查询读出所有相关成绩，用 NumPy 向量化地按学生汇总，
+        不为每个学生单独查询；结果缓存到任一成绩变化为止。
+        :param class_name: 只统计该班级的学生，为 None 时统计全部学生。
+        :param semester: 只统计该学期的课程，为 None 时统计全部学期（累计 GPA）。
+        :return: 按学号排序的字典列表，包含 student_id, name, class_name, courses, credits,
+                 earned_credits, gpa, average。没有成绩的学生不出现在报表中。
+        """
+        key = (class_name, semester)
+        report = self.transcript_cache.get_report(key)
+        if report is not None:
+            return report
+
+        query = GradeQuery(class_name=class_name, semester=semester)
+        sql, params = query.build()
+        self.read_cursor.execute(sql, params)
+        rows = self.read_cursor.fetchall()
+        import numpy as np # 与成绩统计一样，延迟到首次生成报表时导入
+        student_ids = np.fromiter((row['student_id'] for row in rows), dtype=np.int64, count=len(rows))
+        credits = np.fromiter((row['credits'] for row in rows), dtype=np.float64, count=len(rows))
+        scores = np.fromiter((row['score'] for row in rows), dtype=np.float64, count=len(rows))
+        summaries = compute_gpa_report(student_ids, credits, scores)
+
+        students = {row['student_id']: row for row in rows}
+        report = []
+        for student_id in sorted(summaries):
+            entry = {'student_id': student_id, 'name': students[student_id]['student_name'],
+                     'class_name': students[student_id]['class_name']}
+            entry.update(summaries[student_id])
+            report.append(entry)
+        self.transcript_cache.put_report(key, report)
+        return report
+
+    def refresh_rankings(self):
         """
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        重新计算成绩变化后被标记的排名分区（班级/专业/年级 × 学期），其余分区保持不变。
+        读取排名的方法会先调用它，通常无需单独调用。
+        :return: 刷新的分区数；出错时返回 None。
+        """
+        try:
+            # 没有待刷新分区时只需一次读取，不占用写锁
+            if not self.cursor.execute("SELECT 1 FROM RankingsDirty LIMIT 1").fetchone():
+                return 0
+            self.cursor.execute("BEGIN IMMEDIATE")
+            refreshed = refresh_rankings(self.cursor)
+            self.conn.commit()
+            return refreshed
+        except sqlite3.Error as e:
+            print(f"Error refreshing rankings: {e}")
+            self.conn.rollback()
+            return None
+
+    def rebuild_rankings(self):
+        """按当前成绩完整重建所有排名（修改 GPA_SCALE 后使用）。"""
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            rebuild_rankings(self.cursor)
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Error rebuilding rankings: {e}")
+            return False
+
+    def get_rankings(self, scope, partition_key, semester=OVERALL, limit=None):
+        """
+        获取某个分区按 GPA 排列的名次（并列者名次相同，后续名次跳过）。
+        :param scope: 排名范围: 'class'（班级）、'major'（专业）或 'cohort'（入学年级）。
+        :param partition_key: 班级名称、专业名称或入学年份。
+        :param semester: 学期，为空字符串时按所有学期的累计 GPA 排名。
+        :param limit: 最多返回的条数，为 None 时返回整个分区。
+        :return: 按名次排序的行列表，包含 rank, student_id, name, class_name, major, enrollment_year,
+                 gpa, credits, size（分区人数）。
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown ranking scope: {scope}")
+        self.refresh_rankings()
+        self.read_cursor.execute(GET_RANKINGS_SQL, (scope, str(partition_key), semester or OVERALL,
+                                                    -1 if limit is None else int(limit)))
+        return self.read_cursor.fetchall()
+
+    def get_student_rankings(self, student_id):
+        """
+        获取学生在所属班级、专业、入学年级中每学期及总评的名次。
+        :return: 字典列表，包含 scope, partition_key, semester, rank, size, gpa, credits；
+                 总评在前，其余按学期先后排列。
+        """
+        self.refresh_rankings()
+        self.read_cursor.execute(GET_STUDENT_RANKINGS_SQL, (student_id,))
+        scope_order = list(SCOPES)
+        rankings = [dict(row) for row in self.read_cursor.fetchall()]
+        rankings.sort(key=lambda row: (row['semester'] != OVERALL, semester_sort_key(row['semester']),
+                                       scope_order.index(row['scope'])))
+        return rankings
+
+    def get_ranking_partitions(self, scope):
+        """某个排名范围下的所有分区（班级、专业或入学年份）。"""
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown ranking scope: {scope}")
+        self.refresh_rankings()
+        self.read_cursor.execute(
+            "SELECT DISTINCT partition_key FROM Rankings WHERE scope = ? ORDER BY partition_key", (scope,)
+        )
+        return [row['partition_key'] for row in self.read_cursor.fetchall()]
+
+    def get_semesters(self):
+        """所有课程的开课学期，按时间顺序排列。"""
+        self.read_cursor.execute("SELECT DISTINCT semester FROM Courses WHERE semester IS NOT NULL AND semester != ''")
+        return sorted((row['semester'] for row in self.read_cursor.fetchall()), key=semester_sort_key)
+
+    def query_grades(self, student_id=None, course_id=None, class_name=None, semester=None,
+                     teacher_id=None, min_score=None, max_score=None, limit=None, after=None):
+        """
+        成绩组合查询，所有条件均可选。
+        :param limit: 每页条数，为 None 时返回全部结果。
+        :param after: 上一页的最后一行，返回排在它之后的数据。
+        :return: 包含 student_id, student_name, class_name, course_id, course_name, semester, credits, score 的行列表。
+        """
+        query = GradeQuery(student_id=student_id, course_id=course_id, class_name=class_name,
+                           semester=semester, teacher_id=teacher_id,
+                           min_score=min_score, max_score=max_score)
+        sql, params = query.build(limit=limit, after=after)
+        self.read_cursor.execute(sql, params)
+        return self.read_cursor.fetchall()
+
+    def get_action_logs(self, role='admin', user_id=None, action_type=None, start_time=None,
+                        end_time=None, limit=None, after=None):
+        """
+        查询操作日志，按 (时间, ID) 倒序排列，支持键集分页。
+        :param role: 查看者的角色。管理员可查看所有日志，其他角色只能查看 user_id 指定的本人日志。
+        :param user_id: 只返回该用户的日志。
+        :param action_type: 只返回该类型的日志。
+        :param start_time: 开始时间 'YYYY-MM-DD HH:MM:SS'（含，UTC）。
+        :param end_time: 结束时间 'YYYY-MM-DD HH:MM:SS'（含，UTC）。
+        :param limit: 每页条数，为 None 时返回全部结果。
+        :param after: 上一页的最后一行，返回比它更早的日志。
+        :return: 包含 id, user_id, username, action_type, description, timestamp 的行列表。
+        """
+        if role != 'admin' and user_id is None:
+            return []
+        self.action_log_writer.flush() # 确保刚记录的日志可见
+        query = ActionLogQuery(user_id=user_id, action_type=action_type,
+                               start_time=start_time, end_time=end_time)
+        sql, params = query.build(limit=limit, after=after)
+        self.read_cursor.execute(sql, params)
+        return self.read_cursor.fetchall()
+
+    def search_action_logs(self, text, role='admin', user_id=None, action_type=None, start_time=None,
+                           end_time=None, limit=config.ACTION_LOG_PAGE_SIZE, offset=0):
+        """
+        全文检索操作日志（如学生ID、课程ID、姓名），按 bm25 相关度排序。
+        :param text: 检索内容，多个词之间为"且"的关系，双引号括起的内容按短语匹配（见 build_match_query）。
+        :param offset: 跳过的条数，用于分页。
+        其余参数与 get_action_logs 相同。
+        :return: 与 get_action_logs 字段相同的行列表，另含 rank 列（越小越相关）。
+        """
+        match = build_match_query(text)
+        if match is None or (role != 'admin' and user_id is None):
+            return []
+        self.action_log_writer.flush() # 确保刚记录的日志可见
+        query = ActionLogQuery(user_id=user_id, action_type=action_type, start_time=start_time,
+                               end_time=end_time, match=match)
+        sql, params = query.build(limit=limit, offset=offset)
+        try:
+            self.read_cursor.execute(sql, params)
+            return self.read_cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching action logs: {e}")
+            return []
+
+    def rebuild_action_log_index(self):
+        """按 ActionLogs 的当前内容重建操作日志全文索引。"""
+        self.action_log_writer.flush()
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            rebuild_action_log_fts(self.cursor)
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Error rebuilding action log index: {e}")
+            return False
+
+    def get_action_types(self):
+        """返回所有出现过的操作类型（用于日志筛选）。"""
+        self.read_cursor.execute("SELECT DISTINCT action_type FROM ActionLogs ORDER BY action_type")
+        return [row['action_type'] for row in self.read_cursor.fetchall()]
 
     def log_action(self, user_id, action_type, description):
-        query = "INSERT INTO ActionLogs (user_id, action_type, description) VALUES (?, ?, ?)"
-        self.cursor.execute(query, (user_id, action_type, description))
-        self.connection.commit()
+        """记录一条操作日志（异步批量写入，需要立即可见时调用 flush_action_logs）。"""
+        self.action_log_writer.write(user_id, action_type, description)
+
+    def flush_action_logs(self):
+        """
+        等待所有已记录的操作日志写入数据库。
+        :return: 是否已全部写入；数据库被锁定时返回 False，日志会在后台继续重试。
+        """
+        return self.action_log_writer.flush()
+
+    def archive_action_logs(self):
+        """
+        立即把超过保留期的操作日志归档为压缩文件。
+        :return: 归档的日志条数。
+        """
+        self.action_log_writer.flush()
+        try:
+            return self.log_archiver.archive_old_logs()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error archiving action logs: {e}")
+            return 0
+
+    def get_archived_action_logs(self, start_date, end_date, action_type=None, username=None):
+        """
+        查询已归档的操作日志。
+        :param start_date: 开始日期 'YYYY-MM-DD'（含）。
+        :param end_date: 结束日期 'YYYY-MM-DD'（含）。
+        :return: 字段与 get_action_logs 一致的字典列表，按时间倒序。
+        """
+        return self.log_archiver.query_archived_logs(start_date, end_date, action_type, username)
+
+    def explain_query_plan(self, query, params=()):
+        """返回查询的执行计划（用于排查慢查询）。"""
+        return migrations.explain_query_plan(self.pool.reader(), query, params)
 
     def close(self):
-        if self.connection:
-            self.connection.close()
-            print("数据库连接已关闭。")
\ No newline at end of file
+        """写完剩余的操作日志，然后关闭连接池中的所有连接。"""
+        self.log_archiver.stop()
+        self.action_log_writer.close()
+        self.pool.close_all()
+        if self.profiler:
+            print("数据库性能统计:\n" + self.profiler.format_summary())
+        print("数据库连接已关闭。")
+
+if __name__ == '__main__':
+    # 测试代码: 在临时数据库上检查热点查询是否都命中了索引
+    import tempfile
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db = DatabaseManager(os.path.join(temp_dir, "plan_check.db"))
+        problems = migrations.find_plan_regressions(db.pool.reader())
+        db.close()
+    for problem in problems:
+        print(f"Query plan regression: {problem}")
+    print("All hot queries use indexes." if not problems else f"{len(problems)} query plan regression(s) found.")
+    raise SystemExit(1 if problems else 0)
@@ -0,0 +1,105 @@
+# wl31/database/grade_query.py
+# 描述: 成绩组合查询构造器，生成 Grades ⨝ Students ⨝ Courses 的参数化 SQL；以及成绩录入页使用的固定查询。
+
+
+class GradeQuery:
+    """
+    成绩组合查询构造器。
+
+    所有条件都以参数绑定的形式出现，生成的 SQL 文本只取决于"启用了哪些条件"，
+    与条件的取值无关，因此同一种查询形态总能命中 sqlite3 的语句缓存。
+    构造器根据最有选择性的条件决定驱动表，并用 CROSS JOIN 固定连接顺序，
+    保证外层循环总是从可以走索引的表开始。
+    """
+    COLUMNS = """g.student_id, s.name AS student_name, s.class_name,
+       g.course_id, c.name AS course_name, c.semester, c.credits, g.score"""
+
+    def __init__(self, student_id=None, course_id=None, class_name=None, semester=None,
+                 teacher_id=None, min_score=None, max_score=None):
+        """
+        :param student_id: 学号。
+        :param course_id: 课程ID。
+        :param class_name: 班级名称。
+        :param semester: 开课学期。
+        :param teacher_id: 授课教师ID。
+        :param min_score: 最低分（含）。
+        :param max_score: 最高分（含）。
+        """
+        self.student_id = student_id
+        self.course_id = course_id
+        self.class_name = class_name
+        self.semester = semester
+        self.teacher_id = teacher_id
+        self.min_score = min_score
+        self.max_score = max_score
+
+    def _join_order(self):
+        """
+        选择驱动表，返回 FROM 子句和排序键。
+        优先级: 学号 / 课程（Grades 上的索引） > 班级（Students 索引） > 教师 / 学期（Courses 索引）。
+        排序键与驱动表的索引顺序一致，分页时无需额外排序。
+        :return: (from_clause, [(排序表达式, 结果列名), ...])
+        """
+        if self.student_id is not None or self.course_id is not None:
+            return ("Grades g CROSS JOIN Students s ON s.id = g.student_id "
+                    "CROSS JOIN Courses c ON c.id = g.course_id",
+                    [("g.student_id", 'student_id'), ("g.course_id", 'course_id')])
+        if self.class_name is not None:
+            return ("Students s CROSS JOIN Grades g ON g.student_id = s.id "
+                    "CROSS JOIN Courses c ON c.id = g.course_id",
+                    [("s.id", 'student_id'), ("g.course_id", 'course_id')])
+        if self.teacher_id is not None or self.semester is not None:
+            return ("Courses c CROSS JOIN Grades g ON g.course_id = c.id "
+                    "CROSS JOIN Students s ON s.id = g.student_id",
+                    [("c.id", 'course_id'), ("g.student_id", 'student_id')])
+        return ("Grades g JOIN Students s ON s.id = g.student_id "
+                "JOIN Courses c ON c.id = g.course_id",
+                [("g.student_id", 'student_id'), ("g.course_id", 'course_id')])
+
+    def build(self, limit=None, after=None):
+        """
+        生成 SQL 和参数。
+        :param limit: 每页条数，为 None 时不分页。
+        :param after: 上一页的最后一行（需包含 student_id 和 course_id），返回排在它之后的数据。
+        :return: (sql, params)
+        """
+        from_clause, order_keys = self._join_order()
+        clauses, params = [], []
+        # 条件顺序固定，保证同一种查询形态生成完全相同的 SQL 文本
+        for clause, value in (
+            ("g.student_id = ?", self.student_id),
+            ("g.course_id = ?", self.course_id),
+            ("s.class_name = ?", self.class_name),
+            ("c.semester = ?", self.semester),
+            ("c.teacher_id = ?", self.teacher_id),
+            ("g.score >= ?", self.min_score),
+            ("g.score <= ?", self.max_score),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if after is not None:
+            # 键集分页: (排序键1, 排序键2) > 上一页最后一行的对应值
+            clauses.append(f"({order_keys[0][0]}, {order_keys[1][0]}) > (?, ?)")
+            params.extend(after[key] for _, key in order_keys)
+
+        sql = f"SELECT {self.COLUMNS}\nFROM {from_clause}"
+        if clauses:
+            sql += "\nWHERE " + " AND ".join(clauses)
+        sql += "\nORDER BY " + ", ".join(expr for expr, _ in order_keys)
+        if limit is not None:
+            sql += "\nLIMIT ?"
+            params.append(int(limit))
+        return sql, params
+
+
+# 成绩录入页: 教师名下的课程
+GET_COURSES_BY_TEACHER_SQL = "SELECT id, name, semester FROM Courses WHERE teacher_id = ?"
+
+# 成绩录入页: 全部学生及其在某门课程上的成绩（没有成绩的学生 score 为 NULL）
+GET_STUDENT_GRADES_BY_COURSE_SQL = """
+    SELECT s.id, s.name, s.class_name, g.score
+    FROM Students s
+    LEFT JOIN Grades g ON s.id = g.student_id AND g.course_id = ?
+    ORDER BY s.id
+"""
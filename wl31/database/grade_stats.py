@@ -0,0 +1,174 @@
+# wl31/database/grade_stats.py
+# 描述: 按 (班级, 课程) 维护的成绩统计: 由触发器维护的 GradeStats 汇总表及其统计结果的计算。
+
+import math
+import sqlite3
+from wl31 import config
+
+
+def summarize(count, total, total_sq, passed):
+    """
+    由计数、总和、平方和、及格人数计算统计结果。
+    这四个量是可以逐条累加的运行汇总量，GradeStats 触发器在每次成绩变化时更新它们，
+    因此统计结果只需 O(1) 计算，不必把成绩读入数组。
+    标准差为总体标准差，与 numpy.std 的默认行为一致。
+    """
+    if count == 0:
+        return {'count': 0, 'average': 0, 'std_dev': 0, 'pass_rate': 0}
+    average = total / count
+    variance = max(total_sq / count - average * average, 0.0) # 消除浮点误差导致的负数
+    return {
+        'count': count,
+        'average': round(average, 2),
+        'std_dev': round(math.sqrt(variance), 2),
+        'pass_rate': round(passed * 100 / count, 2),
+    }
+
+
+# --- GradeStats 汇总表 ---
+
+# 将一组成绩增量 (count, total, total_sq, pass_count) 累加到 GradeStats 的 UPSERT 语句尾部
+_UPSERT_TAIL = """
+    ON CONFLICT(class_name, course_id) DO UPDATE SET
+        count = count + excluded.count,
+        total = total + excluded.total,
+        total_sq = total_sq + excluded.total_sq,
+        pass_count = pass_count + excluded.pass_count"""
+
+
+def _cleanup(row):
+    """
+    删除单条成绩 (NEW/OLD) 所属的、已经没有成绩的汇总行。
+    只按主键定位这一行，批量删除成绩时不会为每条成绩扫描整张汇总表。
+    """
+    return f"""
+    DELETE FROM GradeStats
+    WHERE class_name = (SELECT COALESCE(s.class_name, '') FROM Students s WHERE s.id = {row}.student_id)
+      AND course_id = {row}.course_id AND count <= 0;"""
+
+
+def _delta_select(sign, row, pass_score):
+    """生成单条成绩 (NEW/OLD) 对 GradeStats 增量的 SELECT 语句。"""
+    return f"""
+    INSERT INTO GradeStats (class_name, course_id, count, total, total_sq, pass_count)
+    SELECT COALESCE(s.class_name, ''), {row}.course_id, {sign}1, {sign}{row}.score,
+           {sign}{row}.score * {row}.score, {sign}({row}.score >= {pass_score})
+    FROM Students s WHERE s.id = {row}.student_id{_UPSERT_TAIL};"""
+
+
+_TRIGGERS = ('trg_grades_stats_insert', 'trg_grades_stats_delete', 'trg_grades_stats_update',
+             'trg_students_stats_class', 'trg_students_stats_delete')
+
+
+def drop_grade_stats_triggers(cursor):
+    """删除维护 GradeStats 的触发器（重建 Grades/Students 表前需先删除引用它们的触发器）。"""
+    for name in _TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_grade_stats_triggers(cursor, pass_score=config.PASS_SCORE):
+    """
+    (重新)创建维护 GradeStats 的触发器。
+    及格线在创建时写入触发器，修改 PASS_SCORE 后需调用 rebuild_grade_stats。
+    """
+    drop_grade_stats_triggers(cursor)
+    pass_score = float(pass_score)
+    # 学生转班/删除时只需清理该生所在班级的汇总行
+    cleanup_class = "DELETE FROM GradeStats WHERE class_name = COALESCE(OLD.class_name, '') AND count <= 0;"
+
+    cursor.execute(f"""
+    CREATE TRIGGER trg_grades_stats_insert AFTER INSERT ON Grades BEGIN
+        {_delta_select('', 'NEW', pass_score)}
+    END""")
+    cursor.execute(f"""
+    CREATE TRIGGER trg_grades_stats_delete AFTER DELETE ON Grades BEGIN
+        {_delta_select('-', 'OLD', pass_score)}
+        {_cleanup('OLD')}
+    END""")
+    cursor.execute(f"""
+    CREATE TRIGGER trg_grades_stats_update AFTER UPDATE OF score, student_id, course_id ON Grades BEGIN
+        {_delta_select('-', 'OLD', pass_score)}
+        {_delta_select('', 'NEW', pass_score)}
+        {_cleanup('OLD')}
+    END""")
+    # 学生转班: 把该生所有成绩从原班级移到新班级
+    cursor.execute(f"""
+    CREATE TRIGGER trg_students_stats_class AFTER UPDATE OF class_name ON Students
+    WHEN COALESCE(OLD.class_name, '') != COALESCE(NEW.class_name, '') BEGIN
+        INSERT INTO GradeStats (class_name, course_id, count, total, total_sq, pass_count)
+        SELECT COALESCE(OLD.class_name, ''), g.course_id, -COUNT(*), -SUM(g.score),
+               -SUM(g.score * g.score), -SUM(g.score >= {pass_score})
+        FROM Grades g WHERE g.student_id = OLD.id GROUP BY g.course_id{_UPSERT_TAIL};
+        INSERT INTO GradeStats (class_name, course_id, count, total, total_sq, pass_count)
+        SELECT COALESCE(NEW.class_name, ''), g.course_id, COUNT(*), SUM(g.score),
+               SUM(g.score * g.score), SUM(g.score >= {pass_score})
+        FROM Grades g WHERE g.student_id = NEW.id GROUP BY g.course_id{_UPSERT_TAIL};
+        {cleanup_class}
+    END""")
+    # 删除学生: 外键级联删除成绩时学生行已不存在，成绩触发器查不到班级，
+    # 因此在删除学生之前先扣除该生的全部成绩（之后级联删除成绩时不再重复扣除）
+    cursor.execute(f"""
+    CREATE TRIGGER trg_students_stats_delete BEFORE DELETE ON Students BEGIN
+        INSERT INTO GradeStats (class_name, course_id, count, total, total_sq, pass_count)
+        SELECT COALESCE(OLD.class_name, ''), g.course_id, -COUNT(*), -SUM(g.score),
+               -SUM(g.score * g.score), -SUM(g.score >= {pass_score})
+        FROM Grades g WHERE g.student_id = OLD.id GROUP BY g.course_id{_UPSERT_TAIL};
+        {cleanup_class}
+    END""")
+
+
+def rebuild_grade_stats(cursor, pass_score=config.PASS_SCORE):
+    """根据 Grades 表完整重建 GradeStats（用于已有数据库或修正累计误差），不提交事务。"""
+    create_grade_stats_triggers(cursor, pass_score)
+    cursor.execute("DELETE FROM GradeStats")
+    cursor.execute("""
+    INSERT INTO GradeStats (class_name, course_id, count, total, total_sq, pass_count)
+    SELECT COALESCE(s.class_name, ''), g.course_id, COUNT(*), SUM(g.score),
+           SUM(g.score * g.score), SUM(g.score >= ?)
+    FROM Grades g JOIN Students s ON s.id = g.student_id
+    GROUP BY COALESCE(s.class_name, ''), g.course_id""", (float(pass_score),))
+
+
+# 某个 (班级, 课程) 的汇总行，按主键查找
+GET_CLASS_GRADE_STATS_SQL = """
+    SELECT count, total, total_sq, pass_count FROM GradeStats
+    WHERE class_name = ? AND course_id = ?
+"""
+
+
+def grade_stats_dashboard_query(course_id=None):
+    """
+    生成成绩统计看板的 SQL 和参数: 所有 (班级, 课程) 的汇总行，可只取某门课程。
+    :return: (sql, params)
+    """
+    sql = """
+    SELECT gs.class_name, gs.course_id, c.name AS course_name,
+           gs.count, gs.total, gs.total_sq, gs.pass_count
+    FROM GradeStats gs
+    JOIN Courses c ON c.id = gs.course_id"""
+    params = ()
+    if course_id is not None:
+        sql += "\n    WHERE gs.course_id = ?"
+        params = (course_id,)
+    sql += "\n    ORDER BY gs.class_name, gs.course_id"
+    return sql, params
+
+
+if __name__ == '__main__':
+    # 一次性重建命令: python -m wl31.database.grade_stats [数据库路径]
+    import sys
+    db_path = sys.argv[1] if len(sys.argv) > 1 else config.DATABASE_PATH
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        rebuild_grade_stats(cursor)
+        conn.commit()
+        count = conn.execute("SELECT COUNT(*) FROM GradeStats").fetchone()[0]
+        print(f"GradeStats rebuilt: {count} class/course rows.")
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"Error rebuilding grade stats: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
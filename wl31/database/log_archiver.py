@@ -0,0 +1,159 @@
+# wl31/database/log_archiver.py
+# 描述: 操作日志的保留策略: 把超过保留期的日志按日期归档为 gzip 压缩的 JSONL 文件，并支持按日期范围查询归档。
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from wl31 import config
+
+# 归档文件名: actionlogs-YYYY-MM-DD.jsonl.gz，按年/月分目录存放
+_FILE_PREFIX = "actionlogs-"
+_FILE_SUFFIX = ".jsonl.gz"
+
+
+def archive_dir_for(db_path):
+    """
+    某个数据库的归档根目录: 数据库文件所在目录下的 log_archive/<文件名（不含扩展名）>/，
+    如 wl31/wl31.db -> wl31/log_archive/wl31/。每个数据库使用独立的目录，
+    临时库或复制出来的库不会把日志归档到正式库的目录中。
+    """
+    db_path = os.path.abspath(db_path)
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(db_path), config.ACTION_LOG_ARCHIVE_DIRNAME, name)
+
+
+class LogArchiver:
+    """
+    把 ActionLogs 中早于保留期的日志移动到按天分区的压缩归档文件中。
+
+    每一批日志先追加写入归档文件并刷盘，再在一个事务中从表中删除，
+    因此任何时候中断都不会丢失日志；中断后重新归档可能产生重复记录，
+    读取归档时按日志ID去重。归档时同时保存操作用户名，用户被删除后仍可追溯。
+    """
+    def __init__(self, pool, archive_dir, retention_days=config.ACTION_LOG_RETENTION_DAYS, batch_size=5000):
+        """
+        :param pool: 连接池。
+        :param archive_dir: 归档文件的根目录，只存放该数据库的日志（见 archive_dir_for）。
+        :param retention_days: 表中保留最近多少天的日志。
+        :param batch_size: 每批归档的日志条数。
+        """
+        self.pool = pool
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread = None
+
+    def archive_path(self, day):
+        """某一天（'YYYY-MM-DD'，UTC 日期）的归档文件路径。"""
+        return os.path.join(self.archive_dir, day[:4], day[5:7], f"{_FILE_PREFIX}{day}{_FILE_SUFFIX}")
+
+    def cutoff(self, now=None):
+        """早于该时间戳（UTC，与 ActionLogs.timestamp 格式一致）的日志需要归档。"""
+        now = now or datetime.now(timezone.utc)
+        return (now - timedelta(days=self.retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    def archive_old_logs(self, now=None):
+        """
+        归档所有超过保留期的日志。
+        :return: 归档的日志条数。
+        """
+        cutoff = self.cutoff(now)
+        conn = self.pool.writer()
+        archived = 0
+        while not self._stop.is_set():
+            rows = conn.execute(
+                """SELECT al.id, al.user_id, u.username, al.action_type, al.description, al.timestamp
+                   FROM ActionLogs al
+                   LEFT JOIN Users u ON u.id = al.user_id
+                   WHERE al.timestamp < ?
+                   ORDER BY al.timestamp, al.id
+                   LIMIT ?""",
+                (cutoff, self.batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            self._write_archives(rows)
+            try:
+                conn.executemany("DELETE FROM ActionLogs WHERE id = ?", [(row['id'],) for row in rows])
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"Error deleting archived action logs: {e}")
+                break
+            archived += len(rows)
+        return archived
+
+    def _write_archives(self, rows):
+        """按日期把一批日志追加到对应的归档文件（gzip 支持多段追加）。"""
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row['timestamp'][:10], []).append(dict(row))
+        for day, logs in by_day.items():
+            path = self.archive_path(day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='ab') as f:
+                    for log in logs:
+                        f.write((json.dumps(log, ensure_ascii=False) + "\n").encode('utf-8'))
+                # 确认归档已落盘后才会删除表中的日志
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def list_archive_days(self):
+        """返回所有已归档的日期（升序）。"""
+        days = []
+        if not os.path.isdir(self.archive_dir):
+            return days
+        for _, _, filenames in os.walk(self.archive_dir):
+            for filename in filenames:
+                if filename.startswith(_FILE_PREFIX) and filename.endswith(_FILE_SUFFIX):
+                    days.append(filename[len(_FILE_PREFIX):-len(_FILE_SUFFIX)])
+        return sorted(days)
+
+    def query_archived_logs(self, start_date, end_date, action_type=None, username=None):
+        """
+        查询某个日期范围内的归档日志，只读取该范围内的分区文件。
+        :param start_date: 开始日期 'YYYY-MM-DD'（含）。
+        :param end_date: 结束日期 'YYYY-MM-DD'（含）。
+        :return: 按时间倒序排列的日志字典列表（字段与 get_action_logs 一致）。
+        """
+        logs = {}
+        for day in self.list_archive_days():
+            if not start_date <= day <= end_date:
+                continue
+            with gzip.open(self.archive_path(day), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    log = json.loads(line)
+                    if action_type and log['action_type'] != action_type:
+                        continue
+                    if username and log['username'] != username:
+                        continue
+                    logs[log['id']] = log # 按ID去重
+        return sorted(logs.values(), key=lambda log: (log['timestamp'], log['id']), reverse=True)
+
+    def start(self):
+        """在后台线程中执行一次归档，不阻塞启动。"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="LogArchiver", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            archived = self.archive_old_logs()
+            if archived:
+                print(f"Archived {archived} action log(s) older than {self.retention_days} days.")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error archiving action logs: {e}")
+        finally:
+            self.pool.release_thread()
+
+    def stop(self):
+        """停止后台归档（当前批次完成后退出）并等待线程结束。"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,444 @@
+# wl31/database/migrations.py
+# 描述: 基于 PRAGMA user_version 的版本化数据库迁移，以及热点查询的执行计划检查。
+
+import sqlite3
+from wl31.utils.hash_utils import hash_password
+from wl31.database.grade_query import GradeQuery, GET_COURSES_BY_TEACHER_SQL, GET_STUDENT_GRADES_BY_COURSE_SQL
+from wl31.database.action_log_query import ActionLogQuery, create_action_log_fts, create_action_log_fts_triggers
+from wl31.database.grade_stats import (GET_CLASS_GRADE_STATS_SQL, drop_grade_stats_triggers, grade_stats_dashboard_query,
+                                      rebuild_grade_stats)
+from wl31.database.student_search import SEARCH_STUDENTS_SQL, create_student_fts, rebuild_student_fts
+from wl31.database.student_query import student_list_query
+from wl31.database.rankings import GET_RANKINGS_SQL, GET_STUDENT_RANKINGS_SQL, create_rankings_tables
+
+
+def _create_baseline_schema(cursor):
+    """
+    基础表结构（版本 0）。
+    新数据库在此创建所有表和默认管理员；早期版本留下的旧数据库（user_version 为 0）
+    则在此补齐后来增加的列。每条语句都可重复执行。
+    """
+    # 用户表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'teacher', 'student')),
+        student_id INTEGER UNIQUE,
+        is_frozen INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_login_at TEXT,
+        FOREIGN KEY(student_id) REFERENCES Students(id)
+    );
+    ''')
+
+    # 学生信息表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Students (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        name_pinyin TEXT,
+        gender TEXT CHECK(gender IN ('男', '女')),
+        enrollment_year INTEGER,
+        department TEXT,
+        major TEXT,
+        class_name TEXT,
+        contact_info TEXT,
+        id_card TEXT,
+        archive_path TEXT
+    );
+    ''')
+
+    # 教师信息表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Teachers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        title TEXT,
+        department TEXT,
+        contact_info TEXT,
+        id_card TEXT,
+        FOREIGN KEY(user_id) REFERENCES Users(id) ON DELETE CASCADE
+    );
+    ''')
+
+    # 课程表
+    # 设计决策：根据功能要求，将授课教师和学期直接作为课程属性。
+    # 这简化了UI和逻辑，因此移除了多对多的TeacherCourses表。
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Courses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        credits REAL NOT NULL,
+        teacher_id INTEGER,
+        semester TEXT,
+        description TEXT,
+        FOREIGN KEY(teacher_id) REFERENCES Teachers(id) ON DELETE SET NULL
+    );
+    ''')
+
+    # 成绩表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Grades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER NOT NULL,
+        course_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        recorded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        recorder_id INTEGER NOT NULL,
+        UNIQUE (student_id, course_id),
+        FOREIGN KEY(student_id) REFERENCES Students(id),
+        FOREIGN KEY(course_id) REFERENCES Courses(id),
+        FOREIGN KEY(recorder_id) REFERENCES Users(id)
+    );
+    ''')
+
+    # 操作日志表
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ActionLogs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        action_type TEXT NOT NULL,
+        description TEXT NOT NULL,
+        timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES Users(id)
+    );
+    ''')
+
+    # 旧数据库中的表可能缺少后来增加的列
+    legacy_columns = {
+        'Students': [('enrollment_year', 'INTEGER'), ('department', 'TEXT'), ('major', 'TEXT'),
+                     ('id_card', 'TEXT'), ('name_pinyin', 'TEXT'), ('archive_path', 'TEXT')],
+        'Teachers': [('id_card', 'TEXT')],
+    }
+    for table, columns in legacy_columns.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in columns:
+            if column not in existing:
+                print(f"Migrating database: Adding '{column}' to {table} table...")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    # 如果不存在任何管理员，则创建一个默认管理员账户
+    cursor.execute("SELECT id FROM Users WHERE role = 'admin'")
+    if cursor.fetchone() is None:
+        default_username = "admin"
+        default_password = "admin123"
+        cursor.execute(
+            "INSERT INTO Users (username, password_hash, role) VALUES (?, ?, ?)",
+            (default_username, hash_password(default_password), 'admin')
+        )
+        print(f"Default admin created. Username: {default_username}, Password: {default_password}")
+
+
+def _add_secondary_indexes(cursor):
+    """为高频查询添加二级索引（部分为覆盖索引）。"""
+    # 按课程列出成绩 / 统计成绩，(course_id, student_id, score) 可直接覆盖查询
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_grades_course ON Grades(course_id, student_id, score)")
+    # 按班级筛选学生
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_class ON Students(class_name)")
+    # 拼音首字母前缀搜索（LIKE 默认不区分大小写，因此索引使用 NOCASE 排序规则）
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_name_pinyin ON Students(name_pinyin COLLATE NOCASE)")
+    # 操作日志按时间排序 / 按用户筛选
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actionlogs_timestamp ON ActionLogs(timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actionlogs_user ON ActionLogs(user_id, timestamp)")
+    # 教师的授课列表，(teacher_id, name, semester) 覆盖 get_courses_by_teacher
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_courses_teacher ON Courses(teacher_id, name, semester)")
+
+
+def _add_student_list_indexes(cursor):
+    """为学生列表的过滤条件和排序列添加索引，配合键集分页使用。"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_department_major ON Students(department, major)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_enrollment_year ON Students(enrollment_year)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_name ON Students(name)")
+
+
+def _add_teacher_gender(cursor):
+    """Teachers 表补充性别列（教师批量导入会写入该列）。"""
+    cursor.execute("PRAGMA table_info(Teachers)")
+    if 'gender' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE Teachers ADD COLUMN gender TEXT")
+
+
+def _add_course_semester_index(cursor):
+    """按学期筛选课程（成绩组合查询以 Courses 为驱动表时使用）。"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_courses_semester ON Courses(semester)")
+
+
+def _add_grade_stats_table(cursor):
+    """创建按 (班级, 课程) 汇总的成绩统计表及维护它的触发器，并用现有成绩初始化。"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS GradeStats (
+        class_name TEXT NOT NULL,
+        course_id INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        total REAL NOT NULL,
+        total_sq REAL NOT NULL,
+        pass_count INTEGER NOT NULL,
+        PRIMARY KEY (class_name, course_id)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gradestats_course ON GradeStats(course_id)")
+    rebuild_grade_stats(cursor)
+
+
+def _add_action_log_type_index(cursor):
+    """按操作类型筛选日志，(action_type, timestamp) 保证筛选后仍按时间顺序分页。"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actionlogs_action_type ON ActionLogs(action_type, timestamp)")
+
+
+def _add_action_log_fts(cursor):
+    """创建操作日志全文索引（FTS5）及同步触发器。"""
+    create_action_log_fts(cursor)
+
+
+def _add_student_fts(cursor):
+    """创建学生多字段全文索引，并修正已有学生的拼音首字母。"""
+    create_student_fts(cursor)
+
+
+def _rebuild_table(cursor, table, create_sql, where=None):
+    """
+    按新的表定义重建表（SQLite 无法修改已有表的外键约束）。
+    数据、行ID 和 AUTOINCREMENT 计数都会保留；索引和触发器随旧表删除，需由调用方重新创建。
+    必须在外键检查关闭时执行，且引用该表的其他触发器需事先删除。
+    :param create_sql: 建表语句，表名写作 {table}。
+    :param where: 只复制满足该条件的行（用于丢弃孤立记录）。
+    """
+    new_table = f"{table}_new"
+    old_columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+    cursor.execute(create_sql.format(table=new_table))
+    new_columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({new_table})").fetchall()}
+    columns = ", ".join(column for column in old_columns if column in new_columns)
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+
+    cursor.execute(f"INSERT INTO {new_table} ({columns}) SELECT {columns} FROM {table}"
+                   + (f" WHERE {where}" if where else ""))
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    # 复制只会把计数设为现有的最大ID，已删除的ID不能被重新分配（归档日志按ID去重）
+    if sequence:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+        cursor.execute(f"INSERT INTO sqlite_sequence (name, seq) VALUES (?, MAX(?, (SELECT COALESCE(MAX(id), 0) FROM {table})))",
+                       (table, sequence[0]))
+
+
+def _add_cascading_deletes(cursor):
+    """
+    为删除学生/课程启用外键级联:
+    - Users.student_id、Grades.student_id、Grades.course_id 改为 ON DELETE CASCADE；
+    - 去掉 Grades.recorder_id 和 ActionLogs.user_id 的外键，成绩的录入人和操作日志是历史记录，
+      删除用户后仍需保留（开启外键检查后，这两个约束会使有日志的用户无法删除）。
+    孤立的学生账户和成绩（学生或课程已不存在，即以前删除时遗留的记录）在重建时丢弃。
+    """
+    drop_grade_stats_triggers(cursor)
+
+    _rebuild_table(cursor, 'Users', """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'teacher', 'student')),
+        student_id INTEGER UNIQUE,
+        is_frozen INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_login_at TEXT,
+        FOREIGN KEY(student_id) REFERENCES Students(id) ON DELETE CASCADE
+    )""", where="student_id IS NULL OR student_id IN (SELECT id FROM Students)")
+
+    _rebuild_table(cursor, 'Grades', """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER NOT NULL,
+        course_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        recorded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        recorder_id INTEGER NOT NULL,
+        UNIQUE (student_id, course_id),
+        FOREIGN KEY(student_id) REFERENCES Students(id) ON DELETE CASCADE,
+        FOREIGN KEY(course_id) REFERENCES Courses(id) ON DELETE CASCADE
+    )""", where="student_id IN (SELECT id FROM Students) AND course_id IN (SELECT id FROM Courses)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_grades_course ON Grades(course_id, student_id, score)")
+    rebuild_grade_stats(cursor)
+
+    _rebuild_table(cursor, 'ActionLogs', """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        action_type TEXT NOT NULL,
+        description TEXT NOT NULL,
+        timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actionlogs_timestamp ON ActionLogs(timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actionlogs_user ON ActionLogs(user_id, timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actionlogs_action_type ON ActionLogs(action_type, timestamp)")
+    # 日志ID保持不变，全文索引仍然有效，只需恢复同步触发器
+    create_action_log_fts_triggers(cursor)
+
+    violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if violations:
+        tables = sorted({row[0] for row in violations})
+        print(f"Warning: {len(violations)} existing row(s) violate foreign keys in {', '.join(tables)}.")
+
+
+def _add_rankings(cursor):
+    """添加 GPA 排名表、待刷新分区表及维护触发器，并计算现有学生的排名。"""
+    create_rankings_tables(cursor)
+
+
+def _reindex_student_readings(cursor):
+    """多音字读法的截断方式已修正（每种读音至少出现一次），按新的读法重建学生全文索引。"""
+    rebuild_student_fts(cursor)
+
+
+# 基础表结构只在 user_version 为 0（新数据库或早期版本的旧数据库）时执行
+BASELINE = (0, "创建基础表结构", _create_baseline_schema)
+
+# 迁移列表: (版本号, 描述, 迁移函数)。版本号必须严格递增，已发布的迁移不可修改。
+MIGRATIONS = [
+    (1, "添加二级索引", _add_secondary_indexes),
+    (2, "添加学生列表过滤/排序索引", _add_student_list_indexes),
+    (3, "为 Teachers 表添加 gender 列", _add_teacher_gender),
+    (4, "添加课程学期索引", _add_course_semester_index),
+    (5, "添加 GradeStats 成绩汇总表", _add_grade_stats_table),
+    (6, "添加操作日志类型索引", _add_action_log_type_index),
+    (7, "添加操作日志全文索引", _add_action_log_fts),
+    (8, "添加学生全文索引", _add_student_fts),
+    (9, "为删除学生/课程启用外键级联", _add_cascading_deletes),
+    (10, "添加班级/专业/年级 GPA 排名表", _add_rankings),
+    (11, "重建学生全文索引的多音字读法", _reindex_student_readings),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """读取数据库当前的结构版本号。"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    依次执行所有尚未应用的迁移。
+    已是最新版本的数据库只读取一次 user_version，不执行任何写操作。
+    每个迁移在独立的 IMMEDIATE 事务中执行，并在同一事务内更新 user_version，
+    因此迁移要么完整生效，要么完全不生效；多个进程同时启动时也只会执行一次。
+    :param conn: 写连接。
+    :return: 本次执行的迁移版本号列表。
+    """
+    current_version = get_schema_version(conn)
+    if current_version >= LATEST_VERSION:
+        return []
+    pending = [BASELINE] + MIGRATIONS if current_version == 0 else MIGRATIONS
+    applied = []
+    # 重建表的迁移需要关闭外键检查，该设置在事务中无效，只能在迁移开始前修改
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, description, migrate in pending:
+            if 0 < version <= current_version:
+                continue
+            print(f"Migrating database to version {version}: {description}...")
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                # 取得写锁后重新检查，其他进程可能刚刚完成了这个迁移
+                if version and get_schema_version(conn) >= version:
+                    conn.rollback()
+                    continue
+                migrate(cursor)
+                cursor.execute(f"PRAGMA user_version = {int(version)}")
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            applied.append(version)
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+    return applied
+
+
+# --- 热点查询执行计划检查 ---
+
+# 热点查询: 名称 -> (SQL, 参数, 不允许全表扫描的表别名)
+# SQL 直接取自 DatabaseManager 使用的常量和查询构造器，方法中的 SQL 一旦修改，检查的就是修改后的语句。
+HOT_QUERIES = {
+    'get_student_grades_by_course': (
+        GET_STUDENT_GRADES_BY_COURSE_SQL, (1,), {'g'}
+    ),
+    'calculate_class_grade_stats': (
+        GET_CLASS_GRADE_STATS_SQL, ('计科1班', 1), {'GradeStats'}
+    ),
+    'get_grade_stats_dashboard': (
+        *grade_stats_dashboard_query(1), {'gs'}
+    ),
+    'get_all_students_by_class': (
+        *student_list_query({'class_name': '计科1班'}), {'Students'}
+    ),
+    'get_all_students_page': (
+        *student_list_query(sort_by='name', limit=200, after={'name': '张三', 'id': 1}), {'Students'}
+    ),
+    'search_students': (
+        SEARCH_STUDENTS_SQL, ('"zhangs"* "软 件"*', 200), {'s'}
+    ),
+    'get_action_logs_page': (
+        *ActionLogQuery().build(limit=200, after={'timestamp': '2025-01-01 00:00:00', 'id': 1}),
+        {'al', 'u'}
+    ),
+    'get_action_logs_by_user': (
+        *ActionLogQuery(user_id=1).build(limit=200), {'al', 'u'}
+    ),
+    'get_action_logs_by_type_and_time': (
+        *ActionLogQuery(action_type='LOGIN', start_time='2025-01-01 00:00:00',
+                        end_time='2025-12-31 23:59:59').build(limit=200), {'al', 'u'}
+    ),
+    'search_action_logs': (
+        *ActionLogQuery(match='"student" "12"', start_time='2025-01-01 00:00:00').build(limit=200, offset=200),
+        {'al', 'u'}
+    ),
+    'get_rankings': (
+        GET_RANKINGS_SQL, ('class', '计科1班', '', 100), {'r', 's'}
+    ),
+    'get_student_rankings': (
+        GET_STUDENT_RANKINGS_SQL, (1,), {'r'}
+    ),
+    'get_courses_by_teacher': (
+        GET_COURSES_BY_TEACHER_SQL, (1,), {'Courses'}
+    ),
+    'query_grades_by_student': (
+        *GradeQuery(student_id=1).build(), {'g', 's', 'c'}
+    ),
+    'query_grades_by_course': (
+        *GradeQuery(course_id=1, min_score=60).build(limit=100), {'g', 's', 'c'}
+    ),
+    'query_grades_by_class': (
+        *GradeQuery(class_name='计科1班').build(), {'g', 's', 'c'}
+    ),
+    'query_grades_by_semester': (
+        *GradeQuery(semester='2024-2025 秋季').build(), {'g', 's', 'c'}
+    ),
+}
+
+
+def explain_query_plan(conn, query, params=()):
+    """返回查询计划中每一步的描述文本。"""
+    rows = conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+    return [row[3] for row in rows]
+
+
+def find_plan_regressions(conn, queries=HOT_QUERIES):
+    """
+    检查热点查询的执行计划。
+    对受保护表的扫描（"SCAN x"，无论是否借助索引）以及临时 B 树排序都会被视为退化。
+    :return: 问题描述列表，为空表示所有查询均命中索引。
+    """
+    problems = []
+    for name, (query, params, protected) in queries.items():
+        for detail in explain_query_plan(conn, query, params):
+            if detail.startswith("SCAN ") and detail.split()[1] in protected:
+                problems.append(f"{name}: full scan ({detail})")
+            if "USE TEMP B-TREE" in detail:
+                problems.append(f"{name}: temporary sort ({detail})")
+    return problems
@@ -0,0 +1,212 @@
+# wl31/database/profiler.py
+# 描述: 可选的数据库性能分析: 统计方法与 SQL 的调用次数和延迟分位数，记录慢查询及其执行计划。
+
+import functools
+import inspect
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from wl31 import config
+
+
+def _percentile(sorted_samples, percent):
+    """最近秩法计算分位数。"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(sorted_samples))) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def _params_shape(params, many=False):
+    """只记录参数的结构和类型，不记录参数值（避免把密码哈希、身份证号等写入日志）。"""
+    if many:
+        rows = params if isinstance(params, (list, tuple)) else list(params)
+        return {'rows': len(rows), 'row': _params_shape(rows[0]) if rows else None}
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def _normalize_sql(sql):
+    return " ".join(sql.split())
+
+
+class LatencyStats:
+    """
+    单个统计项的调用次数和延迟样本。
+    样本数超过上限后使用水塘抽样，内存占用固定，分位数仍是无偏估计。
+    """
+    def __init__(self, max_samples):
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < self.max_samples:
+                self.samples[index] = seconds
+
+    def summary(self):
+        """返回以毫秒为单位的统计结果。"""
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'p50_ms': round(_percentile(samples, 50) * 1000, 3),
+            'p95_ms': round(_percentile(samples, 95) * 1000, 3),
+            'p99_ms': round(_percentile(samples, 99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class QueryProfiler:
+    """
+    数据库性能分析器。
+
+    通过 connection_factory 创建的连接上，每次 execute / executemany 都会被计时；
+    instrument() 则为对象的所有公共方法包上计时器。超过阈值的语句连同参数结构和
+    执行计划一起写入慢查询日志（每行一个 JSON），summary() 汇总各项的 p50/p95/p99。
+    """
+    def __init__(self, slow_threshold_ms=config.SLOW_QUERY_THRESHOLD_MS,
+                 slow_log_path=config.SLOW_QUERY_LOG_PATH, max_samples=10000):
+        """
+        :param slow_threshold_ms: 慢查询阈值（毫秒）。
+        :param slow_log_path: 慢查询日志文件路径，为 None 时只保存在内存中。
+        :param max_samples: 每个统计项最多保留的延迟样本数。
+        """
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.slow_log_path = slow_log_path
+        self.max_samples = max_samples
+        self.stats = {} # 统计项名称 -> LatencyStats
+        self.slow_queries = deque(maxlen=100) # 最近的慢查询
+        self._lock = threading.Lock()
+
+    @property
+    def connection_factory(self):
+        """传给 sqlite3.connect(factory=...) 的连接工厂。"""
+        return functools.partial(ProfiledConnection, profiler=self)
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = LatencyStats(self.max_samples)
+            stats.add(seconds)
+
+    def record_query(self, conn, sql, params, seconds, many=False):
+        """记录一条语句的耗时，超过阈值时写入慢查询日志。"""
+        sql = _normalize_sql(sql)
+        self.record("sql: " + sql, seconds)
+        if seconds < self.slow_threshold:
+            return
+        entry = {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_ms': round(seconds * 1000, 3),
+            'sql': sql,
+            'params': _params_shape(params, many),
+            'plan': self._explain(conn, sql, params, many),
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+            if self.slow_log_path:
+                try:
+                    with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                except OSError as e:
+                    print(f"Error writing slow query log: {e}")
+
+    @staticmethod
+    def _explain(conn, sql, params, many):
+        """获取语句的执行计划（使用未计时的普通游标，避免递归记录）。"""
+        if sql.split(" ", 1)[0].upper() not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'):
+            return []
+        if many:
+            params = next(iter(params), ())
+        try:
+            cursor = sqlite3.Cursor(conn)
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f"unavailable: {e}"]
+
+    def instrument(self, obj):
+        """为对象的所有公共方法包上计时器（在实例上替换，不影响类本身）。"""
+        for name, _ in inspect.getmembers(type(obj), inspect.isfunction):
+            if name.startswith('_'):
+                continue
+            setattr(obj, name, self._timed(getattr(obj, name), "method: " + name))
+
+    def _timed(self, method, name):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def summary(self):
+        """返回按总耗时降序排列的统计结果列表。"""
+        with self._lock:
+            rows = [dict(name=name, **stats.summary()) for name, stats in self.stats.items()]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def format_summary(self, limit=30):
+        """生成便于阅读的统计报告。"""
+        lines = [f"{'count':>7} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  name"]
+        for row in self.summary()[:limit]:
+            lines.append(f"{row['count']:>7} {row['total_ms']:>10.1f} {row['p50_ms']:>8.2f} "
+                         f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}  {row['name'][:100]}")
+        lines.append(f"{len(self.slow_queries)} slow statement(s) over {self.slow_threshold * 1000:g} ms.")
+        return "\n".join(lines)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """对 execute / executemany 计时的游标。"""
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.connection.profiler.record_query(self.connection, sql, parameters,
+                                                  time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters) # 生成器只能遍历一次，记录参数结构前先展开
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.connection.profiler.record_query(self.connection, sql, seq_of_parameters,
+                                                  time.perf_counter() - start, many=True)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """默认创建 ProfiledCursor 的连接；Connection.execute 等快捷方法也经由它计时。"""
+    def __init__(self, *args, profiler, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = profiler
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
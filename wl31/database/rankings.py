@@ -0,0 +1,252 @@
+# wl31/database/rankings.py
+# 描述: 学生 GPA 排名: 按班级、专业、入学年级分别排名（每学期及总评）。
+#       结果保存在 Rankings 表中；成绩变化时由触发器把受影响的分区记入 RankingsDirty，
+#       读取排名前只重新计算这些分区，而不是整个学校。
+
+from wl31 import config
+from wl31.database.transcript import grade_point_case
+
+# 排名范围 -> 分区键（Students 表中的列）
+SCOPES = {
+    'class': "COALESCE({row}.class_name, '')",
+    'major': "COALESCE({row}.major, '')",
+    'cohort': "COALESCE(CAST({row}.enrollment_year AS TEXT), '')",
+}
+
+# Rankings.semester 为空字符串表示总评（所有学期的累计 GPA）
+OVERALL = ''
+
+# 三种排名范围组成的常量表，与学生行做笛卡尔积即得到该生所属的全部分区
+_SCOPE_TABLE = "(SELECT 'class' AS scope UNION ALL SELECT 'major' UNION ALL SELECT 'cohort') sc"
+
+_TRIGGERS = ('trg_grades_rankings_insert', 'trg_grades_rankings_delete', 'trg_grades_rankings_update',
+             'trg_students_rankings_update', 'trg_students_rankings_delete',
+             'trg_courses_rankings_update', 'trg_courses_rankings_delete')
+
+
+def partition_key(row):
+    """学生行 row 在排名范围 sc.scope 下的分区键（需与 _SCOPE_TABLE 一起使用）。"""
+    branches = " ".join(f"WHEN '{scope}' THEN {expr.format(row=row)}" for scope, expr in SCOPES.items())
+    return f"CASE sc.scope {branches} END"
+
+
+def _mark_dirty(students, semesters):
+    """
+    生成把一组学生所属的全部分区（三种范围 × 给定学期）标记为待刷新的语句。
+    使用 ON CONFLICT DO NOTHING 而非 INSERT OR IGNORE: 外层语句（如成绩的 UPSERT）的冲突处理方式
+    会覆盖触发器中的 OR IGNORE，导致重复标记时报错。
+    :param students: 返回 class_name, major, enrollment_year 列的子查询。
+    :param semesters: 返回 semester 列的子查询。
+    """
+    return f"""
+    INSERT INTO RankingsDirty (scope, partition_key, semester)
+    SELECT sc.scope, {partition_key('s')}, t.semester
+    FROM ({students}) s, {_SCOPE_TABLE}, ({semesters}) t
+    WHERE 1
+    ON CONFLICT DO NOTHING;"""
+
+
+def _student(student_id):
+    return f"SELECT class_name, major, enrollment_year FROM Students WHERE id = {student_id}"
+
+
+def _student_row(row):
+    """触发器中 OLD/NEW 学生行本身。"""
+    return f"SELECT {row}.class_name AS class_name, {row}.major AS major, {row}.enrollment_year AS enrollment_year"
+
+
+def _course_students(course_id):
+    return (f"SELECT DISTINCT s.class_name, s.major, s.enrollment_year "
+            f"FROM Grades g JOIN Students s ON s.id = g.student_id WHERE g.course_id = {course_id}")
+
+
+def _course_semesters(course_id):
+    """某门课程所在学期及总评。"""
+    return (f"SELECT COALESCE(semester, '') AS semester FROM Courses WHERE id = {course_id} "
+            f"UNION SELECT '{OVERALL}'")
+
+
+def _student_semesters(student_id):
+    """某个学生有成绩的所有学期及总评。"""
+    return (f"SELECT COALESCE(c.semester, '') AS semester FROM Grades g JOIN Courses c ON c.id = g.course_id "
+            f"WHERE g.student_id = {student_id} UNION SELECT '{OVERALL}'")
+
+
+def create_rankings_tables(cursor):
+    """创建 Rankings 排名表、RankingsDirty 待刷新分区表及维护触发器，并计算全部排名。"""
+    # 主键以 rank 结尾，按名次读取某个分区的排行榜无需额外排序
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Rankings (
+        scope TEXT NOT NULL,
+        partition_key TEXT NOT NULL,
+        semester TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        student_id INTEGER NOT NULL,
+        gpa REAL NOT NULL,
+        credits REAL NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (scope, partition_key, semester, rank, student_id)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_rankings_student ON Rankings(student_id)")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS RankingsDirty (
+        scope TEXT NOT NULL,
+        partition_key TEXT NOT NULL,
+        semester TEXT NOT NULL,
+        PRIMARY KEY (scope, partition_key, semester)
+    ) WITHOUT ROWID
+    """)
+    create_rankings_triggers(cursor)
+    rebuild_rankings(cursor)
+
+
+def drop_rankings_triggers(cursor):
+    """删除维护 RankingsDirty 的触发器（重建 Grades/Students/Courses 表前需先删除）。"""
+    for name in _TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_rankings_triggers(cursor):
+    """
+    (重新)创建触发器: 成绩增删改、学生转班/转专业/删除、课程学分或学期变化/删除时，
+    把受影响学生所属的分区（对应学期及总评）记入 RankingsDirty。
+    触发器只做标记，开销与成绩条数成正比，批量录入成绩时不会反复重新排名。
+    """
+    drop_rankings_triggers(cursor)
+    cursor.execute(f"""
+    CREATE TRIGGER trg_grades_rankings_insert AFTER INSERT ON Grades BEGIN
+        {_mark_dirty(_student('NEW.student_id'), _course_semesters('NEW.course_id'))}
+    END""")
+    cursor.execute(f"""
+    CREATE TRIGGER trg_grades_rankings_delete AFTER DELETE ON Grades BEGIN
+        {_mark_dirty(_student('OLD.student_id'), _course_semesters('OLD.course_id'))}
+    END""")
+    cursor.execute(f"""
+    CREATE TRIGGER trg_grades_rankings_update AFTER UPDATE OF score, student_id, course_id ON Grades
+    WHEN OLD.score IS NOT NEW.score OR OLD.student_id != NEW.student_id OR OLD.course_id != NEW.course_id
+    BEGIN
+        {_mark_dirty(_student('OLD.student_id'), _course_semesters('OLD.course_id'))}
+        {_mark_dirty(_student('NEW.student_id'), _course_semesters('NEW.course_id'))}
+    END""")
+    # 转班等操作使原分区和新分区的排名都发生变化
+    cursor.execute(f"""
+    CREATE TRIGGER trg_students_rankings_update AFTER UPDATE OF class_name, major, enrollment_year ON Students
+    WHEN OLD.class_name IS NOT NEW.class_name OR OLD.major IS NOT NEW.major
+      OR OLD.enrollment_year IS NOT NEW.enrollment_year
+    BEGIN
+        {_mark_dirty(_student_row('OLD'), _student_semesters('OLD.id'))}
+        {_mark_dirty(_student_row('NEW'), _student_semesters('NEW.id'))}
+    END""")
+    # 外键级联删除成绩时学生行已不存在，需在删除学生之前标记
+    cursor.execute(f"""
+    CREATE TRIGGER trg_students_rankings_delete BEFORE DELETE ON Students BEGIN
+        {_mark_dirty(_student_row('OLD'), _student_semesters('OLD.id'))}
+    END""")
+    cursor.execute(f"""
+    CREATE TRIGGER trg_courses_rankings_update AFTER UPDATE OF credits, semester ON Courses
+    WHEN OLD.credits != NEW.credits OR OLD.semester IS NOT NEW.semester
+    BEGIN
+        {_mark_dirty(_course_students('NEW.id'),
+                     "SELECT COALESCE(OLD.semester, '') AS semester UNION SELECT COALESCE(NEW.semester, '') "
+                     f"UNION SELECT '{OVERALL}'")}
+    END""")
+    cursor.execute(f"""
+    CREATE TRIGGER trg_courses_rankings_delete BEFORE DELETE ON Courses BEGIN
+        {_mark_dirty(_course_students('OLD.id'), _course_semesters('OLD.id'))}
+    END""")
+
+
+def _refresh_sql(scale):
+    """
+    重新计算 RankingsDirty 中所有分区的排名。
+    只有属于待刷新分区的学生才会读取成绩: 对这些学生的成绩只扫描一次，先按 (学生, 学期) 汇总，
+    总评由学期汇总再次汇总得到；再与三种排名范围做笛卡尔积，用 RANK() 窗口函数一次排出所有分区的名次。
+    """
+    class_key, major_key, cohort_key = (SCOPES[scope].format(row='s') for scope in ('class', 'major', 'cohort'))
+    return f"""
+    WITH members AS (
+        SELECT s.id, {class_key} AS class_key, {major_key} AS major_key, {cohort_key} AS cohort_key
+        FROM Students s
+        WHERE {class_key} IN (SELECT partition_key FROM RankingsDirty WHERE scope = 'class')
+           OR {major_key} IN (SELECT partition_key FROM RankingsDirty WHERE scope = 'major')
+           OR {cohort_key} IN (SELECT partition_key FROM RankingsDirty WHERE scope = 'cohort')
+    ),
+    per_semester AS (
+        SELECT g.student_id, COALESCE(c.semester, '') AS semester,
+               SUM(c.credits) AS credits,
+               SUM(c.credits * ({grade_point_case('g.score', scale)})) AS points
+        FROM members m
+        JOIN Grades g ON g.student_id = m.id
+        JOIN Courses c ON c.id = g.course_id
+        GROUP BY g.student_id, COALESCE(c.semester, '')
+    ),
+    totals AS (
+        SELECT student_id, semester, credits, points FROM per_semester WHERE semester != '{OVERALL}'
+        UNION ALL
+        SELECT student_id, '{OVERALL}', SUM(credits), SUM(points) FROM per_semester GROUP BY student_id
+    ),
+    scoped AS (
+        SELECT sc.scope,
+               CASE sc.scope WHEN 'class' THEN m.class_key WHEN 'major' THEN m.major_key ELSE m.cohort_key END
+                   AS partition_key,
+               t.semester, t.student_id, t.credits,
+               -- 舍入消除累加顺序造成的浮点误差，GPA 相同的学生名次并列
+               CASE WHEN t.credits > 0 THEN ROUND(t.points / t.credits, 4) ELSE 0.0 END AS gpa
+        FROM totals t
+        JOIN members m ON m.id = t.student_id
+        CROSS JOIN {_SCOPE_TABLE}
+    )
+    INSERT INTO Rankings (scope, partition_key, semester, rank, student_id, gpa, credits, size)
+    SELECT scope, partition_key, semester,
+           RANK() OVER (PARTITION BY scope, partition_key, semester ORDER BY gpa DESC),
+           student_id, gpa, credits,
+           COUNT(*) OVER (PARTITION BY scope, partition_key, semester)
+    FROM scoped
+    WHERE (scope, partition_key, semester) IN (SELECT scope, partition_key, semester FROM RankingsDirty)
+    """
+
+
+def refresh_rankings(cursor, scale=config.GPA_SCALE):
+    """
+    在当前事务中重新计算所有待刷新分区的排名（不提交）。
+    :return: 刷新的分区数，没有待刷新分区时为 0。
+    """
+    dirty = cursor.execute("SELECT COUNT(*) FROM RankingsDirty").fetchone()[0]
+    if not dirty:
+        return 0
+    cursor.execute("""DELETE FROM Rankings
+                      WHERE (scope, partition_key, semester) IN (SELECT scope, partition_key, semester FROM RankingsDirty)""")
+    cursor.execute(_refresh_sql(scale))
+    cursor.execute("DELETE FROM RankingsDirty")
+    return dirty
+
+
+def rebuild_rankings(cursor, scale=config.GPA_SCALE):
+    """按当前成绩完整重建 Rankings（修改 GPA_SCALE 或修复排名偏差后使用，不提交）。"""
+    cursor.execute("DELETE FROM Rankings")
+    cursor.execute(f"""
+    INSERT OR IGNORE INTO RankingsDirty (scope, partition_key, semester)
+    SELECT p.scope, p.partition_key, t.semester
+    FROM (SELECT DISTINCT sc.scope, {partition_key('s')} AS partition_key FROM Students s, {_SCOPE_TABLE}) p,
+         (SELECT DISTINCT COALESCE(semester, '') AS semester FROM Courses UNION SELECT '{OVERALL}') t
+    """)
+    refresh_rankings(cursor, scale)
+
+
+# 某个分区的排行榜，按名次读取主键即可，无需排序
+GET_RANKINGS_SQL = """
+    SELECT r.rank, r.student_id, s.name, s.class_name, s.major, s.enrollment_year, r.gpa, r.credits, r.size
+    FROM Rankings r
+    JOIN Students s ON s.id = r.student_id
+    WHERE r.scope = ? AND r.partition_key = ? AND r.semester = ?
+    ORDER BY r.rank, r.student_id
+    LIMIT ?
+"""
+
+# 某个学生在所有分区中的名次
+GET_STUDENT_RANKINGS_SQL = """
+    SELECT r.scope, r.partition_key, r.semester, r.rank, r.size, r.gpa, r.credits
+    FROM Rankings r
+    WHERE r.student_id = ?
+"""
@@ -0,0 +1,84 @@
+# wl31/database/student_query.py
+# 描述: 学生列表查询构造: 按白名单列过滤、排序，并以 (排序列, 学号) 作为游标进行键集分页。
+
+import json
+
+# 允许过滤和排序的列（列名会直接拼入 SQL，必须经过白名单校验）
+STUDENT_FILTER_COLUMNS = ('department', 'major', 'class_name', 'enrollment_year', 'gender')
+STUDENT_SORT_COLUMNS = ('id', 'name', 'enrollment_year', 'department', 'major', 'class_name')
+
+STUDENT_LIST_COLUMNS = "id, name, gender, enrollment_year, department, major, class_name, contact_info"
+
+
+def student_filter(filters, alias=''):
+    """
+    将过滤条件字典转换为 WHERE 子句片段和参数。
+    只接受 STUDENT_FILTER_COLUMNS 中的列，值为列表/元组时生成 IN 条件，
+    列表整体作为一个 JSON 参数传入，语句文本不随列表长度变化，可复用已编译的语句。
+    """
+    clauses, params = [], []
+    for column, value in (filters or {}).items():
+        if column not in STUDENT_FILTER_COLUMNS:
+            raise ValueError(f"Unsupported student filter: {column}")
+        if value is None or value == '':
+            continue
+        if isinstance(value, (list, tuple, set)):
+            clauses.append(f"{alias}{column} IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(value)))
+        else:
+            clauses.append(f"{alias}{column} = ?")
+            params.append(value)
+    return clauses, params
+
+
+def student_list_query(filters=None, sort_by=None, limit=None, after=None, descending=False):
+    """
+    生成学生列表的 SQL 和参数。
+    :param filters: 过滤条件字典，键为 department/major/class_name/enrollment_year/gender。
+    :param sort_by: 排序列，必须在 STUDENT_SORT_COLUMNS 中，默认按学号排序。
+    :param limit: 每页条数，为 None 时返回全部结果。
+    :param after: 上一页的最后一行，返回排在它之后的数据。
+    :param descending: 是否降序排列。
+    :return: (sql, params)
+    """
+    sort_by = sort_by or 'id'
+    if sort_by not in STUDENT_SORT_COLUMNS:
+        raise ValueError(f"Unsupported sort column: {sort_by}")
+    clauses, params = student_filter(filters)
+
+    # 键集分页: 以 (排序列, id) 作为游标，避免 OFFSET 扫描前面所有行
+    if after is not None:
+        op = '<' if descending else '>'
+        if sort_by == 'id':
+            clauses.append(f"id {op} ?")
+            params.append(after['id'])
+        elif after[sort_by] is None:
+            # NULL 在升序中排最前、降序中排最后
+            if descending:
+                clauses.append(f"({sort_by} IS NULL AND id < ?)")
+            else:
+                clauses.append(f"({sort_by} IS NOT NULL OR id > ?)")
+            params.append(after['id'])
+        else:
+            null_tail = f" OR {sort_by} IS NULL" if descending else ""
+            clauses.append(f"(({sort_by}, id) {op} (?, ?){null_tail})")
+            params.extend([after[sort_by], after['id']])
+
+    sql = f"SELECT {STUDENT_LIST_COLUMNS} FROM Students"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    direction = 'DESC' if descending else 'ASC'
+    sql += f" ORDER BY {sort_by} {direction}" + (f", id {direction}" if sort_by != 'id' else "")
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, params
+
+
+def count_students_query(filters=None):
+    """生成统计满足过滤条件的学生人数的 SQL 和参数。"""
+    clauses, params = student_filter(filters)
+    sql = "SELECT COUNT(*) FROM Students"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    return sql, params
@@ -0,0 +1,135 @@
+# wl31/database/student_search.py
+# 描述: 学生多字段全文检索（FTS5）: 按学号、姓名、全拼、拼音首字母、班级、学院、专业搜索学生。
+
+import re
+from wl31.utils.pinyin_utils import convert_to_pinyin_initials, convert_to_pinyin_readings
+
+# 中日韩统一表意文字（含扩展 A 区）
+_CJK_CHAR = re.compile('([\u3400-\u4dbf\u4e00-\u9fff])')
+
+# bm25 列权重，顺序与 StudentsFts 的列一致: 学号、姓名、全拼、首字母、班级、学院、专业
+_RANK = 'bm25(10.0, 8.0, 4.0, 3.0, 2.0, 1.0, 1.0)'
+
+
+def segment(text):
+    """
+    在每个汉字两侧加空格，使 unicode61 分词器把汉字逐字切开，字母和数字仍保持连续。
+    中文姓名大多只有两三个字，按字切分后用短语查询即可匹配任意长度的连续片段，
+    如 "三丰" 能命中 "张三丰"（trigram 分词器则无法匹配少于三个字的查询）。
+    例如: "软件工程2301班" -> "软 件 工 程 2301 班"
+    """
+    return " ".join(_CJK_CHAR.sub(r' \1 ', text or '').split())
+
+
+def _pinyin_keys(name):
+    """
+    姓名的全拼检索词: 每种读法的完整全拼及其从每个字开始的后缀，
+    如 "张三丰" -> "zhangsanfeng sanfeng feng"，使 "zhangs"、"sanf" 都能按前缀命中。
+    """
+    keys = []
+    for reading in convert_to_pinyin_readings(name):
+        for start in range(len(reading)):
+            key = "".join(reading[start:])
+            if key not in keys:
+                keys.append(key)
+    return " ".join(keys)
+
+
+def _initials_keys(name):
+    """姓名每种读法的拼音首字母，如 "单明" -> "dm cm sm"。"""
+    keys = []
+    for reading in convert_to_pinyin_readings(name):
+        key = "".join(syllable[:1] for syllable in reading)
+        if key not in keys:
+            keys.append(key)
+    return " ".join(keys)
+
+
+def student_fts_row(student):
+    """
+    由学生记录生成一行全文索引数据。
+    :param student: 包含 id, name, class_name, department, major 的字典或行。
+    """
+    return (
+        student['id'], str(student['id']), segment(student['name']),
+        _pinyin_keys(student['name']), _initials_keys(student['name']),
+        segment(student['class_name']), segment(student['department']), segment(student['major']),
+    )
+
+
+def create_student_fts(cursor):
+    """
+    创建学生全文索引，并用现有学生初始化。
+    拼音需在 Python 中计算，新增和修改学生时由 DatabaseManager 在同一事务中维护索引，
+    删除学生则由触发器同步，任何删除路径（包括外键级联）都不会留下失效的索引行。
+    """
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS StudentsFts USING fts5(
+        student_no, name, pinyin, initials, class_name, department, major,
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+    """)
+    cursor.execute(f"INSERT INTO StudentsFts(StudentsFts, rank) VALUES('rank', '{_RANK}')")
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_students_fts_delete AFTER DELETE ON Students BEGIN
+        DELETE FROM StudentsFts WHERE rowid = old.id;
+    END
+    """)
+    rebuild_student_fts(cursor)
+
+
+def index_students(cursor, students, replace=True):
+    """
+    在当前事务中写入或更新学生的全文索引行（不提交）。
+    :param students: 包含 id, name, class_name, department, major 的字典或行。
+    :param replace: 是否先删除已有的索引行（新插入的学生不需要）。
+    """
+    rows = [student_fts_row(student) for student in students]
+    if replace:
+        cursor.executemany("DELETE FROM StudentsFts WHERE rowid = ?", [(row[0],) for row in rows])
+    cursor.executemany(
+        """INSERT INTO StudentsFts (rowid, student_no, name, pinyin, initials, class_name, department, major)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows
+    )
+
+
+def rebuild_student_fts(cursor):
+    """按 Students 表完整重建全文索引，同时修正 name_pinyin 列中的拼音首字母。"""
+    cursor.execute("DELETE FROM StudentsFts")
+    students = cursor.execute(
+        "SELECT id, name, name_pinyin, class_name, department, major FROM Students"
+    ).fetchall()
+    index_students(cursor, students, replace=False)
+    updates = []
+    for student in students:
+        initials = convert_to_pinyin_initials(student['name'])
+        if student['name_pinyin'] != initials:
+            updates.append((initials, student['id']))
+    cursor.executemany("UPDATE Students SET name_pinyin = ? WHERE id = ?", updates)
+
+
+def build_student_match_query(text):
+    """
+    把搜索框中的输入转换为 FTS5 检索式，以空白分隔的各项都需命中（AND），每项可命中任意字段。
+    含汉字的项按逐字短语匹配（可匹配姓名、班级等中的任意连续片段），
+    其余项（全拼、首字母、学号、班号）按前缀匹配。
+    :return: 检索式；输入为空时返回 None。
+    """
+    terms = []
+    for term in (text or '').split():
+        term = segment(term).replace('"', '""')
+        if term:
+            terms.append(f'"{term}"*')
+    return " ".join(terms) or None
+
+
+# 检索式由 FTS5 按 rank 顺序输出，再按 rowid 取出学生记录
+SEARCH_STUDENTS_SQL = """
+    SELECT s.id, s.name, s.gender, s.enrollment_year, s.department, s.major, s.class_name, s.contact_info
+    FROM StudentsFts
+    JOIN Students s ON s.id = StudentsFts.rowid
+    WHERE StudentsFts MATCH ?
+    ORDER BY StudentsFts.rank
+    LIMIT ?
+"""
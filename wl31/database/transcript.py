@@ -0,0 +1,174 @@
+# wl31/database/transcript.py
+# 描述: 成绩单与学分绩点（GPA）: 按学期和累计计算学分加权 GPA，批量生成全体学生的 GPA 报表，以及结果缓存。
+
+import re
+import threading
+from wl31 import config
+
+# 学期名称中的起始学年，如 "2024-2025 秋季" -> 2024
+_SEMESTER_YEAR = re.compile(r'(\d{4})')
+# 同一学年内各学期的先后顺序（秋季学期在前）
+_TERM_ORDER = ('秋', '冬', '春', '夏')
+
+
+def grade_point_case(column, scale=config.GPA_SCALE):
+    """
+    生成把分数换算为绩点的 SQL CASE 表达式，如
+    "CASE WHEN g.score >= 90.0 THEN 4.0 ... ELSE 0.0 END"。
+    换算表来自配置而非用户输入，数值经 float() 规范化后直接写入 SQL。
+    :param column: 分数列，如 "g.score"。
+    :param scale: [(最低分, 绩点), ...]，按最低分从高到低排列。
+    """
+    branches = " ".join(f"WHEN {column} >= {float(min_score)} THEN {float(point)}" for min_score, point in scale)
+    return f"CASE {branches} ELSE 0.0 END"
+
+
+def grade_points(scores, scale=config.GPA_SCALE):
+    """
+    向量化地把一组分数（numpy 数组）换算为绩点，结果与 grade_point_case 一致。
+    """
+    import numpy as np
+    thresholds = np.array([float(min_score) for min_score, _ in reversed(scale)])
+    points = np.array([0.0] + [float(point) for _, point in reversed(scale)])
+    # 每个分数达到的最高一档: searchsorted 返回不超过该分数的门槛个数
+    return points[np.searchsorted(thresholds, scores, side='right')]
+
+
+def semester_sort_key(semester):
+    """学期的时间顺序: 先按起始学年，再按学年内的学期（秋、冬、春、夏），无法识别的排在最后。"""
+    semester = semester or ''
+    match = _SEMESTER_YEAR.search(semester)
+    year = int(match.group(1)) if match else 9999
+    term = next((i for i, name in enumerate(_TERM_ORDER) if name in semester), len(_TERM_ORDER))
+    return year, term, semester
+
+
+def transcript_sql(scale=config.GPA_SCALE, pass_score=config.PASS_SCORE):
+    """
+    单个学生按学期汇总的 SQL，一次查询得到每个学期的课程数、学分、已获学分、学分加权绩点和与加权分数之和。
+    Grades 按 (student_id, course_id) 唯一索引定位该生的成绩，Courses 按主键查找。
+    """
+    return f"""
+        SELECT c.semester,
+               COUNT(*) AS courses,
+               SUM(c.credits) AS credits,
+               SUM(CASE WHEN g.score >= {float(pass_score)} THEN c.credits ELSE 0 END) AS earned_credits,
+               SUM(c.credits * ({grade_point_case('g.score', scale)})) AS weighted_points,
+               SUM(c.credits * g.score) AS weighted_score
+        FROM Grades g
+        JOIN Courses c ON c.id = g.course_id
+        WHERE g.student_id = ?
+        GROUP BY c.semester
+    """
+
+
+def _ratio(total, credits):
+    return round(total / credits, 2) if credits else 0.0
+
+
+def build_transcript(rows):
+    """
+    由按学期汇总的行计算成绩单，学期按时间顺序排列，并逐学期累计。
+    GPA 与平均分均按学分加权；学分为 0 的学期 GPA 记为 0。
+    :param rows: transcript_sql 的查询结果。
+    :return: 字典，包含 semesters（每学期的 semester, courses, credits, earned_credits, gpa, average,
+             cumulative_credits, cumulative_gpa）以及累计的 courses, credits, earned_credits, gpa, average。
+    """
+    semesters = []
+    courses = credits = earned = points = score = 0
+    for row in sorted(rows, key=lambda row: semester_sort_key(row['semester'])):
+        courses += row['courses']
+        credits += row['credits']
+        earned += row['earned_credits']
+        points += row['weighted_points']
+        score += row['weighted_score']
+        semesters.append({
+            'semester': row['semester'],
+            'courses': row['courses'],
+            'credits': row['credits'],
+            'earned_credits': row['earned_credits'],
+            'gpa': _ratio(row['weighted_points'], row['credits']),
+            'average': _ratio(row['weighted_score'], row['credits']),
+            'cumulative_credits': credits,
+            'cumulative_gpa': _ratio(points, credits),
+        })
+    return {
+        'semesters': semesters,
+        'courses': courses,
+        'credits': credits,
+        'earned_credits': earned,
+        'gpa': _ratio(points, credits),
+        'average': _ratio(score, credits),
+    }
+
+
+def compute_gpa_report(student_ids, credits, scores, scale=config.GPA_SCALE, pass_score=config.PASS_SCORE):
+    """
+    向量化计算一批成绩所属各学生的学分加权 GPA。
+    :param student_ids, credits, scores: 等长的 numpy 数组，每个元素对应一条成绩。
+    :return: {student_id: {'courses', 'credits', 'earned_credits', 'gpa', 'average'}}
+    """
+    import numpy as np
+    if student_ids.size == 0:
+        return {}
+    ids, index = np.unique(student_ids, return_inverse=True)
+    total_credits = np.bincount(index, weights=credits)
+    earned = np.bincount(index, weights=credits * (scores >= pass_score))
+    points = np.bincount(index, weights=credits * grade_points(scores, scale))
+    weighted_score = np.bincount(index, weights=credits * scores)
+    courses = np.bincount(index)
+    report = {}
+    for i, student_id in enumerate(ids.tolist()):
+        report[student_id] = {
+            'courses': int(courses[i]),
+            'credits': float(total_credits[i]),
+            'earned_credits': float(earned[i]),
+            'gpa': _ratio(float(points[i]), float(total_credits[i])),
+            'average': _ratio(float(weighted_score[i]), float(total_credits[i])),
+        }
+    return report
+
+
+class TranscriptCache:
+    """
+    缓存学生成绩单和 GPA 报表，直到相关成绩变化。
+    成绩的录入/修改/删除使该生的成绩单失效；报表覆盖多名学生，任一成绩变化都会使所有报表失效。
+    课程学分或学期变化会影响所有选课学生，直接清空缓存。
+    """
+    def __init__(self):
+        self._transcripts = {} # student_id -> 成绩单
+        self._reports = {}     # (class_name, semester) -> 报表
+        self._lock = threading.Lock()
+
+    def get(self, student_id):
+        with self._lock:
+            return self._transcripts.get(student_id)
+
+    def put(self, student_id, transcript):
+        with self._lock:
+            self._transcripts[student_id] = transcript
+
+    def get_report(self, key):
+        with self._lock:
+            return self._reports.get(key)
+
+    def put_report(self, key, report):
+        with self._lock:
+            self._reports[key] = report
+
+    def invalidate_students(self, student_ids):
+        """使一批学生的成绩单以及所有报表失效。"""
+        with self._lock:
+            for student_id in student_ids:
+                self._transcripts.pop(student_id, None)
+            self._reports.clear()
+
+    def invalidate_reports(self):
+        """只使报表失效（如学生转班，成绩单本身不变）。"""
+        with self._lock:
+            self._reports.clear()
+
+    def clear(self):
+        with self._lock:
+            self._transcripts.clear()
+            self._reports.clear()
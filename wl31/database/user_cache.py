@@ -0,0 +1,93 @@
+# wl31/database/user_cache.py
+# 描述: 按用户ID / 用户名缓存用户身份信息的有界 LRU 缓存。
+
+import threading
+from collections import OrderedDict
+from wl31 import config
+
+
+class UserCache:
+    """
+    用户身份信息的 LRU 缓存。
+
+    每个用户ID占一个缓存槽，槽内分别缓存用户账户、学生信息和教师信息，
+    另有用户名到用户ID的映射，按用户名查询时同样命中缓存。
+    超出容量时淘汰最久未使用的用户；修改用户的操作应调用 invalidate 使其失效。
+    缓存返回的是副本，调用方修改返回值不会影响缓存。
+    """
+    KINDS = ('user', 'student', 'teacher')
+
+    def __init__(self, capacity=config.USER_CACHE_SIZE):
+        """
+        :param capacity: 最多缓存的用户数。
+        """
+        self.capacity = capacity
+        self._entries = OrderedDict() # user_id -> {kind: dict}
+        self._ids_by_username = {}    # username -> user_id
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, kind='user'):
+        """返回缓存的信息副本，未缓存时返回 None。"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or kind not in entry:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(entry[kind])
+
+    def get_by_username(self, username):
+        """按用户名返回缓存的用户账户副本，未缓存时返回 None。"""
+        with self._lock:
+            user_id = self._ids_by_username.get(username)
+            entry = self._entries.get(user_id) if user_id is not None else None
+            if entry is None or 'user' not in entry:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(entry['user'])
+
+    def put(self, user_id, kind, data):
+        """缓存一条信息（kind 为 'user' 时 data 中需包含 username）。"""
+        with self._lock:
+            entry = self._entries.setdefault(user_id, {})
+            entry[kind] = dict(data)
+            if kind == 'user':
+                self._ids_by_username[data['username']] = user_id
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.capacity:
+                _, evicted = self._entries.popitem(last=False)
+                self._forget_username(evicted)
+
+    def invalidate(self, user_id):
+        """使某个用户的所有缓存信息失效（不存在时忽略）。"""
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry:
+                self._forget_username(entry)
+
+    def _forget_username(self, entry):
+        user = entry.get('user')
+        if user and self._ids_by_username.get(user['username']) == user['id']:
+            del self._ids_by_username[user['username']]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_username.clear()
+
+    def stats(self):
+        """返回命中/未命中次数、命中率和当前缓存的用户数。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits * 100 / total, 2) if total else 0,
+                'size': len(self._entries),
+                'capacity': self.capacity,
+            }
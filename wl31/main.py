@@ -10,31 +10,31 @@ sys.path.insert(0, project_root)
 
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QApplication, QDialog, QMessageBox, QMainWindow, QTableWidgetItem, QVBoxLayout, QFileDialog
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QPixmap
 import io
 
 # --- 项目模块导入 ---
+# 启动时只导入登录窗口需要的模块；数据库、验证码（PIL）、Excel（openpyxl）、
+# 各功能选项卡等较重的模块在首次使用时才导入，缩短登录窗口出现前的等待时间。
+# 这也保证了多进程以 spawn 方式重新导入本模块时不会打开数据库。
 from wl31.ui.login_window import Ui_LoginWindow
-from wl31.ui.main_window import Ui_MainWindow
-from wl31.ui.student_dialog import Ui_StudentDialog
-from wl31.ui.course_management_tab import CourseManagementTab
-from wl31.ui.grade_management_tab import GradeManagementTab
-from wl31.ui.my_grades_tab import MyGradesTab
-from wl31.ui.data_analysis_tab import DataAnalysisTab
-from wl31.ui.teacher_management_tab import TeacherManagementTab
-from wl31.ui.action_log_tab import ActionLogTab
-from wl31.ui.profile_dialog import ProfileDialog
-from wl31.database.database_manager import DatabaseManager
-from wl31.utils.captcha import Captcha
-from wl31.utils.hash_utils import hash_password, verify_password
-from wl31.utils import excel_utils
 from wl31 import config
 
 # --- 全局变量 ---
-db_manager = DatabaseManager(config.DATABASE_PATH)
-captcha_generator = Captcha()
+db_manager = None        # 登录窗口显示后由 open_database() 创建
+captcha_generator = None # 首次刷新验证码时创建
 current_user = None
 
+
+def open_database():
+    """创建全局数据库管理器（已创建时直接返回）。"""
+    global db_manager
+    if db_manager is None:
+        from wl31.database.database_manager import DatabaseManager
+        db_manager = DatabaseManager(config.DATABASE_PATH)
+    return db_manager
+
 # --- 登录窗口逻辑 ---
 class LoginController(QDialog):
     def __init__(self):
@@ -48,9 +48,20 @@ class LoginController(QDialog):
         self.ui.wl_login_button.clicked.connect(self.handle_login)
         self.ui.wl_captcha_image.mousePressEvent = self.refresh_captcha # 点击图片刷新
 
+        # 窗口显示后再生成验证码、打开数据库
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """登录窗口显示后完成剩余的初始化工作。"""
+        QApplication.processEvents() # 先让窗口绘制出来
         self.refresh_captcha()
+        open_database()
 
     def refresh_captcha(self, event=None):
+        global captcha_generator
+        if captcha_generator is None:
+            from wl31.utils.captcha import Captcha
+            captcha_generator = Captcha()
         self.captcha_text, captcha_image_pil = captcha_generator.generate()
         
         # Convert PIL image to QPixmap using a buffer to avoid version conflicts
@@ -83,7 +94,8 @@ class LoginController(QDialog):
             return
 
         # 3. 验证用户
-        user_data = db_manager.get_user(username)
+        from wl31.utils.hash_utils import verify_password
+        user_data = open_database().get_user(username)
 
         if user_data and user_data['role'] == role and verify_password(password, user_data['password_hash']):
             if user_data['is_frozen']:
@@ -105,6 +117,7 @@ class LoginController(QDialog):
 class StudentDialogController(QDialog):
     def __init__(self, student_id=None):
         super().__init__()
+        from wl31.ui.student_dialog import Ui_StudentDialog
         self.ui = Ui_StudentDialog()
         self.ui.setupUi(self)
         self.student_id = student_id
@@ -168,9 +181,11 @@ class StudentDialogController(QDialog):
 class MainWindowController(QMainWindow):
     def __init__(self, user_info):
         super().__init__()
+        from wl31.ui.main_window import Ui_MainWindow
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
         self.user_info = user_info
+        self.lazy_tabs = {} # 占位页 -> 创建真正选项卡的函数，首次切换到该页时才创建
 
         self.setup_menu()
         self.update_status_bar()
@@ -203,24 +218,8 @@ class MainWindowController(QMainWindow):
         self.ui.action_change_password.triggered.connect(self.open_profile_dialog)
         self.ui.action_exit.triggered.connect(self.close)
 
-        # 学生管理
-        if hasattr(self, 'student_management_tab'):
-            self.ui.student_add_button.clicked.connect(self.add_student)
-            self.ui.student_edit_button.clicked.connect(self.edit_student)
-            self.ui.student_delete_button.clicked.connect(self.delete_student)
-
-            self.ui.student_import_button.clicked.connect(self.handle_student_batch_import)
-
-        # 数据分析
-        if hasattr(self, 'data_analysis_tab'):
-            self.data_analysis_tab.search_grades_button.clicked.connect(self.query_grades)
-            self.data_analysis_tab.search_pinyin_button.clicked.connect(self.search_student_by_pinyin)
-            self.data_analysis_tab.calculate_stats_button.clicked.connect(self.calculate_stats)
-            self.data_analysis_tab.export_button.clicked.connect(self.export_data_analysis_results)
-
-        # 教师管理
-        if hasattr(self, 'teacher_management_tab'):
-            self.teacher_management_tab.import_button.clicked.connect(self.handle_teacher_batch_import)
+        # 选项卡在首次切换到时创建，各选项卡的信号在创建时连接
+        self.ui.tabWidget.currentChanged.connect(self.on_tab_changed)
 
     def setup_tabs_for_role(self):
         """根据用户角色动态创建和设置选项卡"""
@@ -256,55 +255,142 @@ class MainWindowController(QMainWindow):
         self.ui.action_data_analysis.setVisible(is_admin or is_teacher)
         self.ui.action_log_view.setVisible(is_admin)
 
+    def add_lazy_tab(self, title, create_tab):
+        """添加一个占位页，首次切换到该页时调用 create_tab() 创建真正的选项卡。"""
+        placeholder = QtWidgets.QWidget()
+        self.ui.tabWidget.addTab(placeholder, title)
+        self.lazy_tabs[placeholder] = create_tab
+
+    def on_tab_changed(self, index):
+        """切换到尚未创建的选项卡时，用真正的选项卡替换占位页"""
+        placeholder = self.ui.tabWidget.widget(index)
+        create_tab = self.lazy_tabs.pop(placeholder, None)
+        if create_tab is None:
+            return
+        title = self.ui.tabWidget.tabText(index)
+        tab = create_tab()
+        self.ui.tabWidget.blockSignals(True) # 替换过程中不触发 currentChanged
+        self.ui.tabWidget.removeTab(index)
+        self.ui.tabWidget.insertTab(index, tab, title)
+        self.ui.tabWidget.setCurrentIndex(index)
+        self.ui.tabWidget.blockSignals(False)
+        placeholder.deleteLater()
+
     def setup_student_management_tab(self):
         """设置学生管理选项卡"""
+        self.add_lazy_tab("学生信息管理", self.create_student_management_tab)
+
+    def create_student_management_tab(self):
         self.student_management_tab = self.ui.student_management_tab
-        self.ui.tabWidget.addTab(self.student_management_tab, "学生信息管理")
+        self.ui.student_add_button.clicked.connect(self.add_student)
+        self.ui.student_edit_button.clicked.connect(self.edit_student)
+        self.ui.student_delete_button.clicked.connect(self.delete_student)
+        self.ui.student_import_button.clicked.connect(self.handle_student_batch_import)
+        self.ui.student_freeze_button.clicked.connect(lambda: self.set_selected_students_frozen(1))
+        self.ui.student_unfreeze_button.clicked.connect(lambda: self.set_selected_students_frozen(0))
+        self.ui.student_reset_password_button.clicked.connect(self.reset_selected_students_passwords)
+        self.ui.student_table.verticalScrollBar().valueChanged.connect(self.on_student_table_scrolled)
+        self.ui.student_search_button.clicked.connect(self.search_students_in_table)
+        self.ui.student_search_input.returnPressed.connect(self.search_students_in_table)
         self.load_students()
+        return self.student_management_tab
 
     def setup_teacher_management_tab(self):
         """设置教师管理选项卡"""
+        self.add_lazy_tab("教师信息管理", self.create_teacher_management_tab)
+
+    def create_teacher_management_tab(self):
+        from wl31.ui.teacher_management_tab import TeacherManagementTab
         self.teacher_management_tab = TeacherManagementTab(db_manager, self.user_info)
-        self.ui.tabWidget.addTab(self.teacher_management_tab, "教师信息管理")
+        self.teacher_management_tab.import_button.clicked.connect(self.handle_teacher_batch_import)
+        return self.teacher_management_tab
 
     def setup_course_management_tab(self):
         """设置课程管理选项卡"""
+        self.add_lazy_tab("课程管理", self.create_course_management_tab)
+
+    def create_course_management_tab(self):
+        from wl31.ui.course_management_tab import CourseManagementTab
         self.course_management_tab = CourseManagementTab(db_manager, self.user_info['id'])
-        self.ui.tabWidget.addTab(self.course_management_tab, "课程管理")
+        return self.course_management_tab
 
     def setup_grade_management_tab(self):
         """设置成绩管理选项卡"""
+        self.add_lazy_tab("成绩管理", self.create_grade_management_tab)
+
+    def create_grade_management_tab(self):
+        from wl31.ui.grade_management_tab import GradeManagementTab
         self.grade_management_tab = GradeManagementTab(db_manager, self.user_info)
-        self.ui.tabWidget.addTab(self.grade_management_tab, "成绩管理")
+        return self.grade_management_tab
 
     def setup_my_grades_tab(self):
         """设置我的成绩选项卡"""
+        self.add_lazy_tab("我的成绩", self.create_my_grades_tab)
+
+    def create_my_grades_tab(self):
+        from wl31.ui.my_grades_tab import MyGradesTab
         self.my_grades_tab = MyGradesTab(db_manager, self.user_info)
-        self.ui.tabWidget.addTab(self.my_grades_tab, "我的成绩")
+        return self.my_grades_tab
 
     def setup_data_analysis_tab(self):
         """设置数据分析选项卡"""
+        self.add_lazy_tab("数据分析", self.create_data_analysis_tab)
+
+    def create_data_analysis_tab(self):
+        from wl31.ui.data_analysis_tab import DataAnalysisTab
         self.data_analysis_tab = DataAnalysisTab(db_manager, self.user_info)
-        self.ui.tabWidget.addTab(self.data_analysis_tab, "数据分析")
+        self.data_analysis_tab.search_grades_button.clicked.connect(self.query_grades)
+        self.data_analysis_tab.search_pinyin_button.clicked.connect(self.search_students_for_analysis)
+        self.data_analysis_tab.pinyin_input.returnPressed.connect(self.search_students_for_analysis)
+        self.data_analysis_tab.calculate_stats_button.clicked.connect(self.calculate_stats)
+        self.data_analysis_tab.dashboard_button.clicked.connect(self.show_grade_dashboard)
+        self.data_analysis_tab.export_button.clicked.connect(self.export_data_analysis_results)
+        self.data_analysis_tab.ranking_scope_combo.currentIndexChanged.connect(self.load_ranking_partitions)
+        self.data_analysis_tab.ranking_button.clicked.connect(self.show_rankings)
+        self.data_analysis_tab.student_ranking_button.clicked.connect(self.show_student_rankings)
         self.load_data_for_analysis_tab()
-
+        return self.data_analysis_tab
 
     def setup_action_log_tab(self):
         """设置操作日志选项卡"""
+        self.add_lazy_tab("操作日志", self.create_action_log_tab)
+
+    def create_action_log_tab(self):
+        from wl31.ui.action_log_tab import ActionLogTab
         self.action_log_tab = ActionLogTab(db_manager, self.user_info)
-        self.ui.tabWidget.addTab(self.action_log_tab, "操作日志")
+        return self.action_log_tab
 
     def load_students(self):
-        """从数据库加载学生信息并填充到表格中"""
+        """从数据库加载第一页学生信息并填充到表格中，后续页在滚动到底部时加载"""
         # 修正：严格按照 学号, 姓名, 性别, 入学年份, 院系, 专业, 班级, 联系方式 的顺序
         headers = ["学号", "姓名", "性别", "入学年份", "院系", "专业", "班级", "联系方式"]
         self.ui.student_table.setColumnCount(len(headers))
         self.ui.student_table.setHorizontalHeaderLabels(headers)
-        
-        students = db_manager.get_all_students()
+
         self.ui.student_table.setRowCount(0)
-        for row, student in enumerate(students):
-            self.ui.student_table.insertRow(row)
+        self.last_loaded_student = None # 键集分页游标: 已加载的最后一行
+        self.all_students_loaded = False
+        self.load_more_students()
+        self.ui.student_table.resizeColumnsToContents()
+
+    def load_more_students(self):
+        """加载下一页学生信息并追加到表格末尾"""
+        if self.all_students_loaded:
+            return
+        students = db_manager.get_all_students(limit=config.STUDENT_PAGE_SIZE, after=self.last_loaded_student)
+        if len(students) < config.STUDENT_PAGE_SIZE:
+            self.all_students_loaded = True
+        if not students:
+            return
+        self.last_loaded_student = students[-1]
+        self.append_student_rows(students)
+
+    def append_student_rows(self, students):
+        """将学生记录追加到表格末尾"""
+        start_row = self.ui.student_table.rowCount()
+        self.ui.student_table.setRowCount(start_row + len(students))
+        for offset, student in enumerate(students):
+            row = start_row + offset
             # 数据库字段: id, name, gender, enrollment_year, department, major, class_name, contact_info
             self.ui.student_table.setItem(row, 0, QTableWidgetItem(str(student['id'])))
             self.ui.student_table.setItem(row, 1, QTableWidgetItem(student['name']))
@@ -314,7 +400,21 @@ class MainWindowController(QMainWindow):
             self.ui.student_table.setItem(row, 5, QTableWidgetItem(student['major']))
             self.ui.student_table.setItem(row, 6, QTableWidgetItem(student['class_name']))
             self.ui.student_table.setItem(row, 7, QTableWidgetItem(student['contact_info']))
-        self.ui.student_table.resizeColumnsToContents()
+
+    def search_students_in_table(self):
+        """按关键词搜索学生（结果按相关度排序，不分页），关键词为空时恢复完整列表"""
+        query = self.ui.student_search_input.text().strip()
+        if not query:
+            self.load_students()
+            return
+        self.ui.student_table.setRowCount(0)
+        self.all_students_loaded = True # 搜索结果一次加载，滚动时不再追加
+        self.append_student_rows(db_manager.search_students(query, limit=config.STUDENT_SEARCH_LIMIT))
+
+    def on_student_table_scrolled(self, value):
+        """滚动到表格底部时加载下一页"""
+        if value >= self.ui.student_table.verticalScrollBar().maximum():
+            self.load_more_students()
 
     def add_student(self):
         """打开新增学生对话框"""
@@ -371,15 +471,61 @@ class MainWindowController(QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            # 从UI和数据库中删除
+            rows = sorted((r.row() for r in selected_rows), reverse=True)
+            student_ids = [int(self.ui.student_table.item(row, 0).text()) for row in rows]
+            # 整批在一个事务中删除，失败时全部回滚
+            if db_manager.delete_students(self.user_info['id'], student_ids) is None:
+                QMessageBox.critical(self, "错误", "删除学生时失败，所选记录均未删除。")
+                return
             # 从后往前删，避免索引错乱
-            for row in sorted([r.row() for r in selected_rows], reverse=True):
-                student_id = self.ui.student_table.item(row, 0).text()
-                if db_manager.delete_student_record(self.user_info['id'], int(student_id)):
-                    self.ui.student_table.removeRow(row)
-                else:
-                    QMessageBox.critical(self, "错误", f"删除学生ID {student_id} 时失败。")
-            QMessageBox.information(self, "成功", "所选学生记录已删除。")
+            self.ui.student_table.setUpdatesEnabled(False)
+            for row in rows:
+                self.ui.student_table.removeRow(row)
+            self.ui.student_table.setUpdatesEnabled(True)
+            QMessageBox.information(self, "成功", f"已删除 {len(rows)} 条学生记录。")
+
+    def selected_student_ids(self):
+        """获取学生表格中所有选中行的学号"""
+        selected_rows = self.ui.student_table.selectionModel().selectedRows()
+        if not selected_rows:
+            QMessageBox.warning(self, "警告", "请先选择学生（可先按班级搜索，再全选）。")
+        return [int(self.ui.student_table.item(index.row(), 0).text()) for index in selected_rows]
+
+    def set_selected_students_frozen(self, is_frozen):
+        """冻结或解冻选定学生的账户"""
+        student_ids = self.selected_student_ids()
+        if not student_ids:
+            return
+        action_text = "冻结" if is_frozen else "解冻"
+        reply = QMessageBox.question(self, f'确认{action_text}', f'确定要{action_text}选定的 {len(student_ids)} 名学生的账户吗？',
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        changed = db_manager.set_accounts_status(self.user_info['id'], is_frozen, {'student_id': student_ids})
+        if changed is None:
+            QMessageBox.critical(self, "错误", f"{action_text}账户失败，所选账户均未修改。")
+        else:
+            QMessageBox.information(self, "成功", f"已{action_text} {changed} 个账户。")
+
+    def reset_selected_students_passwords(self):
+        """将选定学生的密码重置为身份证号后六位"""
+        student_ids = self.selected_student_ids()
+        if not student_ids:
+            return
+        reply = QMessageBox.question(self, '确认重置密码',
+                                     f'确定要将选定的 {len(student_ids)} 名学生的密码重置为身份证号后六位吗？',
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        result = db_manager.reset_passwords(self.user_info['id'], {'student_id': student_ids})
+        if result is None:
+            QMessageBox.critical(self, "错误", "重置密码失败，所选账户均未修改。")
+            return
+        reset_count, skipped = result
+        message = f"已重置 {reset_count} 个账户的密码。"
+        if skipped:
+            message += f"\n{skipped} 名学生没有身份证号，未重置。"
+        QMessageBox.information(self, "成功", message)
 
     def handle_student_batch_import(self):
         """处理批量导入学生数据"""
@@ -388,6 +534,7 @@ class MainWindowController(QMainWindow):
             return
 
         try:
+            from wl31.utils import excel_utils
             students_data = excel_utils.import_students_from_excel(path)
             if students_data is None: # 函数出错返回None
                 QMessageBox.critical(self, "错误", "读取Excel文件失败，请检查文件格式或内容。")
@@ -416,6 +563,7 @@ class MainWindowController(QMainWindow):
             return
 
         try:
+            from wl31.utils import excel_utils
             teachers_data = excel_utils.import_teachers_from_excel(path)
             if teachers_data is None:
                 QMessageBox.critical(self, "错误", "读取Excel文件失败，请检查文件格式或内容。")
@@ -440,6 +588,7 @@ class MainWindowController(QMainWindow):
 
     def open_profile_dialog(self):
         """打开修改个人信息对话框"""
+        from wl31.ui.profile_dialog import ProfileDialog
         dialog = ProfileDialog(db_manager, self.user_info, self)
         dialog.exec_()
 
@@ -456,14 +605,27 @@ class MainWindowController(QMainWindow):
             self.data_analysis_tab.course_combo_stats.addItem(course['name'], course['id'])
         
         # 加载班级
-        # A bit inefficient, but works for now.
-        students = db_manager.get_all_students()
-        classes = sorted(list(set(s['class_name'] for s in students if s['class_name'])))
+        classes = db_manager.get_class_names()
         self.data_analysis_tab.class_combo.clear()
         self.data_analysis_tab.class_combo.addItem("请选择班级", None)
         for class_name in classes:
             self.data_analysis_tab.class_combo.addItem(class_name)
 
+        # 加载排名的学期和分区
+        self.data_analysis_tab.ranking_semester_combo.clear()
+        self.data_analysis_tab.ranking_semester_combo.addItem("总评（全部学期）", "")
+        for semester in db_manager.get_semesters():
+            self.data_analysis_tab.ranking_semester_combo.addItem(semester, semester)
+        self.load_ranking_partitions()
+
+    def load_ranking_partitions(self):
+        """按所选排名范围加载班级、专业或入学年级列表"""
+        scope = self.data_analysis_tab.ranking_scope_combo.currentData()
+        combo = self.data_analysis_tab.ranking_partition_combo
+        combo.clear()
+        for partition_key in db_manager.get_ranking_partitions(scope):
+            combo.addItem(partition_key or "未填写", partition_key)
+
     def query_grades(self):
         """处理成绩组合查询"""
         student_id = self.data_analysis_tab.student_id_input.text().strip()
@@ -485,14 +647,14 @@ class MainWindowController(QMainWindow):
             table.setItem(row, 2, QTableWidgetItem(data['course_name']))
             table.setItem(row, 3, QTableWidgetItem(str(data['score'])))
 
-    def search_student_by_pinyin(self):
-        """处理姓名拼音模糊搜索"""
-        pinyin = self.data_analysis_tab.pinyin_input.text().strip()
-        if not pinyin:
-            QMessageBox.warning(self, "提示", "请输入拼音首字母进行搜索。")
+    def search_students_for_analysis(self):
+        """处理学生模糊搜索（姓名、拼音、学号、班级等）"""
+        query = self.data_analysis_tab.pinyin_input.text().strip()
+        if not query:
+            QMessageBox.warning(self, "提示", "请输入姓名、拼音、学号或班级进行搜索。")
             return
-        
-        results = db_manager.search_students_by_pinyin(pinyin)
+
+        results = db_manager.search_students(query, limit=config.STUDENT_SEARCH_LIMIT)
         table = self.data_analysis_tab.result_table
         table.setRowCount(0)
         table.setColumnCount(3)
@@ -520,6 +682,67 @@ class MainWindowController(QMainWindow):
                        f"  - 及格率: {stats['pass_rate']}%")
         self.data_analysis_tab.stats_result_label.setText(result_text)
 
+    def show_grade_dashboard(self):
+        """在结果表格中显示所有班级、课程的成绩统计（读取汇总表）"""
+        course_id = self.data_analysis_tab.course_combo_stats.currentData()
+        results = db_manager.get_grade_stats_dashboard(course_id)
+        table = self.data_analysis_tab.result_table
+        table.setRowCount(0)
+        table.setColumnCount(6)
+        table.setHorizontalHeaderLabels(["班级", "课程", "人数", "平均分", "标准差", "及格率(%)"])
+        for row, data in enumerate(results):
+            table.insertRow(row)
+            table.setItem(row, 0, QTableWidgetItem(data['class_name'] or "未分班"))
+            table.setItem(row, 1, QTableWidgetItem(data['course_name']))
+            table.setItem(row, 2, QTableWidgetItem(str(data['count'])))
+            table.setItem(row, 3, QTableWidgetItem(str(data['average'])))
+            table.setItem(row, 4, QTableWidgetItem(str(data['std_dev'])))
+            table.setItem(row, 5, QTableWidgetItem(str(data['pass_rate'])))
+
+    def show_rankings(self):
+        """在结果表格中显示所选班级/专业/年级的 GPA 排名"""
+        tab = self.data_analysis_tab
+        scope = tab.ranking_scope_combo.currentData()
+        partition_key = tab.ranking_partition_combo.currentData()
+        if partition_key is None:
+            QMessageBox.warning(self, "提示", "请选择班级、专业或入学年级。")
+            return
+
+        results = db_manager.get_rankings(scope, partition_key, tab.ranking_semester_combo.currentData())
+        table = tab.result_table
+        table.setRowCount(0)
+        table.setColumnCount(6)
+        table.setHorizontalHeaderLabels(["名次", "学号", "姓名", "班级", "GPA", "学分"])
+        for row, data in enumerate(results):
+            table.insertRow(row)
+            table.setItem(row, 0, QTableWidgetItem(f"{data['rank']} / {data['size']}"))
+            table.setItem(row, 1, QTableWidgetItem(str(data['student_id'])))
+            table.setItem(row, 2, QTableWidgetItem(data['name']))
+            table.setItem(row, 3, QTableWidgetItem(data['class_name'] or "未分班"))
+            table.setItem(row, 4, QTableWidgetItem(f"{data['gpa']:.2f}"))
+            table.setItem(row, 5, QTableWidgetItem(f"{data['credits']:g}"))
+
+    def show_student_rankings(self):
+        """在结果表格中显示某个学生在班级、专业、年级中每学期及总评的名次"""
+        student_id = self.data_analysis_tab.student_id_input.text().strip()
+        if not student_id.isdigit():
+            QMessageBox.warning(self, "提示", "请在上方输入学号。")
+            return
+
+        scope_names = {'class': "班级", 'major': "专业", 'cohort': "入学年级"}
+        results = db_manager.get_student_rankings(int(student_id))
+        table = self.data_analysis_tab.result_table
+        table.setRowCount(0)
+        table.setColumnCount(5)
+        table.setHorizontalHeaderLabels(["学期", "排名范围", "班级/专业/年级", "名次", "GPA"])
+        for row, data in enumerate(results):
+            table.insertRow(row)
+            table.setItem(row, 0, QTableWidgetItem(data['semester'] or "总评"))
+            table.setItem(row, 1, QTableWidgetItem(scope_names[data['scope']]))
+            table.setItem(row, 2, QTableWidgetItem(data['partition_key'] or "未填写"))
+            table.setItem(row, 3, QTableWidgetItem(f"{data['rank']} / {data['size']}"))
+            table.setItem(row, 4, QTableWidgetItem(f"{data['gpa']:.2f}"))
+
     def export_data_analysis_results(self):
         """导出数据分析表格中的数据到Excel"""
         table = self.data_analysis_tab.result_table
@@ -537,6 +760,7 @@ class MainWindowController(QMainWindow):
             row_data = [table.item(row, col).text() for col in range(table.columnCount())]
             data.append(row_data)
 
+        from wl31.utils import excel_utils
         if excel_utils.export_to_excel(data, headers, path):
             QMessageBox.information(self, "成功", f"数据已成功导出到 {path}")
         else:
@@ -589,5 +813,5 @@ if __name__ == "__main__":
     try:
         main()
     finally:
-        db_manager.close() # 确保程序退出时关闭数据库连接
-        print("数据库连接已关闭。")
\ No newline at end of file
+        if db_manager is not None:
+            db_manager.close() # 确保程序退出时关闭数据库连接
\ No newline at end of file
@@ -1,7 +1,71 @@
 # wl31/ui/action_log_tab.py
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QTableWidget, 
-                             QHeaderView, QTableWidgetItem, QPushButton)
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QTableView,
+                             QHeaderView, QPushButton, QHBoxLayout, QLabel,
+                             QDateEdit, QLineEdit, QComboBox, QCheckBox, QMessageBox)
+from PyQt5.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex
+from wl31 import config
+
+
+class ActionLogTableModel(QAbstractTableModel):
+    """
+    操作日志表格模型。视图滚动到底部时通过 canFetchMore/fetchMore 按页加载，
+    每页用上一页最后一行作为键集分页的起点，只保存已加载的行。
+    """
+    HEADERS = ["ID", "操作用户", "操作类型", "详细描述", "时间"]
+    FIELDS = ['id', 'username', 'action_type', 'description', 'timestamp']
+
+    def __init__(self, parent=None, page_size=config.ACTION_LOG_PAGE_SIZE):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.fetch_page = None
+        self.logs = []
+        self.exhausted = True
+
+    def reset(self, fetch_page=None, logs=None):
+        """
+        重新加载数据。
+        :param fetch_page: fetch_page(after, limit) 返回一页日志，after 为已加载的最后一行（首页为 None）。
+        :param logs: 不分页时直接显示的日志列表（如归档日志）。
+        """
+        self.beginResetModel()
+        self.fetch_page = fetch_page
+        self.logs = list(logs or [])
+        self.exhausted = fetch_page is None
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.logs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self.logs[index.row()][self.FIELDS[index.column()]]
+        return '' if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        page = self.fetch_page(self.logs[-1] if self.logs else None, self.page_size)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.logs), len(self.logs) + len(page) - 1)
+            self.logs.extend(page)
+            self.endInsertRows()
+
 
 class ActionLogTab(QWidget):
     def __init__(self, db_manager, current_user):
@@ -17,29 +81,102 @@ class ActionLogTab(QWidget):
         logs_group = QGroupBox("操作历史记录")
         logs_layout = QVBoxLayout()
 
-        self.refresh_button = QPushButton("刷新记录")
+        # 全文检索: 按描述中的学生ID、课程ID、姓名等查找，结果按相关度排序
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('检索描述，如: student 12 或 "course 3"（留空则按时间显示全部）')
+        self.search_input.returnPressed.connect(self.load_logs)
+        search_layout.addWidget(QLabel("全文检索:"))
+        search_layout.addWidget(self.search_input)
+
+        # 筛选条件: 操作用户、操作类型、日期范围（日期范围同时用于查询归档记录）
+        filter_layout = QHBoxLayout()
+        self.username_input = QLineEdit()
+        self.username_input.setPlaceholderText("用户名")
+        self.action_type_combo = QComboBox()
+        self.action_type_combo.addItem("全部类型", None)
+        for action_type in self.db_manager.get_action_types():
+            self.action_type_combo.addItem(action_type, action_type)
+        self.date_filter_check = QCheckBox("日期:")
+        self.start_date = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.end_date = QDateEdit(QDate.currentDate())
+        for date_edit in (self.start_date, self.end_date):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+        self.refresh_button = QPushButton("查询")
         self.refresh_button.clicked.connect(self.load_logs)
-        
-        self.logs_table = QTableWidget()
-        self.logs_table.setColumnCount(5)
-        self.logs_table.setHorizontalHeaderLabels(["ID", "操作用户", "操作类型", "详细描述", "时间"])
+        self.username_input.returnPressed.connect(self.load_logs)
+        filter_layout.addWidget(QLabel("操作用户:"))
+        filter_layout.addWidget(self.username_input)
+        filter_layout.addWidget(QLabel("操作类型:"))
+        filter_layout.addWidget(self.action_type_combo)
+        filter_layout.addWidget(self.date_filter_check)
+        filter_layout.addWidget(self.start_date)
+        filter_layout.addWidget(QLabel("至"))
+        filter_layout.addWidget(self.end_date)
+        filter_layout.addWidget(self.refresh_button)
+        filter_layout.addStretch(1)
+
+        # 查询已归档的历史日志（超过保留期的日志已移出数据库）
+        archive_layout = QHBoxLayout()
+        self.archive_button = QPushButton("查询归档记录")
+        self.archive_button.clicked.connect(self.load_archived_logs)
+        archive_layout.addWidget(QLabel("超过保留期的日志已归档，按上面的日期范围查询:"))
+        archive_layout.addWidget(self.archive_button)
+        archive_layout.addStretch(1)
+
+        self.logs_model = ActionLogTableModel(self)
+        self.logs_table = QTableView()
+        self.logs_table.setModel(self.logs_model)
         self.logs_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.logs_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        
-        logs_layout.addWidget(self.refresh_button)
+        self.logs_table.verticalHeader().setVisible(False)
+        self.logs_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.logs_table.setSelectionBehavior(QTableView.SelectRows)
+
+        logs_layout.addLayout(search_layout)
+        logs_layout.addLayout(filter_layout)
+        logs_layout.addLayout(archive_layout)
         logs_layout.addWidget(self.logs_table)
         logs_group.setLayout(logs_layout)
-        
+
         main_layout.addWidget(logs_group)
         self.setLayout(main_layout)
 
     def load_logs(self):
-        self.logs_table.setRowCount(0)
-        logs = self.db_manager.get_action_logs(self.current_user['role'])
-        for row, log_data in enumerate(logs):
-            self.logs_table.insertRow(row)
-            self.logs_table.setItem(row, 0, QTableWidgetItem(str(log_data['id'])))
-            self.logs_table.setItem(row, 1, QTableWidgetItem(log_data['username']))
-            self.logs_table.setItem(row, 2, QTableWidgetItem(log_data['action_type']))
-            self.logs_table.setItem(row, 3, QTableWidgetItem(log_data['description']))
-            self.logs_table.setItem(row, 4, QTableWidgetItem(log_data['timestamp']))
\ No newline at end of file
+        filters = {'action_type': self.action_type_combo.currentData()}
+        username = self.username_input.text().strip()
+        if username:
+            user = self.db_manager.get_user(username)
+            if not user:
+                self.logs_model.reset(logs=[])
+                return
+            filters['user_id'] = user['id']
+        elif self.current_user['role'] != 'admin':
+            filters['user_id'] = self.current_user['id']
+        if self.date_filter_check.isChecked():
+            filters['start_time'] = self.start_date.date().toString("yyyy-MM-dd") + " 00:00:00"
+            filters['end_time'] = self.end_date.date().toString("yyyy-MM-dd") + " 23:59:59"
+
+        search_text = self.search_input.text().strip()
+        if search_text:
+            # 相关度排序按已加载的条数分页
+            def fetch_page(after, limit):
+                return self.db_manager.search_action_logs(search_text, self.current_user['role'], limit=limit,
+                                                          offset=len(self.logs_model.logs), **filters)
+        else:
+            def fetch_page(after, limit):
+                return self.db_manager.get_action_logs(self.current_user['role'], after=after, limit=limit,
+                                                       **filters)
+
+        self.logs_model.reset(fetch_page)
+
+    def load_archived_logs(self):
+        start_date = self.start_date.date().toString("yyyy-MM-dd")
+        end_date = self.end_date.date().toString("yyyy-MM-dd")
+        if start_date > end_date:
+            QMessageBox.warning(self, "日期错误", "开始日期不能晚于结束日期。")
+            return
+        logs = self.db_manager.get_archived_action_logs(start_date, end_date,
+                                                        action_type=self.action_type_combo.currentData(),
+                                                        username=self.username_input.text().strip() or None)
+        self.logs_model.reset(logs=logs)
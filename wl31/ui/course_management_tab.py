@@ -107,16 +107,19 @@ class CourseManagementTab(QWidget):
             QMessageBox.warning(self, "警告", "请先选择要删除的课程。")
             return
 
-        row_index = selected_rows[0].row()
-        course_id = self.model.item(row_index, 0).text()
-        course_name = self.model.item(row_index, 1).text()
+        course_ids = [int(self.model.item(index.row(), 0).text()) for index in selected_rows]
+        if len(selected_rows) == 1:
+            course_name = self.model.item(selected_rows[0].row(), 1).text()
+            target = f"课程 '{course_name}'"
+        else:
+            target = f"选定的 {len(selected_rows)} 门课程"
 
-        reply = QMessageBox.question(self, "确认删除", f"确定要删除课程 '{course_name}' 吗？\n这将同时删除所有与该课程相关的学生成绩。",
+        reply = QMessageBox.question(self, "确认删除", f"确定要删除{target}吗？\n这将同时删除所有与这些课程相关的学生成绩。",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            if self.db_manager.delete_course(self.current_user_id, int(course_id)):
-                QMessageBox.information(self, "成功", f"课程 '{course_name}' 已被删除。")
+            if self.db_manager.delete_courses(self.current_user_id, course_ids) is not None:
+                QMessageBox.information(self, "成功", f"{target}已被删除。")
                 self.load_courses()
             else:
                 QMessageBox.critical(self, "失败", "删除课程时发生错误。")
@@ -28,11 +28,12 @@ class DataAnalysisTab(QWidget):
         main_layout.addWidget(query_group)
 
         # 模糊搜索
-        fuzzy_search_group = QGroupBox("学生模糊搜索 (姓名拼音首字母)")
+        fuzzy_search_group = QGroupBox("学生模糊搜索")
         fuzzy_layout = QFormLayout()
         self.pinyin_input = QLineEdit()
+        self.pinyin_input.setPlaceholderText("姓名、全拼、拼音首字母、学号或班级，如: zhangsan、zs、软件2301")
         self.search_pinyin_button = QPushButton("搜索学生")
-        fuzzy_layout.addRow("姓名拼音首字母:", self.pinyin_input)
+        fuzzy_layout.addRow("关键词:", self.pinyin_input)
         fuzzy_layout.addRow(self.search_pinyin_button)
         fuzzy_search_group.setLayout(fuzzy_layout)
         main_layout.addWidget(fuzzy_search_group)
@@ -43,14 +44,34 @@ class DataAnalysisTab(QWidget):
         self.class_combo = QComboBox()
         self.course_combo_stats = QComboBox()
         self.calculate_stats_button = QPushButton("计算统计数据")
+        self.dashboard_button = QPushButton("全部班级成绩总览")
         self.stats_result_label = QLabel("统计结果将显示在这里")
         stats_layout.addRow("选择班级:", self.class_combo)
         stats_layout.addRow("选择课程:", self.course_combo_stats)
         stats_layout.addRow(self.calculate_stats_button)
+        stats_layout.addRow(self.dashboard_button)
         stats_layout.addRow(self.stats_result_label)
         stats_group.setLayout(stats_layout)
         main_layout.addWidget(stats_group)
 
+        # GPA 排名
+        ranking_group = QGroupBox("GPA 排名")
+        ranking_layout = QFormLayout()
+        self.ranking_scope_combo = QComboBox()
+        for label, scope in (("班级", 'class'), ("专业", 'major'), ("入学年级", 'cohort')):
+            self.ranking_scope_combo.addItem(label, scope)
+        self.ranking_partition_combo = QComboBox()
+        self.ranking_semester_combo = QComboBox()
+        self.ranking_button = QPushButton("查看排名")
+        self.student_ranking_button = QPushButton("查看学生名次（按上方学号）")
+        ranking_layout.addRow("排名范围:", self.ranking_scope_combo)
+        ranking_layout.addRow("班级/专业/年级:", self.ranking_partition_combo)
+        ranking_layout.addRow("学期:", self.ranking_semester_combo)
+        ranking_layout.addRow(self.ranking_button)
+        ranking_layout.addRow(self.student_ranking_button)
+        ranking_group.setLayout(ranking_layout)
+        main_layout.addWidget(ranking_group)
+
         # 结果显示与导出
         result_group = QGroupBox("查询与统计结果")
         result_layout = QVBoxLayout()
@@ -2,9 +2,11 @@
 # 描述: 成绩管理选项卡的UI和逻辑。
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
-                             QPushButton, QComboBox, QLabel, QMessageBox, QHeaderView)
+                             QPushButton, QComboBox, QLabel, QMessageBox, QHeaderView,
+                             QApplication)
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+from wl31 import config
 
 class GradeManagementTab(QWidget):
     """
@@ -14,6 +16,13 @@ class GradeManagementTab(QWidget):
         super().__init__(parent)
         self.db_manager = db_manager
         self.current_user = current_user
+        self.pending_grades = {} # 待保存的成绩修改: student_id -> score
+        self.pending_course_id = None
+        # 连续编辑时合并为一次批量保存
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.timeout.connect(self.save_pending_grades)
+        QApplication.instance().aboutToQuit.connect(self.save_pending_grades) # 退出前保存未提交的修改
         self.init_ui()
         self.load_courses_for_user()
 
@@ -65,6 +74,7 @@ class GradeManagementTab(QWidget):
 
     def on_course_selected(self, index):
         """当选择的课程变化时，加载该课程的学生和成绩"""
+        self.save_pending_grades() # 先保存上一门课程尚未提交的修改
         course_id = self.course_combo.itemData(index)
         if course_id is None:
             self.model.removeRows(0, self.model.rowCount())
@@ -120,9 +130,21 @@ class GradeManagementTab(QWidget):
             self.on_course_selected(self.course_combo.currentIndex())
             return
 
+        # 记录修改，延迟一段时间后与其他修改一起批量保存
+        self.pending_grades[student_id] = score
+        self.pending_course_id = self.current_course_id
+        self.save_timer.start(config.GRADE_SAVE_DELAY_MS)
+
+    def save_pending_grades(self):
+        """将积累的成绩修改一次性批量保存到数据库"""
+        self.save_timer.stop()
+        if not self.pending_grades:
+            return
+        grades = list(self.pending_grades.items())
+        self.pending_grades = {}
+
         recorder_id = self.current_user['id']
-        
-        success = self.db_manager.assign_grade(recorder_id, student_id, self.current_course_id, score)
+        success = self.db_manager.assign_grades_bulk(recorder_id, self.pending_course_id, grades)
 
         if not success:
             QMessageBox.critical(self, "保存失败", "更新成绩时发生错误。")
@@ -37,6 +37,9 @@ class Ui_MainWindow(object):
         self.student_edit_button = QtWidgets.QPushButton("编辑")
         self.student_delete_button = QtWidgets.QPushButton("删除")
         self.student_import_button = QtWidgets.QPushButton("批量导入")
+        self.student_freeze_button = QtWidgets.QPushButton("冻结账户")
+        self.student_unfreeze_button = QtWidgets.QPushButton("解冻账户")
+        self.student_reset_password_button = QtWidgets.QPushButton("重置密码")
         
         self.student_tools_layout.addWidget(self.student_search_input)
         self.student_tools_layout.addWidget(self.student_search_button)
@@ -45,6 +48,9 @@ class Ui_MainWindow(object):
         self.student_tools_layout.addWidget(self.student_edit_button)
         self.student_tools_layout.addWidget(self.student_delete_button)
         self.student_tools_layout.addWidget(self.student_import_button)
+        self.student_tools_layout.addWidget(self.student_freeze_button)
+        self.student_tools_layout.addWidget(self.student_unfreeze_button)
+        self.student_tools_layout.addWidget(self.student_reset_password_button)
         
         self.student_tab_layout.addLayout(self.student_tools_layout)
         
@@ -30,6 +30,18 @@ class MyGradesTab(QWidget):
 
         layout.addWidget(self.table_view)
 
+        # 学分绩点汇总: 累计 GPA 和每学期的学分、GPA
+        self.gpa_label = QLabel()
+        layout.addWidget(self.gpa_label)
+
+        self.semester_view = QTableView()
+        self.semester_view.setEditTriggers(QTableView.NoEditTriggers)
+        self.semester_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.semester_model = QStandardItemModel()
+        self.semester_model.setHorizontalHeaderLabels(['学期', '课程数', '学分', '已获学分', '学期GPA', '加权平均分', '累计GPA'])
+        self.semester_view.setModel(self.semester_model)
+        layout.addWidget(self.semester_view)
+
     def load_my_grades(self):
         """加载当前登录学生的成绩"""
         student_id = self.current_user.get('student_id')
@@ -49,4 +61,26 @@ class MyGradesTab(QWidget):
                 QStandardItem(str(teacher_name or 'N/A')),
                 QStandardItem(str(score))
             ]
-            self.model.appendRow(row)
\ No newline at end of file
+            self.model.appendRow(row)
+
+        self.load_transcript(student_id)
+
+    def load_transcript(self, student_id):
+        """加载累计和每学期的学分绩点"""
+        transcript = self.db_manager.get_transcript(student_id)
+        self.gpa_label.setText(
+            f"累计 GPA: <b>{transcript['gpa']:.2f}</b>　加权平均分: {transcript['average']:.2f}　"
+            f"已获学分 / 总学分: {transcript['earned_credits']:g} / {transcript['credits']:g}"
+        )
+        self.semester_model.removeRows(0, self.semester_model.rowCount())
+        for semester in transcript['semesters']:
+            row = [
+                QStandardItem(str(semester['semester'] or 'N/A')),
+                QStandardItem(str(semester['courses'])),
+                QStandardItem(f"{semester['credits']:g}"),
+                QStandardItem(f"{semester['earned_credits']:g}"),
+                QStandardItem(f"{semester['gpa']:.2f}"),
+                QStandardItem(f"{semester['average']:.2f}"),
+                QStandardItem(f"{semester['cumulative_gpa']:.2f}")
+            ]
+            self.semester_model.appendRow(row)
@@ -198,53 +198,52 @@ class TeacherManagementTab(QWidget):
             else:
                 QMessageBox.critical(self, "错误", "删除教师失败。")
 
+    def get_selected_teacher_ids(self):
+        """获取所有选中行的教师ID。"""
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            QMessageBox.warning(self, "警告", "请先选择教师。")
+        return [int(self.table.item(index.row(), 0).text()) for index in selected_rows]
+
     def toggle_freeze_account(self):
-        """冻结或解冻教师账户。"""
-        teacher_id, teacher_data = self.get_selected_teacher_info()
-        if not teacher_id:
+        """冻结或解冻选中教师的账户（以第一位选中教师的当前状态决定操作）。"""
+        teacher_ids = self.get_selected_teacher_ids()
+        if not teacher_ids:
             return
-        
-        # 需要从Users表获取user_id
-        user = self.db_manager.get_user(teacher_data['username'])
-        if not user:
-             QMessageBox.critical(self, "错误", "找不到关联的用户账户。")
-             return
-
-        current_status = user['is_frozen']
-        new_status = 1 - current_status
+
+        first_row = self.table.selectionModel().selectedRows()[0].row()
+        new_status = 0 if self.table.item(first_row, 6).text() == "冻结" else 1
         action_text = "冻结" if new_status == 1 else "解冻"
+        target = f"教师 '{self.table.item(first_row, 2).text()}'" if len(teacher_ids) == 1 else f"选中的 {len(teacher_ids)} 位教师"
 
         reply = QMessageBox.question(
             self, f'确认{action_text}',
-            f"您确定要{action_text}教师 '{teacher_data['name']}' 的账户吗？",
+            f"您确定要{action_text}{target}的账户吗？",
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
 
         if reply == QMessageBox.Yes:
-            if self.db_manager.set_user_account_status(self.user_info['id'], user['id'], new_status):
-                QMessageBox.information(self, "成功", f"账户已成功{action_text}。")
+            changed = self.db_manager.set_accounts_status(self.user_info['id'], new_status, {'teacher_id': teacher_ids})
+            if changed is not None:
+                QMessageBox.information(self, "成功", f"已{action_text} {changed} 个账户。")
                 self.load_teachers()
             else:
                 QMessageBox.critical(self, "错误", f"{action_text}账户失败。")
 
     def reset_password(self):
-        """重置教师密码。"""
-        teacher_id, teacher_data = self.get_selected_teacher_info()
-        if not teacher_id:
+        """重置选中教师的密码。"""
+        teacher_ids = self.get_selected_teacher_ids()
+        if not teacher_ids:
             return
 
-        user = self.db_manager.get_user(teacher_data['username'])
-        if not user:
-             QMessageBox.critical(self, "错误", "找不到关联的用户账户。")
-             return
-
         new_password, ok = QInputDialog.getText(
-            self, '重置密码', f"请输入教师 '{teacher_data['name']}' 的新密码:", QLineEdit.Password
+            self, '重置密码', f"请输入选中的 {len(teacher_ids)} 位教师的新密码:", QLineEdit.Password
         )
 
         if ok and new_password:
-            if self.db_manager.reset_user_password(self.user_info['id'], user['id'], new_password):
-                QMessageBox.information(self, "成功", "密码已成功重置。")
+            result = self.db_manager.reset_passwords(self.user_info['id'], {'teacher_id': teacher_ids}, new_password)
+            if result is not None:
+                QMessageBox.information(self, "成功", f"已重置 {result[0]} 个账户的密码。")
             else:
                 QMessageBox.critical(self, "错误", "重置密码失败。")
         elif ok:
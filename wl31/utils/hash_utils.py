@@ -1,19 +1,63 @@
 # wl31/utils/hash_utils.py
 # 描述: 提供密码哈希和验证功能
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from wl31 import config
 
-def hash_password(password: str) -> str:
+# 少于该数量的密码直接串行哈希，避免线程调度的开销
+PARALLEL_HASH_THRESHOLD = 8
+
+# 批量哈希共用的线程池，第一次批量哈希时创建，之后一直复用
+_executor = None
+_executor_lock = threading.Lock()
+
+def hash_password(password: str, rounds: int = None) -> str:
     """
     使用 bcrypt 对密码进行哈希处理。
     :param password: 明文密码。
+    :param rounds: bcrypt 强度，默认为 config.BCRYPT_ROUNDS。
     :return: 哈希后的密码字符串。
     """
     # 生成盐并哈希密码
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or config.BCRYPT_ROUNDS)
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed_password.decode('utf-8')
 
+def _get_executor():
+    """
+    返回共用的哈希线程池（线程数为 CPU 核心数）。
+    bcrypt.hashpw 计算时会释放 GIL，线程即可随核心数并行；使用线程而不是进程池，
+    避免在已有后台线程和数据库连接的 GUI 进程中 fork 子进程（子进程可能继承其他线程持有的锁）。
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+        return _executor
+
+def hash_passwords(passwords) -> list:
+    """
+    批量哈希密码，在共用的线程池中并行计算。
+    bcrypt 是 CPU 密集型运算，批量创建账号时并行哈希可随核心数线性加速。
+    :param passwords: 明文密码的可迭代对象。
+    :return: 与输入顺序一致的哈希值列表。
+    """
+    passwords = list(passwords)
+    # 在调用线程中确定哈希强度，整批密码使用同一强度
+    rounds = config.BCRYPT_ROUNDS
+    if (os.cpu_count() or 1) <= 1 or len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [hash_password(p, rounds) for p in passwords]
+
+    try:
+        return list(_get_executor().map(hash_password, passwords, [rounds] * len(passwords)))
+    except RuntimeError as e:
+        # 解释器正在退出时线程池不再接受任务，退回串行计算
+        print(f"Parallel password hashing unavailable, falling back to serial: {e}")
+        return [hash_password(p, rounds) for p in passwords]
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     验证明文密码是否与哈希值匹配。
@@ -40,4 +84,9 @@ if __name__ == '__main__':
     print(f"Verification with correct password: {is_correct}") # 应该为 True
     
     is_correct = verify_password("wrongpassword", hashed)
-    print(f"Verification with incorrect password: {is_correct}") # 应该为 False
\ No newline at end of file
+    print(f"Verification with incorrect password: {is_correct}") # 应该为 False
+
+    # 测试批量哈希
+    batch = [f"password{i}" for i in range(16)]
+    hashes = hash_passwords(batch)
+    print(f"Batch verification: {all(verify_password(p, h) for p, h in zip(batch, hashes))}") # 应该为 True
\ No newline at end of file
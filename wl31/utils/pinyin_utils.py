@@ -1,14 +1,56 @@
 # wl31/utils/pinyin_utils.py
-from pypinyin import pinyin, Style
+# pypinyin 加载拼音词典较慢，在首次转换时才导入
+
+import heapq
+
 
 def convert_to_pinyin_initials(text):
     """
     将中文字符串转换为拼音首字母缩写。
-    例如: "张三" -> "zs"
+    例如: "张三" -> "zs"，"欧阳修" -> "oyx"
     """
     if not text:
         return ""
-    # 使用 pypinyin 库获取首字母
-    initials = pinyin(text, style=Style.INITIALS, strict=False)
+    from pypinyin import pinyin, Style
+    # 使用 pypinyin 库获取首字母（FIRST_LETTER 对 zh/ch/sh 和零声母字同样只取一个字母）
+    initials = pinyin(text, style=Style.FIRST_LETTER, strict=False)
     # 将 [['z'], ['s']] 格式的结果连接成 "zs"
-    return "".join([item[0] for item in initials])
\ No newline at end of file
+    return "".join([item[0] for item in initials]).lower()
+
+
+def convert_to_pinyin_readings(text, max_readings=16):
+    """
+    列出中文字符串可能的全拼读法（多音字的每种读音都会出现）。
+    pypinyin 把每个字最常用的读音排在最前面，读法按各字所用读音的序号之和从小到大排列，
+    即越常用的组合越靠前，如 "单明" -> [['dan', 'ming'], ['dan', 'meng'], ['chan', 'ming'],
+    ['chan', 'meng'], ['shan', 'ming'], ['shan', 'meng']]。
+    组合数过多时只保留靠前的组合，但每个字的每种读音至少出现一次（其余字取最常用读音），
+    因此姓氏等任一位置的多音字都不会因截断而漏掉读音。
+    :param max_readings: 最多返回的读法数；保证每种读音都出现所需的读法更多时以后者为准。
+    :return: 读法列表，每种读法为逐字的拼音列表；非中文字符原样保留（转为小写）。
+    """
+    if not text:
+        return []
+    from pypinyin import pinyin, Style
+    syllables = pinyin(text, style=Style.NORMAL, heteronym=True, strict=False)
+    candidates = [list(dict.fromkeys(s.lower() for s in choices)) for choices in syllables]
+
+    # 读法用每个字所选读音的序号表示，从全部取最常用读音开始按序号之和逐步扩展
+    start = (0,) * len(candidates)
+    chosen = {start}
+    # 每个字的每种读音至少出现一次
+    for i, choices in enumerate(candidates):
+        for j in range(1, len(choices)):
+            chosen.add(start[:i] + (j,) + start[i + 1:])
+    heap = [(0, start)]
+    seen = {start}
+    while heap and len(chosen) < max_readings:
+        _, indexes = heapq.heappop(heap)
+        chosen.add(indexes)
+        for i, j in enumerate(indexes):
+            if j + 1 < len(candidates[i]):
+                neighbour = indexes[:i] + (j + 1,) + indexes[i + 1:]
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    heapq.heappush(heap, (sum(neighbour), neighbour))
+    return [[candidates[i][j] for i, j in enumerate(indexes)] for indexes in sorted(chosen, key=lambda x: (sum(x), x))]
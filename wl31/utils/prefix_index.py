@@ -0,0 +1,112 @@
+# wl31/utils/prefix_index.py
+# 描述: 基于有序数组和二分查找的内存前缀索引，用于即时搜索。
+
+import bisect
+import threading
+
+
+class PrefixIndex:
+    """
+    内存前缀索引。
+
+    每条记录可以有多个搜索键（如拼音首字母和学号），所有 (键, 记录ID) 保存在一个有序数组中，
+    前缀查询通过二分查找定位起点后顺序扫描，耗时只与命中条数相关，不需要访问数据库。
+
+    提供 loader 时索引延迟构建: 第一次搜索时才调用 loader 加载全部记录，
+    在此之前的 add/remove 直接忽略（加载时读到的已经是最新数据），不拖慢启动。
+    """
+    def __init__(self, loader=None):
+        """
+        :param loader: 返回 (record_id, keys, record) 可迭代对象的函数，为 None 时需手动调用 build。
+        """
+        self._loader = loader
+        self._built = False
+        self._entries = [] # 有序的 (key, record_id) 列表
+        self._records = {} # record_id -> (记录, 该记录的搜索键元组)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(key):
+        return str(key).strip().lower()
+
+    def build(self, items):
+        """
+        用 (record_id, keys, record) 批量重建索引。
+        一次性排序比逐条插入快得多，适合一次加载全部数据。
+        """
+        with self._lock:
+            self._build_locked(items)
+
+    def _build_locked(self, items):
+        records = {}
+        entries = []
+        for record_id, keys, record in items:
+            keys = tuple({self._normalize(k) for k in keys if k})
+            records[record_id] = (record, keys)
+            entries.extend((key, record_id) for key in keys)
+        entries.sort()
+        self._entries = entries
+        self._records = records
+        self._built = True
+
+    def _ensure_built_locked(self):
+        if not self._built and self._loader is not None:
+            self._build_locked(self._loader())
+
+    def invalidate(self):
+        """丢弃已加载的数据，下次搜索时通过 loader 重新加载。"""
+        with self._lock:
+            self._built = False
+            self._entries = []
+            self._records = {}
+
+    def add(self, record_id, keys, record):
+        """添加或更新一条记录（索引尚未加载时忽略）。"""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove_locked(record_id)
+            keys = tuple({self._normalize(k) for k in keys if k})
+            self._records[record_id] = (record, keys)
+            for key in keys:
+                bisect.insort(self._entries, (key, record_id))
+
+    def remove(self, record_id):
+        """删除一条记录（不存在时忽略）。"""
+        with self._lock:
+            self._remove_locked(record_id)
+
+    def _remove_locked(self, record_id):
+        _, keys = self._records.pop(record_id, (None, ()))
+        for key in keys:
+            pos = bisect.bisect_left(self._entries, (key, record_id))
+            if pos < len(self._entries) and self._entries[pos] == (key, record_id):
+                del self._entries[pos]
+
+    def search(self, prefix, limit=None):
+        """
+        返回搜索键以 prefix 开头的记录（按键排序，同一记录只返回一次）。
+        :param prefix: 查询前缀，不区分大小写。
+        :param limit: 最多返回的条数。
+        """
+        prefix = self._normalize(prefix)
+        if not prefix:
+            return []
+        results, seen = [], set()
+        with self._lock:
+            self._ensure_built_locked()
+            pos = bisect.bisect_left(self._entries, (prefix,))
+            while pos < len(self._entries):
+                key, record_id = self._entries[pos]
+                if not key.startswith(prefix):
+                    break
+                if record_id not in seen:
+                    seen.add(record_id)
+                    results.append(self._records[record_id][0])
+                    if limit is not None and len(results) >= limit:
+                        break
+                pos += 1
+        return results
+
+    def __len__(self):
+        return len(self._records)